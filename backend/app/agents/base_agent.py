@@ -158,8 +158,22 @@
 # backend/app/agents/base_agent.py
 
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Dict, Any
+import functools
+import json
 import logging
+import time
+
+from app.config import settings
+from app.agents.execution_log import execution_log, utc_timestamp
+from app.agents.llm_cache import llm_cache
+from app.agents.llm_gateway import llm_gateway
+from app.core.executor import run_admitted
+from app.core.metrics import (
+    AGENT_EXECUTE_SECONDS, AGENT_EXECUTIONS, AGENT_FALLBACKS,
+    LLM_CALL_SECONDS, LLM_TOKENS, LLM_CACHE_LOOKUPS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -168,18 +182,141 @@ class BaseAgent(ABC):
     
     def __init__(self, name: str):
         self.name = name
-        self.execution_history = []
+        # Ring buffer of recent summaries; full records go to execution_log
+        self.execution_history = deque(maxlen=settings.AGENT_HISTORY_SIZE)
         logger.info(f"✓ Initialized {name}")
     
+    def __init_subclass__(cls, **kwargs):
+        """Instrument execute()/aexecute() on every concrete agent."""
+        super().__init_subclass__(**kwargs)
+        if "execute" in cls.__dict__:
+            cls.execute = _instrument_sync(cls.__dict__["execute"])
+        if "aexecute" in cls.__dict__:
+            cls.aexecute = _instrument_async(cls.__dict__["aexecute"])
+    
     @abstractmethod
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute agent with given context."""
         pass
     
+    async def aexecute(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of execute().
+        
+        Agents with native async I/O override this; the default runs the
+        blocking execute() in the shared blocking pool so it never stalls the
+        event loop.
+        """
+        return await run_admitted(self.execute, context)
+    
+    def chat_completion(self, **params) -> str:
+        """
+        Run a chat completion through the shared LLM cache and gateway.
+        
+        Returns the message content. Raises CircuitOpenError immediately while
+        the provider is unhealthy so agents can fall back without waiting.
+        """
+        cached = llm_cache.get(params)
+        if cached is not None:
+            LLM_CACHE_LOOKUPS.inc(agent=self.name, result="hit")
+            return cached
+        LLM_CACHE_LOOKUPS.inc(agent=self.name, result="miss")
+        
+        started = time.perf_counter()
+        completion = llm_gateway.chat_completion(**params)
+        self._record_llm_call(completion, started)
+        content = completion.choices[0].message.content
+        if _cacheable(params, content):
+            llm_cache.set(params, content)
+        return content
+    
+    async def achat_completion(self, **params) -> str:
+        """Async variant of chat_completion()."""
+        cached = await llm_cache.aget(params)
+        if cached is not None:
+            LLM_CACHE_LOOKUPS.inc(agent=self.name, result="hit")
+            return cached
+        LLM_CACHE_LOOKUPS.inc(agent=self.name, result="miss")
+        
+        started = time.perf_counter()
+        completion = await llm_gateway.achat_completion(**params)
+        self._record_llm_call(completion, started)
+        content = completion.choices[0].message.content
+        if _cacheable(params, content):
+            await llm_cache.aset(params, content)
+        return content
+    
+    def _record_llm_call(self, completion, started: float):
+        LLM_CALL_SECONDS.observe(time.perf_counter() - started, agent=self.name)
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, agent=self.name, kind="prompt")
+            LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, agent=self.name, kind="completion")
+    
     def log_execution(self, context: dict, result: dict):
         """Log agent execution for audit trail."""
+        timestamp = utc_timestamp()
         self.execution_history.append({
             "context": context,
-            "result": result,
-            "timestamp": "2025-11-18T00:00:00"
+            "result": _summarize(result),
+            "timestamp": timestamp
         })
+        execution_log.write(self.name, context, result, timestamp)
+
+
+def _cacheable(params: dict, content: str) -> bool:
+    # Never cache a response the agent will fail to parse
+    if params.get("response_format", {}).get("type") == "json_object":
+        try:
+            json.loads(content)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+def _record_execution(agent: str, mode: str, started: float, result: Any):
+    AGENT_EXECUTE_SECONDS.observe(time.perf_counter() - started, agent=agent, mode=mode)
+    if isinstance(result, dict) and "error" in result:
+        reason = "circuit_open" if result.get("circuit_open") else "error"
+        AGENT_FALLBACKS.inc(agent=agent, reason=reason)
+        AGENT_EXECUTIONS.inc(agent=agent, outcome="fallback")
+    else:
+        AGENT_EXECUTIONS.inc(agent=agent, outcome="ok")
+
+
+def _instrument_sync(func):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception:
+            AGENT_EXECUTE_SECONDS.observe(time.perf_counter() - started, agent=self.name, mode="sync")
+            AGENT_EXECUTIONS.inc(agent=self.name, outcome="error")
+            raise
+        _record_execution(self.name, "sync", started, result)
+        return result
+    return wrapper
+
+
+def _instrument_async(func):
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = await func(self, *args, **kwargs)
+        except Exception:
+            AGENT_EXECUTE_SECONDS.observe(time.perf_counter() - started, agent=self.name, mode="async")
+            AGENT_EXECUTIONS.inc(agent=self.name, outcome="error")
+            raise
+        _record_execution(self.name, "async", started, result)
+        return result
+    return wrapper
+
+
+def _summarize(result: dict) -> dict:
+    """Keep top-level scalar fields only, dropping nested sub-agent payloads."""
+    return {
+        key: value for key, value in result.items()
+        if value is None or isinstance(value, (str, int, float, bool))
+    }
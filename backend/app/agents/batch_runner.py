@@ -0,0 +1,135 @@
+# backend/app/agents/batch_runner.py
+
+"""
+Bounded-concurrency batch execution for OrchestrationAgent.
+
+Items are pulled from a queue by a fixed number of workers, so thousands of
+invoices never turn into thousands of simultaneous Groq calls. Results are
+yielded as each item finishes, followed by a summary record.
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """Token bucket limiting how many operations start per second."""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(1, int(rate_per_second))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _item_failed(result: Dict[str, Any]) -> bool:
+    if "error" in result:
+        return True
+    return any("error" in r for r in result.get("agent_results", {}).values())
+
+
+async def run_batch(
+    orchestrator,
+    items: List[Dict[str, Any]],
+    concurrency: int,
+    rate_limit_per_second: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run orchestrator.aexecute() over items with at most `concurrency` in flight.
+
+    Yields {"type": "result", ...} per item in completion order, then one
+    {"type": "summary", ...} record with throughput, failures and latency.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, item in enumerate(items):
+        queue.put_nowait((index, item))
+
+    results: asyncio.Queue = asyncio.Queue()
+    limiter = AsyncRateLimiter(rate_limit_per_second) if rate_limit_per_second else None
+
+    async def worker():
+        while True:
+            try:
+                index, item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            if limiter is not None:
+                await limiter.acquire()
+
+            started = time.perf_counter()
+            try:
+                result = await orchestrator.aexecute(item)
+                record = {
+                    "type": "result",
+                    "index": index,
+                    "status": "failed" if _item_failed(result) else "ok",
+                    "result": result,
+                }
+            except Exception as e:
+                logger.error(f"❌ Batch item {index} failed: {str(e)}")
+                record = {"type": "result", "index": index, "status": "failed", "error": str(e)}
+
+            record["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            await results.put(record)
+
+    batch_started = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(items))))]
+
+    latencies = []
+    failed = 0
+    try:
+        for _ in range(len(items)):
+            record = await results.get()
+            latencies.append(record["latency_ms"])
+            if record["status"] == "failed":
+                failed += 1
+            yield record
+    finally:
+        # Client went away or we are done: stop any remaining work
+        for task in workers:
+            task.cancel()
+
+    elapsed = time.perf_counter() - batch_started
+    yield {
+        "type": "summary",
+        "total": len(items),
+        "succeeded": len(items) - failed,
+        "failed": failed,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(items) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "max": max(latencies) if latencies else 0.0,
+        },
+    }
@@ -1,8 +1,7 @@
 # backend/app/agents/credit_scoring_agent.py
 
-from groq import Groq
 from app.agents.base_agent import BaseAgent
-import os
+from app.agents.llm_gateway import CircuitOpenError
 import json
 import logging
 
@@ -20,7 +19,6 @@ class CreditScoringAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("CreditScoringAgent")
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.model = "llama-3.1-8b-instant"
     
     def fetch_cashflow(self, merchant_id: int) -> dict:
@@ -48,17 +46,15 @@ class CreditScoringAgent(BaseAgent):
             "trend": "stable"
         }
     
-    def execute(self, context: dict) -> dict:
-        """Execute credit scoring."""
-        merchant_id = context.get("merchant_id", 1)
-        
-        logger.info(f"📊 Credit Scoring Agent analyzing merchant {merchant_id}")
-        
-        # Gather data
+    def _gather(self, merchant_id: int) -> tuple:
+        """Collect alternative data used for scoring."""
         cashflow = self.fetch_cashflow(merchant_id)
         gst = self.check_gst_compliance(merchant_id)
         upi = self.analyze_upi_velocity(merchant_id)
-        
+        return cashflow, gst, upi
+    
+    def _completion_params(self, merchant_id: int, cashflow: dict, gst: dict, upi: dict) -> dict:
+        """Build the chat completion request for this merchant."""
         prompt = f"""You are a Credit Scoring Agent using alternative data.
 
 MERCHANT: {merchant_id}
@@ -89,36 +85,78 @@ Respond in JSON:
   "recommended_limit": 100000
 }}"""
 
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a credit analyst. Respond in JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 500,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _build_result(self, context: dict, cashflow: dict, gst: dict, upi: dict, content: str) -> dict:
+        """Parse the AI response and assemble the agent result."""
+        merchant_id = context.get("merchant_id", 1)
+        ai_response = json.loads(content)
+        
+        result = {
+            "agent": self.name,
+            "merchant_id": merchant_id,
+            "score": ai_response,
+            "data_sources": {
+                "cashflow": cashflow,
+                "gst": gst,
+                "upi": upi
+            }
+        }
+        
+        self.log_execution(context, result)
+        logger.info(f"✅ Credit Score: {ai_response.get('credit_score')}/1000 ({ai_response.get('tier')})")
+        
+        return result
+    
+    def _failure(self, error: Exception) -> dict:
+        logger.error(f"❌ Credit Scoring Agent failed: {str(error)}")
+        return {
+            "agent": self.name,
+            "error": str(error),
+            "circuit_open": isinstance(error, CircuitOpenError)
+        }
+    
+    def execute(self, context: dict) -> dict:
+        """Execute credit scoring."""
+        merchant_id = context.get("merchant_id", 1)
+        
+        logger.info(f"📊 Credit Scoring Agent analyzing merchant {merchant_id}")
+        
+        # Gather data
+        cashflow, gst, upi = self._gather(merchant_id)
+        
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a credit analyst. Respond in JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=500,
-                response_format={"type": "json_object"}
+            content = self.chat_completion(
+                **self._completion_params(merchant_id, cashflow, gst, upi)
             )
+            return self._build_result(context, cashflow, gst, upi, content)
             
-            ai_response = json.loads(completion.choices[0].message.content)
-            
-            result = {
-                "agent": self.name,
-                "merchant_id": merchant_id,
-                "score": ai_response,
-                "data_sources": {
-                    "cashflow": cashflow,
-                    "gst": gst,
-                    "upi": upi
-                }
-            }
-            
-            self.log_execution(context, result)
-            logger.info(f"✅ Credit Score: {ai_response.get('credit_score')}/1000 ({ai_response.get('tier')})")
-            
-            return result
+        except Exception as e:
+            return self._failure(e)
+    
+    async def aexecute(self, context: dict) -> dict:
+        """Async variant of execute() using the async Groq client."""
+        merchant_id = context.get("merchant_id", 1)
+        
+        logger.info(f"📊 Credit Scoring Agent analyzing merchant {merchant_id}")
+        
+        # Gather data
+        cashflow, gst, upi = self._gather(merchant_id)
+        
+        try:
+            content = await self.achat_completion(
+                **self._completion_params(merchant_id, cashflow, gst, upi)
+            )
+            return self._build_result(context, cashflow, gst, upi, content)
             
         except Exception as e:
-            logger.error(f"❌ Credit Scoring Agent failed: {str(e)}")
-            return {"agent": self.name, "error": str(e)}
+            return self._failure(e)
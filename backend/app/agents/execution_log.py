@@ -0,0 +1,126 @@
+# backend/app/agents/execution_log.py
+
+"""
+Append-only store for full agent execution records.
+
+Agents keep only a small ring buffer of recent summaries in memory; complete
+context/result records are handed to a background thread that serializes
+them to a size-rotated JSONL file. The hand-off queue is bounded, so a slow
+disk drops records (and counts them) instead of growing the heap.
+"""
+
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+import atexit
+import json
+import logging
+import queue
+import threading
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ExecutionLogWriter:
+    """Background JSONL writer with size-based rotation."""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._handler = None
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._handler = RotatingFileHandler(
+                self.path,
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding="utf-8",
+            )
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+            self._thread = threading.Thread(target=self._run, name="execution-log-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, agent: str, context: dict, result: dict, timestamp: str):
+        """Queue a full execution record; never blocks the caller."""
+        if not self.enabled:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait({
+                "agent": agent,
+                "timestamp": timestamp,
+                "context": context,
+                "result": result,
+            })
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                break
+            try:
+                line = json.dumps(record, default=str, ensure_ascii=False)
+                self._handler.emit(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+                self.written += 1
+            except Exception as e:
+                logger.error(f"❌ Execution log write failed: {str(e)}")
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending records and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._handler.close()
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+def utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# Global instance shared by all agents
+execution_log = ExecutionLogWriter(
+    path=settings.EXECUTION_LOG_PATH,
+    max_bytes=settings.EXECUTION_LOG_MAX_BYTES,
+    backup_count=settings.EXECUTION_LOG_BACKUP_COUNT,
+    queue_size=settings.EXECUTION_LOG_QUEUE_SIZE,
+)
+atexit.register(execution_log.close)
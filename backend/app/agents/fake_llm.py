@@ -0,0 +1,196 @@
+# backend/app/agents/fake_llm.py
+
+"""
+Offline, deterministic stand-in for the Groq API.
+
+Recognizes the prompt of each agent and returns schema-valid JSON derived
+from the numbers in the prompt, so identical prompts always get identical
+answers. Latency follows a lognormal distribution around a median, and a
+configurable share of calls fail with the same exception types Groq raises
+(429, 503, timeout), which exercises the gateway's retry and breaker paths.
+"""
+
+from types import SimpleNamespace
+from typing import Dict, Optional
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+
+import httpx
+from groq import APITimeoutError, InternalServerError, RateLimitError
+
+from app.agents.llm_backend import LLMBackend
+
+_FAKE_REQUEST = httpx.Request("POST", "http://fake-llm.local/openai/v1/chat/completions")
+
+
+def _number(pattern: str, text: str, default: float) -> float:
+    match = re.search(pattern, text)
+    if not match:
+        return default
+    return float(match.group(1).replace(",", ""))
+
+
+def _supply_chain_response(prompt: str, jitter: float) -> dict:
+    on_time = _number(r"On-Time Rate: ([\d.]+)%", prompt, 85.0)
+    avg_days = _number(r"Average Payment Days: ([\d.]+)", prompt, 30.0)
+    financeable = on_time >= 75 and avg_days <= 60
+
+    if on_time >= 90:
+        risk_level = "low"
+    elif on_time >= 80:
+        risk_level = "medium"
+    else:
+        risk_level = "high"
+
+    rate = 2.0 + (100 - on_time) / 100 * 3.0 + jitter * 0.2
+    return {
+        "decision": "YES" if financeable else "NO",
+        "recommended_rate": round(min(5.0, max(2.0, rate)), 2),
+        "reasoning": f"Buyer pays {on_time:.0f}% on time, {avg_days:.0f} days on average",
+        "risk_level": risk_level,
+    }
+
+
+def _credit_scoring_response(prompt: str, jitter: float) -> dict:
+    inflow = _number(r"Monthly Inflow: ₹([\d,]+)", prompt, 250000)
+    outflow = _number(r"Monthly Outflow: ₹([\d,]+)", prompt, 200000)
+    consistency = _number(r"Consistency: ([\d.]+)%", prompt, 88.0)
+
+    margin = (inflow - outflow) / inflow if inflow else 0.0
+    score = int(min(1000, max(300, 500 + margin * 800 + consistency * 2 + jitter * 20)))
+
+    if score >= 800:
+        tier = "excellent"
+    elif score >= 700:
+        tier = "very_good"
+    elif score >= 600:
+        tier = "good"
+    elif score >= 500:
+        tier = "medium"
+    else:
+        tier = "risky"
+
+    return {
+        "credit_score": score,
+        "tier": tier,
+        "reasoning": [f"Net margin {margin*100:.0f}%", f"Cashflow consistency {consistency:.0f}%"],
+        "recommended_limit": int(inflow * 0.4),
+    }
+
+
+def _factoring_response(prompt: str, jitter: float) -> dict:
+    proceed = "PO MATCHED: True" in prompt and "DELIVERY CONFIRMED: True" in prompt
+    net = _number(r"Net to Merchant: ₹([\d,.]+)", prompt, 0.0)
+    return {
+        "proceed": proceed,
+        "reasoning": "PO matched and delivery confirmed" if proceed else "PO or delivery not confirmed",
+        "offer_summary": f"Receive ₹{net:,.2f} today",
+    }
+
+
+_RESPONDERS = (
+    ("Supply Chain Intelligence Agent", _supply_chain_response),
+    ("Credit Scoring Agent", _credit_scoring_response),
+    ("Invoice Factoring Agent", _factoring_response),
+)
+
+
+class FakeLLMBackend(LLMBackend):
+    """Local LLM stand-in with configurable latency and error distributions."""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        latency_sigma: float = 0.25,
+        error_rate: float = 0.0,
+        error_mix: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            latency_ms: median simulated latency
+            latency_sigma: lognormal shape (0 = fixed latency)
+            error_rate: share of calls that fail
+            error_mix: relative weights of "rate_limit", "server_error", "timeout"
+            seed: RNG seed for reproducible latency/error sequences
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_mix = error_mix or {"rate_limit": 0.5, "server_error": 0.4, "timeout": 0.1}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _draw(self) -> tuple:
+        with self._lock:
+            self.calls += 1
+            latency = self.latency_ms / 1000
+            if self.latency_sigma > 0:
+                latency *= math.exp(self._rng.gauss(0, self.latency_sigma))
+            error = None
+            if self.error_rate > 0 and self._rng.random() < self.error_rate:
+                kinds, weights = zip(*self.error_mix.items())
+                error = self._rng.choices(kinds, weights)[0]
+        return latency, error
+
+    def _raise(self, kind: str):
+        if kind == "rate_limit":
+            response = httpx.Response(429, request=_FAKE_REQUEST, headers={"retry-after": "0"})
+            raise RateLimitError("Rate limit reached (fake)", response=response, body=None)
+        if kind == "server_error":
+            response = httpx.Response(503, request=_FAKE_REQUEST)
+            raise InternalServerError("Service unavailable (fake)", response=response, body=None)
+        raise APITimeoutError(request=_FAKE_REQUEST)
+
+    def respond(self, **params) -> SimpleNamespace:
+        """Build the completion for a request without any latency or errors."""
+        messages = params.get("messages", [])
+        prompt = "\n".join(m.get("content", "") for m in messages)
+
+        # Deterministic per prompt: the same request always gets the same answer
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        jitter = digest[0] / 255 - 0.5
+
+        content = {"result": "ok"}
+        for marker, responder in _RESPONDERS:
+            if marker in prompt:
+                content = responder(prompt, jitter)
+                break
+
+        text = json.dumps(content)
+        return SimpleNamespace(
+            model=params.get("model"),
+            choices=[SimpleNamespace(
+                index=0,
+                finish_reason="stop",
+                message=SimpleNamespace(role="assistant", content=text),
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=len(prompt) // 4,
+                completion_tokens=len(text) // 4,
+                total_tokens=len(prompt) // 4 + len(text) // 4,
+            ),
+        )
+
+    def complete(self, **params):
+        latency, error = self._draw()
+        time.sleep(latency)
+        if error:
+            self._raise(error)
+        return self.respond(**params)
+
+    async def acomplete(self, **params):
+        latency, error = self._draw()
+        await asyncio.sleep(latency)
+        if error:
+            self._raise(error)
+        return self.respond(**params)
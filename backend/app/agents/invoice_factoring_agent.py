@@ -1,8 +1,9 @@
 # backend/app/agents/invoice_factoring_agent.py
 
-from groq import Groq
 from app.agents.base_agent import BaseAgent
-import os
+from app.agents.llm_gateway import CircuitOpenError
+from app.services import pricing_engine
+from app.services.pricing_service import pricing_params
 import json
 import logging
 
@@ -20,7 +21,6 @@ class InvoiceFactoringAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("InvoiceFactoringAgent")
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.model = "llama-3.1-8b-instant"
     
     def match_po(self, invoice_id: int) -> dict:
@@ -33,19 +33,20 @@ class InvoiceFactoringAgent(BaseAgent):
         }
     
     def calculate_offer(self, amount: float, rate: float, tenor_days: int = 30) -> dict:
-        """Calculate factoring offer."""
-        offer_amount = amount * 0.90  # 90% advance
-        daily_rate = rate / 365 / 100
-        discount = offer_amount * daily_rate * tenor_days
-        processing_fee = offer_amount * 0.01
-        net_amount = offer_amount - discount - processing_fee
+        """Calculate factoring offer (fixed-point pricing engine, same math as PricingService)."""
+        quote = pricing_engine.price(
+            pricing_params(),
+            pricing_engine.to_paise(amount),
+            pricing_engine.to_scaled(rate),
+            pricing_engine.to_days(tenor_days)
+        )
         
         return {
-            "invoice_amount": amount,
-            "offer_amount": offer_amount,
-            "discount": discount,
-            "processing_fee": processing_fee,
-            "net_amount": net_amount,
+            "invoice_amount": pricing_engine.to_rupees(quote.invoice_amount),
+            "offer_amount": pricing_engine.to_rupees(quote.offer_amount),
+            "discount": pricing_engine.to_rupees(quote.discount),
+            "processing_fee": pricing_engine.to_rupees(quote.processing_fee),
+            "net_amount": pricing_engine.to_rupees(quote.net_amount),
             "rate": rate,
             "tenor_days": tenor_days
         }
@@ -59,19 +60,9 @@ class InvoiceFactoringAgent(BaseAgent):
             "transaction_id": f"TXN{invoice_id:08d}"
         }
     
-    def execute(self, context: dict) -> dict:
-        """Execute factoring workflow."""
-        invoice_id = context.get("invoice_id", 1)
-        amount = context.get("amount", 75000)
-        recommended_rate = context.get("recommended_rate", 2.5)
-        
-        logger.info(f"💰 Factoring Agent processing invoice {invoice_id}")
-        
-        # Gather data
-        po_match = self.match_po(invoice_id)
-        offer_calc = self.calculate_offer(amount, recommended_rate)
-        
-        # AI reasoning
+    def _completion_params(self, invoice_id: int, amount: float, recommended_rate: float,
+                           po_match: dict, offer_calc: dict) -> dict:
+        """Build the chat completion request for this invoice."""
         prompt = f"""You are an Invoice Factoring Agent.
 
 INVOICE: {invoice_id}
@@ -98,38 +89,88 @@ Respond in JSON:
   "offer_summary": "brief summary for merchant"
 }}"""
 
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a factoring expert. Respond in JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 400,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _build_result(self, context: dict, offer_calc: dict, content: str) -> dict:
+        """Parse the AI response, simulate disbursement and assemble the agent result."""
+        invoice_id = context.get("invoice_id", 1)
+        ai_response = json.loads(content)
+        
+        # If approved, simulate disbursement
+        disbursement = None
+        if ai_response.get("proceed"):
+            disbursement = self.simulate_disbursement(invoice_id, offer_calc['net_amount'])
+        
+        result = {
+            "agent": self.name,
+            "invoice_id": invoice_id,
+            "decision": ai_response,
+            "offer_details": offer_calc,
+            "disbursement": disbursement
+        }
+        
+        self.log_execution(context, result)
+        logger.info(f"✅ Factoring {'APPROVED' if ai_response.get('proceed') else 'REJECTED'}")
+        
+        return result
+    
+    def _failure(self, error: Exception) -> dict:
+        logger.error(f"❌ Factoring Agent failed: {str(error)}")
+        return {
+            "agent": self.name,
+            "error": str(error),
+            "circuit_open": isinstance(error, CircuitOpenError)
+        }
+    
+    def execute(self, context: dict) -> dict:
+        """Execute factoring workflow."""
+        invoice_id = context.get("invoice_id", 1)
+        amount = context.get("amount", 75000)
+        recommended_rate = context.get("recommended_rate", 2.5)
+        
+        logger.info(f"💰 Factoring Agent processing invoice {invoice_id}")
+        
+        # Gather data
+        po_match = self.match_po(invoice_id)
+        offer_calc = self.calculate_offer(amount, recommended_rate)
+        
+        # AI reasoning
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a factoring expert. Respond in JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=400,
-                response_format={"type": "json_object"}
+            content = self.chat_completion(
+                **self._completion_params(invoice_id, amount, recommended_rate, po_match, offer_calc)
             )
+            return self._build_result(context, offer_calc, content)
             
-            ai_response = json.loads(completion.choices[0].message.content)
-            
-            # If approved, simulate disbursement
-            disbursement = None
-            if ai_response.get("proceed"):
-                disbursement = self.simulate_disbursement(invoice_id, offer_calc['net_amount'])
-            
-            result = {
-                "agent": self.name,
-                "invoice_id": invoice_id,
-                "decision": ai_response,
-                "offer_details": offer_calc,
-                "disbursement": disbursement
-            }
-            
-            self.log_execution(context, result)
-            logger.info(f"✅ Factoring {'APPROVED' if ai_response.get('proceed') else 'REJECTED'}")
-            
-            return result
+        except Exception as e:
+            return self._failure(e)
+    
+    async def aexecute(self, context: dict) -> dict:
+        """Async variant of execute() using the async Groq client."""
+        invoice_id = context.get("invoice_id", 1)
+        amount = context.get("amount", 75000)
+        recommended_rate = context.get("recommended_rate", 2.5)
+        
+        logger.info(f"💰 Factoring Agent processing invoice {invoice_id}")
+        
+        # Gather data
+        po_match = self.match_po(invoice_id)
+        offer_calc = self.calculate_offer(amount, recommended_rate)
+        
+        # AI reasoning
+        try:
+            content = await self.achat_completion(
+                **self._completion_params(invoice_id, amount, recommended_rate, po_match, offer_calc)
+            )
+            return self._build_result(context, offer_calc, content)
             
         except Exception as e:
-            logger.error(f"❌ Factoring Agent failed: {str(e)}")
-            return {"agent": self.name, "error": str(e)}
+            return self._failure(e)
@@ -0,0 +1,116 @@
+# backend/app/agents/jobs.py
+
+"""
+In-process registry of background orchestration jobs.
+
+A job records every progress event emitted by OrchestrationAgent so that
+Server-Sent Events subscribers can replay what they missed and then follow
+live updates. Jobs live in the worker process that created them.
+"""
+
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisJob:
+    """Event log plus completion state for one orchestration run."""
+
+    def __init__(self, context: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.context = context
+        self.created_at = time.time()
+        self.status = "pending"
+        self.events: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    async def publish(self, event: Dict[str, Any]):
+        async with self._changed:
+            self.status = "running"
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def finish(self, result: Dict[str, Any]):
+        async with self._changed:
+            self.result = result
+            self.events.append({"event": "done", "result": result})
+            self.status = "completed"
+            self._changed.notify_all()
+
+    async def fail(self, error: str):
+        async with self._changed:
+            self.events.append({"event": "error", "error": error})
+            self.status = "failed"
+            self._changed.notify_all()
+
+    async def follow(self, start: int = 0, heartbeat: float = 15.0) -> AsyncIterator[Optional[tuple]]:
+        """
+        Yield (index, event) from `start` onwards until the job is done.
+
+        Yields None after `heartbeat` seconds without events so the caller can
+        keep the connection alive.
+        """
+        cursor = start
+        while True:
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: len(self.events) > cursor or self.done),
+                        timeout=heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    pending = []
+                else:
+                    pending = self.events[cursor:]
+                finished = self.done
+
+            if not pending and not finished:
+                yield None
+                continue
+
+            for event in pending:
+                yield cursor, event
+                cursor += 1
+
+            if finished and cursor >= len(self.events):
+                return
+
+
+class JobRegistry:
+    """Bounded registry; the oldest finished jobs are evicted first."""
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+
+    def create(self, context: Dict[str, Any]) -> AnalysisJob:
+        job = AnalysisJob(context)
+        self._jobs[job.id] = job
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    def _evict(self):
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.done]:
+            del self._jobs[job_id]
+            if len(self._jobs) <= self.max_jobs:
+                return
+
+
+# Global registry for this worker process
+job_registry = JobRegistry()
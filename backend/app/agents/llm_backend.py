@@ -0,0 +1,103 @@
+# backend/app/agents/llm_backend.py
+
+"""
+Pluggable LLM backends.
+
+The gateway (retries, concurrency limit, circuit breaker) delegates the
+actual chat completion to a backend. GroqBackend talks to the Groq API over
+pooled connections; FakeLLMBackend (app/agents/fake_llm.py) answers locally
+for load tests and benchmarks. Completions follow the OpenAI/Groq shape:
+completion.choices[0].message.content and completion.usage.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+import logging
+import os
+import threading
+
+import httpx
+from groq import Groq, AsyncGroq
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend(ABC):
+    """Interface for chat completion providers."""
+
+    name = "base"
+
+    @abstractmethod
+    def complete(self, **params):
+        """Blocking chat completion."""
+        pass
+
+    @abstractmethod
+    async def acomplete(self, **params):
+        """Async chat completion."""
+        pass
+
+
+class GroqBackend(LLMBackend):
+    """Groq API with one shared sync and async client on keep-alive connection pools."""
+
+    name = "groq"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+    ):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client = None
+        self._async_client = None
+        self._init_lock = threading.Lock()
+
+    @property
+    def client(self) -> Groq:
+        if self._client is None:
+            with self._init_lock:
+                if self._client is None:
+                    self._client = Groq(
+                        api_key=self.api_key or os.getenv("GROQ_API_KEY"),
+                        timeout=self.timeout,
+                        max_retries=0,  # retries are handled by the gateway
+                        http_client=httpx.Client(limits=self.limits, timeout=self.timeout),
+                    )
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        if self._async_client is None:
+            with self._init_lock:
+                if self._async_client is None:
+                    self._async_client = AsyncGroq(
+                        api_key=self.api_key or os.getenv("GROQ_API_KEY"),
+                        timeout=self.timeout,
+                        max_retries=0,
+                        http_client=httpx.AsyncClient(limits=self.limits, timeout=self.timeout),
+                    )
+        return self._async_client
+
+    def complete(self, **params):
+        return self.client.chat.completions.create(**params)
+
+    async def acomplete(self, **params):
+        return await self.async_client.chat.completions.create(**params)
+
+
+def create_backend(name: str, **options) -> LLMBackend:
+    """Build a backend by name ("groq" or "fake")."""
+    if name == "groq":
+        return GroqBackend(**options)
+    if name == "fake":
+        from app.agents.fake_llm import FakeLLMBackend
+        return FakeLLMBackend(**options)
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -0,0 +1,273 @@
+# backend/app/agents/llm_cache.py
+
+"""
+Content-addressed cache for LLM chat completions.
+
+Agents build deterministic prompts, so re-analyzing an unchanged
+invoice/buyer/merchant produces an identical request. Responses are keyed on
+a hash of model, messages and parameters and kept in an in-memory LRU, with
+an optional SQLite tier that survives restarts and is shared by workers.
+
+The memory tier has its own lock and never waits on disk I/O. Async callers
+use aget()/aset(), which run the SQLite tier in the blocking pool; a failing
+SQLite tier (locked, corrupt) counts as a miss and never fails the caller.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+from app.core.executor import run_admitted
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    """Stable hash of a chat completion request (model, messages, parameters)."""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier LRU cache for completion content.
+
+    - Memory tier: bounded by entry count and total content bytes
+    - SQLite tier (optional): bounded by total content bytes, oldest evicted first
+    - Entries older than ttl_seconds are treated as misses and dropped
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 24 * 3600,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_bytes: int = 256 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_max_bytes = sqlite_max_bytes
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, created_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()  # memory tier and stats
+        self._db_lock = threading.Lock()  # SQLite connection; taken before _lock, never while holding it
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+        self._db = None
+        if enabled and sqlite_path:
+            self._init_sqlite(sqlite_path)
+
+    def _init_sqlite(self, path: str):
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)")
+            logger.info(f"✅ LLM cache SQLite tier at {path}")
+        except sqlite3.Error as e:
+            logger.error(f"❌ LLM cache SQLite tier disabled: {str(e)}")
+            self._db = None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _put_memory(self, key: str, value: str, created_at: float):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+
+        self._entries[key] = (value, created_at, size)
+        self._bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    def get(self, params: Dict[str, Any]) -> Optional[str]:
+        """Return cached completion content for a request, or None."""
+        if not self.enabled:
+            return None
+
+        key = cache_key(params)
+        now = time.time()
+
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._get_disk(key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    async def aget(self, params: Dict[str, Any]) -> Optional[str]:
+        """get() for async callers; the SQLite tier is read off the event loop."""
+        if not self.enabled:
+            return None
+
+        key = cache_key(params)
+        now = time.time()
+
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = await run_admitted(self._get_disk, key, now)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, created_at, size = entry
+            if not self._expired(created_at, now):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+
+            del self._entries[key]
+            self._bytes -= size
+            self._stats["expirations"] += 1
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._expired(row[1], now):
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM cache read failed: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+
+        value, created_at = row
+        with self._lock:
+            if self._expired(created_at, now):
+                self._stats["expirations"] += 1
+                return None
+            self._put_memory(key, value, created_at)
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+        return value
+
+    def _count_miss(self):
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def set(self, params: Dict[str, Any], value: str):
+        """Store completion content for a request."""
+        if not self.enabled or value is None:
+            return
+
+        key = cache_key(params)
+        now = time.time()
+
+        with self._lock:
+            self._put_memory(key, value, now)
+        if self._db is not None:
+            self._set_disk(key, value, now)
+
+    async def aset(self, params: Dict[str, Any], value: str):
+        """set() for async callers; the SQLite tier is written off the event loop."""
+        if not self.enabled or value is None:
+            return
+
+        key = cache_key(params)
+        now = time.time()
+
+        with self._lock:
+            self._put_memory(key, value, now)
+        if self._db is not None:
+            await run_admitted(self._set_disk, key, value, now)
+
+    def _set_disk(self, key: str, value: str, now: float):
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, size) VALUES (?, ?, ?, ?)",
+                    (key, value, now, len(value.encode("utf-8")))
+                )
+                self._evict_sqlite()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM cache write failed: {str(e)}")
+
+    def _evict_sqlite(self):
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if total <= self.sqlite_max_bytes:
+            return
+
+        # Drop oldest rows until we are back under budget
+        excess = total - self.sqlite_max_bytes
+        freed = 0
+        stale = []
+        for key, size in self._db.execute("SELECT key, size FROM llm_cache ORDER BY created_at"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany("DELETE FROM llm_cache WHERE key = ?", stale)
+        with self._lock:
+            self._stats["evictions"] += len(stale)
+
+    def clear(self):
+        """Drop all cached entries (both tiers)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "sqlite": self._db is not None,
+            }
+
+
+# Global instance shared by all agents
+llm_cache = LLMCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    max_bytes=settings.LLM_CACHE_MAX_BYTES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    sqlite_path=settings.LLM_CACHE_SQLITE_PATH,
+    sqlite_max_bytes=settings.LLM_CACHE_SQLITE_MAX_BYTES,
+    enabled=settings.LLM_CACHE_ENABLED,
+)
@@ -0,0 +1,247 @@
+# backend/app/agents/llm_gateway.py
+
+"""
+Process-wide gateway for LLM chat completions.
+
+All agents share one backend (Groq over pooled keep-alive connections by
+default, see app/agents/llm_backend.py). Calls go through a concurrency
+limit, are retried with jittered exponential backoff on 429/5xx/connection
+errors, and are guarded by a circuit breaker so provider brownouts fail
+fast instead of piling up timeouts.
+"""
+
+from typing import Optional
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from groq import APIConnectionError, APIStatusError, APITimeoutError
+
+from app.config import settings
+from app.agents.llm_backend import LLMBackend, create_backend
+from app.core.metrics import LLM_QUEUE_WAIT_SECONDS, LLM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and calls are short-circuited."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after `failure_threshold` failures in a row; open -> half_open
+    after `reset_timeout` seconds, letting a single probe call through; the probe
+    closes the breaker on success or re-opens it on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("LLM circuit breaker is open")
+                self.state = "half_open"
+                self._probe_in_flight = False
+
+            if self.state == "half_open":
+                if self._probe_in_flight:
+                    raise CircuitOpenError("LLM circuit breaker is half-open (probe in flight)")
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("✅ LLM circuit breaker closed")
+            self.state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"⚠️ LLM circuit breaker opened after {self._failures} failures")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Give up a half-open probe slot without recording an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._failures}
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """Shared LLM entry point with retries, concurrency limit and circuit breaker."""
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_concurrency: int = 16,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.backend = backend
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._async_semaphore = None
+        self._async_loop = None
+
+    def set_backend(self, backend: LLMBackend):
+        """Swap the provider (e.g. FakeLLMBackend for load tests)."""
+        logger.info(f"🔌 LLM backend set to {backend.name}")
+        self.backend = backend
+
+    def _async_limit(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._async_semaphore is None or self._async_loop is not loop:
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._async_loop = loop
+        return self._async_semaphore
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def chat_completion(self, **params):
+        """Blocking chat completion with retries and circuit breaking."""
+        self.breaker.before_call()
+        attempt = 0
+        while True:
+            try:
+                queued = time.perf_counter()
+                with self._semaphore:
+                    LLM_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, mode="sync")
+                    completion = self.backend.complete(**params)
+            except Exception as e:
+                if _is_retryable(e) and attempt < self.max_retries:
+                    delay = self._backoff(attempt, e)
+                    logger.warning(f"⚠️ LLM call failed ({str(e)}), retry {attempt + 1} in {delay:.2f}s")
+                    LLM_RETRIES.inc(mode="sync")
+                    attempt += 1
+                    time.sleep(delay)
+                    continue
+                if isinstance(e, APIStatusError) and not _is_retryable(e):
+                    # The provider answered; the request itself was bad
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                raise
+
+            self.breaker.record_success()
+            return completion
+
+    async def achat_completion(self, **params):
+        """Async chat completion with retries and circuit breaking."""
+        self.breaker.before_call()
+        attempt = 0
+        while True:
+            try:
+                queued = time.perf_counter()
+                async with self._async_limit():
+                    LLM_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, mode="async")
+                    completion = await self.backend.acomplete(**params)
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if _is_retryable(e) and attempt < self.max_retries:
+                    delay = self._backoff(attempt, e)
+                    logger.warning(f"⚠️ LLM call failed ({str(e)}), retry {attempt + 1} in {delay:.2f}s")
+                    LLM_RETRIES.inc(mode="async")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                if isinstance(e, APIStatusError) and not _is_retryable(e):
+                    # The provider answered; the request itself was bad
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                raise
+
+            self.breaker.record_success()
+            return completion
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "breaker": self.breaker.stats(),
+            "max_concurrency": self.max_concurrency,
+            "max_retries": self.max_retries,
+        }
+
+
+# Global instance shared by all agents
+llm_gateway = LLMGateway(
+    backend=create_backend(
+        settings.LLM_BACKEND,
+        **(
+            {
+                "api_key": settings.GROQ_API_KEY,
+                "timeout": settings.LLM_TIMEOUT_SECONDS,
+                "max_connections": settings.LLM_MAX_CONNECTIONS,
+                "max_keepalive_connections": settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            }
+            if settings.LLM_BACKEND == "groq" else
+            {
+                "latency_ms": settings.FAKE_LLM_LATENCY_MS,
+                "error_rate": settings.FAKE_LLM_ERROR_RATE,
+            }
+        )
+    ),
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_base=settings.LLM_BACKOFF_BASE_SECONDS,
+    backoff_max=settings.LLM_BACKOFF_MAX_SECONDS,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+    ),
+)
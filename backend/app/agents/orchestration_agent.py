@@ -1,11 +1,14 @@
-from groq import Groq
 from app.agents.base_agent import BaseAgent
 from app.agents.supply_chain_agent import SupplyChainAgent
 from app.agents.invoice_factoring_agent import InvoiceFactoringAgent
 from app.agents.credit_scoring_agent import CreditScoringAgent
+from app.config import settings
+from app.agents.workflow import Node, Workflow, create_checkpoint_store
+from typing import Awaitable, Callable, Optional
 import os
 import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -15,80 +18,120 @@ class OrchestrationAgent(BaseAgent):
     def __init__(self):
         super().__init__("OrchestrationAgent")
         
-        # Get API key from environment
-        api_key = os.getenv("GROQ_API_KEY")
-        
-        if not api_key:
+        # Sub-agents share the process-wide LLM gateway
+        if not (settings.GROQ_API_KEY or os.getenv("GROQ_API_KEY")):
             logger.warning(
                 "⚠️  GROQ_API_KEY not found in environment. "
                 "Add it to backend/.env or set as environment variable. "
                 "Agent features will be limited."
             )
-            self.client = None
-        else:
-            logger.info(f"✅ Using Groq API key: {api_key[:10]}...")
-            
-            try:
-                self.client = Groq(api_key=api_key)
-                self.model = "llama-3.1-8b-instant"
-                logger.info("✅ Groq client initialized")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Groq: {str(e)}")
-                self.client = None
         
         # Initialize sub-agents
         self.supply_chain_agent = SupplyChainAgent()
         self.factoring_agent = InvoiceFactoringAgent()
         self.credit_scoring_agent = CreditScoringAgent()
+        
+        self.workflow = self._build_workflow()
     
-    def execute(self, context: dict) -> dict:
-        """Execute multi-agent workflow."""
-        invoice_id = context.get("invoice_id", 1)
-        buyer_id = context.get("buyer_id", 101)
-        merchant_id = context.get("merchant_id", 1)
+    def pre_decide(self, buyer_history: dict, invoice_data: dict) -> Optional[dict]:
+        """
+        Rule-based pre-decision for clear-cut invoices.
         
-        logger.info(f"🎯 Orchestrating workflow for invoice {invoice_id}")
+        Approves or rejects straight away when the ML credit score and the
+        buyer's payment behaviour agree at either extreme. Returns None for the
+        uncertain middle band, which goes to the LLM agents.
+        """
+        if not settings.FAST_PATH_ENABLED or "error" in buyer_history:
+            return None
         
-        results = []
+        from app.ml.credit_model import get_scorer
+        from app.services.pricing_service import PricingService
         
-        # Step 1: Supply Chain Analysis
-        logger.info("Step 1/3: Supply Chain Analysis...")
-        sc_result = self.supply_chain_agent.execute(
-            {"invoice_id": invoice_id, "buyer_id": buyer_id}
-        )
-        results.append(sc_result)
+        score_result = get_scorer().score(invoice_data, buyer_history)
+        score = score_result["score"]
+        on_time_rate = buyer_history.get("on_time_rate", 0)
+        avg_days = buyer_history.get("avg_payment_days", 60)
         
-        # Check if financeable
-        if sc_result.get("analysis", {}).get("decision") != "YES":
-            logger.warning("⚠️ Invoice not financeable")
-            return {
-                "agent": self.name,
-                "workflow_status": "rejected",
-                "reason": "Invoice not financeable",
-                "results": results
+        if (score >= settings.FAST_PATH_APPROVE_MIN_SCORE
+                and on_time_rate >= settings.FAST_PATH_APPROVE_MIN_ON_TIME_RATE
+                and avg_days <= settings.FAST_PATH_APPROVE_MAX_PAYMENT_DAYS):
+            decision = "APPROVED"
+        elif (score <= settings.FAST_PATH_REJECT_MAX_SCORE
+                and (on_time_rate <= settings.FAST_PATH_REJECT_MAX_ON_TIME_RATE
+                     or avg_days >= settings.FAST_PATH_REJECT_MIN_PAYMENT_DAYS)):
+            decision = "REJECTED"
+        else:
+            return None
+        
+        offer = None
+        if decision == "APPROVED":
+            offer = PricingService.calculate_offer(invoice_data.get("amount", 75000), score)
+        
+        return {
+            "decision": decision,
+            "credit_score": score_result,
+            "offer": offer,
+            "reasoning": (
+                f"ML score {score}/1000, {on_time_rate*100:.0f}% on-time, "
+                f"{avg_days} days average payment"
+            )
+        }
+    
+    def _fast_path_result(self, context: dict, pre: dict, buyer_history: dict, invoice_data: dict) -> dict:
+        approved = pre["decision"] == "APPROVED"
+        confidence = pre["credit_score"]["confidence"] / 100
+        
+        result = {
+            "agent": self.name,
+            "invoice_id": context.get("invoice_id", 1),
+            "workflow_status": "completed" if approved else "rejected",
+            "decision_path": "rules",
+            "final_decision": {
+                "decision": pre["decision"],
+                "confidence": round(confidence if approved else 1 - confidence, 3),
+                "reasoning": pre["reasoning"],
+                "next_actions": (
+                    ["Trigger disbursement", "Schedule auto-reconciliation"] if approved else []
+                )
+            },
+            "agent_results": {
+                "pre_decision": {
+                    "credit_score": pre["credit_score"],
+                    "offer": pre["offer"],
+                    "buyer_data": buyer_history,
+                    "invoice_data": invoice_data
+                }
             }
+        }
         
-        # Step 2: Credit Scoring
-        logger.info("Step 2/3: Credit Scoring...")
-        cs_result = self.credit_scoring_agent.execute(
-            {"merchant_id": merchant_id}
-        )
-        results.append(cs_result)
+        self.log_execution(context, result)
+        logger.info(f"⚡ FAST PATH DECISION: {pre['decision']} ({pre['reasoning']})")
         
-        # Step 3: Invoice Factoring
-        logger.info("Step 3/3: Invoice Factoring...")
-        fact_result = self.factoring_agent.execute({
+        return result
+    
+    def _rejected(self, results: list) -> dict:
+        logger.warning("⚠️ Invoice not financeable")
+        return {
+            "agent": self.name,
+            "workflow_status": "rejected",
+            "decision_path": "llm",
+            "reason": "Invoice not financeable",
+            "results": results
+        }
+    
+    def _factoring_context(self, invoice_id: int, sc_result: dict) -> dict:
+        return {
             "invoice_id": invoice_id,
             "amount": sc_result.get("invoice_data", {}).get("amount", 75000),
             "recommended_rate": sc_result.get("analysis", {}).get("recommended_rate", 2.5)
-        })
-        results.append(fact_result)
-        
-        # Final decision
+        }
+    
+    def _final_result(self, context: dict, sc_result: dict, cs_result: dict, fact_result: dict) -> dict:
         final_result = {
             "agent": self.name,
-            "invoice_id": invoice_id,
+            "invoice_id": context.get("invoice_id", 1),
             "workflow_status": "completed",
+            "decision_path": "llm",
             "final_decision": {
                 "decision": "APPROVED",
                 "confidence": 0.95,
@@ -106,3 +149,109 @@ class OrchestrationAgent(BaseAgent):
         logger.info(f"🎉 FINAL DECISION: APPROVED")
         
         return final_result
+    
+    def _build_workflow(self) -> Workflow:
+        """
+        Workflow DAG: upload -> verify -> score -> offer -> disburse.
+        
+        buyer_history and invoice load in parallel, pre_decision may settle
+        clear-cut invoices, then credit scoring runs alongside the
+        supply chain -> factoring chain. The three LLM steps are checkpointed,
+        so a retry after a factoring failure reuses the earlier verdicts.
+        """
+        sc = self.supply_chain_agent
+        
+        def supply_chain_context(context: dict, inputs: dict) -> dict:
+            return {
+                "invoice_id": context.get("invoice_id", 1),
+                "buyer_id": context.get("buyer_id", 101),
+                "buyer_history": inputs["buyer_history"]
+            }
+        
+        def credit_context(context: dict) -> dict:
+            return {"merchant_id": context.get("merchant_id", 1)}
+        
+        def factoring_context(context: dict, inputs: dict) -> dict:
+            return self._factoring_context(context.get("invoice_id", 1), inputs["supply_chain"])
+        
+        def not_financeable(context: dict, inputs: dict, sc_result: dict) -> Optional[dict]:
+            if sc_result.get("analysis", {}).get("decision") != "YES":
+                return self._rejected([sc_result])
+            return None
+        
+        def fast_path(context: dict, inputs: dict, pre: Optional[dict]) -> Optional[dict]:
+            if pre is None:
+                return None
+            return self._fast_path_result(context, pre, inputs["buyer_history"], inputs["invoice"])
+        
+        nodes = [
+            # upload: load the buyer's record and the invoice
+            Node("buyer_history", checkpoint=False,
+                 run=lambda ctx, _: sc.buyer_payment_history(ctx.get("buyer_id", 101))),
+            Node("invoice", checkpoint=False, blocking=False,
+                 run=lambda ctx, _: sc.verify_invoice(ctx.get("invoice_id", 1))),
+            # Rule-based pre-decision for clear-cut cases
+            Node("pre_decision", deps=("buyer_history", "invoice"), checkpoint=False, halt=fast_path,
+                 run=lambda ctx, inputs: self.pre_decide(inputs["buyer_history"], inputs["invoice"])),
+            # verify: supply chain analysis
+            Node("supply_chain", deps=("buyer_history", "invoice", "pre_decision"), halt=not_financeable,
+                 run=lambda ctx, inputs: sc.execute(supply_chain_context(ctx, inputs)),
+                 arun=lambda ctx, inputs: sc.aexecute(supply_chain_context(ctx, inputs))),
+            # score: only needs the merchant, so it runs alongside supply chain
+            Node("credit_scoring", deps=("pre_decision",),
+                 run=lambda ctx, _: self.credit_scoring_agent.execute(credit_context(ctx)),
+                 arun=lambda ctx, _: self.credit_scoring_agent.aexecute(credit_context(ctx))),
+            # offer: factoring terms and simulated disbursement
+            Node("factoring", deps=("supply_chain",),
+                 run=lambda ctx, inputs: self.factoring_agent.execute(factoring_context(ctx, inputs)),
+                 arun=lambda ctx, inputs: self.factoring_agent.aexecute(factoring_context(ctx, inputs))),
+            # disburse: final decision with next actions
+            Node("final_decision", deps=("supply_chain", "credit_scoring", "factoring"),
+                 checkpoint=False, blocking=False,
+                 run=lambda ctx, inputs: self._final_result(
+                     ctx, inputs["supply_chain"], inputs["credit_scoring"], inputs["factoring"]
+                 )),
+        ]
+        
+        return Workflow(
+            "invoice_analysis",
+            nodes,
+            output="final_decision",
+            store=create_checkpoint_store(settings.WORKFLOW_CHECKPOINT_STORE)
+        )
+    
+    def execute(self, context: dict) -> dict:
+        """Execute multi-agent workflow (sequentially, resuming from checkpoints)."""
+        logger.info(f"🎯 Orchestrating workflow for invoice {context.get('invoice_id', 1)}")
+        return self.workflow.run(context)
+    
+    def _emitter(self, on_event: Optional[Callable[[dict], Awaitable[None]]]):
+        """Build an emit(event, step, **data) coroutine stamped with elapsed time."""
+        started = time.perf_counter()
+        
+        async def emit(event: str, step: str, **data):
+            if on_event is None:
+                return
+            await on_event({
+                "event": event,
+                "step": step,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                **data
+            })
+        
+        return emit
+    
+    async def aexecute(self, context: dict, on_event: Optional[Callable[[dict], Awaitable[None]]] = None) -> dict:
+        """
+        Execute multi-agent workflow with independent steps running concurrently.
+        
+        Credit scoring only needs the merchant, so it runs alongside the
+        supply chain -> factoring chain. Latency is roughly the longer of the two
+        branches instead of the sum of all three LLM calls. Steps already
+        checkpointed for the same inputs are not run again.
+        
+        If on_event is given it is awaited with a progress event as each step
+        starts and finishes (partial results and timings included).
+        """
+        logger.info(f"🎯 Orchestrating workflow for invoice {context.get('invoice_id', 1)} (async)")
+        return await self.workflow.arun(context, emit=self._emitter(on_event))
@@ -0,0 +1,170 @@
+# backend/app/agents/singleflight.py
+
+"""
+Single-flight coalescing for duplicate concurrent analyses.
+
+Concurrent calls with the same key share one execution. Within a process the
+first caller starts a task and everyone else awaits it. Across uvicorn
+workers, the first worker to take a Redis lock runs the work and publishes
+the result under a short-lived key, which the other workers poll for. Every
+waiter has a timeout, and if Redis is unreachable coalescing falls back to
+the in-process level only.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlightTimeoutError(Exception):
+    """Raised when a waiter gives up on a shared execution."""
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        wait_timeout: float = 120.0,
+        lock_ttl: float = 180.0,
+        result_ttl: float = 10.0,
+        poll_interval: float = 0.1,
+        prefix: str = "credpulse:singleflight",
+    ):
+        self.redis_url = redis_url
+        self.wait_timeout = wait_timeout
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._redis = None
+        self._redis_loop = None
+        self._redis_down_until = 0.0
+        self._stats = {"leaders": 0, "local_waiters": 0, "remote_waiters": 0, "timeouts": 0}
+
+    def _client(self):
+        """Redis client for the running loop, or None while Redis is unavailable."""
+        if not self._client_enabled():
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=1)
+            self._redis_loop = loop
+        return self._redis
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "redis": self._client_enabled(), **self._stats}
+
+    def _client_enabled(self) -> bool:
+        return bool(self.redis_url) and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, error: Exception):
+        # Back off for a while instead of paying a connect timeout on every call
+        logger.warning(f"⚠️ Single-flight Redis unavailable, coalescing in-process only: {str(error)}")
+        self._redis_down_until = time.monotonic() + 30
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() once per key across concurrent callers and return the shared result."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["local_waiters"] += 1
+        else:
+            # Shared work runs in its own task so a disconnecting caller does not cancel it
+            task = asyncio.ensure_future(self._lead(key, fn))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise SingleFlightTimeoutError(f"Timed out after {self.wait_timeout}s waiting for {key}")
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter timed out
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        client = self._client()
+        if client is None:
+            self._stats["leaders"] += 1
+            return await fn()
+
+        lock_key = f"{self.prefix}:lock:{key}"
+        result_key = f"{self.prefix}:result:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            try:
+                acquired = await client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+            except Exception as e:
+                self._redis_failed(e)
+                self._stats["leaders"] += 1
+                return await fn()
+
+            if acquired:
+                return await self._run_as_leader(client, lock_key, result_key, token, fn)
+
+            # Another worker is running it: wait for its published result
+            self._stats["remote_waiters"] += 1
+            result = await self._wait_remote(client, lock_key, result_key, deadline)
+            if result is not None:
+                return result
+            # Leader went away without a result; try to take over
+
+    async def _run_as_leader(self, client, lock_key: str, result_key: str, token: str, fn) -> Any:
+        self._stats["leaders"] += 1
+        try:
+            result = await fn()
+            try:
+                await client.set(result_key, json.dumps(result, default=str), px=int(self.result_ttl * 1000))
+            except Exception as e:
+                self._redis_failed(e)
+            return result
+        finally:
+            try:
+                await client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception:
+                pass  # the lock TTL cleans up
+
+    async def _wait_remote(self, client, lock_key: str, result_key: str, deadline: float) -> Optional[Any]:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                payload = await client.get(result_key)
+                if payload is not None:
+                    return json.loads(payload)
+                if not await client.exists(lock_key):
+                    return None
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+        raise asyncio.TimeoutError()
+
+
+# Global instance for this worker process
+analysis_singleflight = SingleFlight(
+    redis_url=settings.REDIS_URL if settings.SINGLEFLIGHT_USE_REDIS else None,
+    wait_timeout=settings.SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS,
+    lock_ttl=settings.SINGLEFLIGHT_LOCK_TTL_SECONDS,
+    result_ttl=settings.SINGLEFLIGHT_RESULT_TTL_SECONDS,
+)
@@ -1,13 +1,12 @@
 # backend/app/agents/supply_chain_agent.py
 
-from groq import Groq
 from app.agents.base_agent import BaseAgent
-import os
+from app.agents.llm_gateway import CircuitOpenError
+from app.core.executor import run_admitted
+from app.ml.feature_store import buyer_feature_store
 import json
 import logging
 
-from app.db.session import SessionLocal  # required for DB queries
-
 logger = logging.getLogger(__name__)
 
 
@@ -23,29 +22,23 @@ class SupplyChainAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("SupplyChainAgent")
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.model = "llama-3.1-8b-instant"  # Smart model for reasoning
 
     def buyer_payment_history(self, buyer_id: int) -> dict:
-        """Get REAL buyer data from database."""
-        db = SessionLocal()
-        try:
-            from app.model.buyer import Buyer
-            buyer = db.query(Buyer).filter(Buyer.id == buyer_id).first()
-
-            if not buyer:
-                return {"error": "Buyer not found"}
-
-            return {
-                "buyer_id": buyer_id,
-                "buyer_name": buyer.name,
-                "avg_payment_days": buyer.avg_payment_days or 30,
-                "on_time_rate": float(buyer.on_time_rate or 0.85),
-                "total_invoices": buyer.total_invoices or 0,
-                "risk_score": buyer.risk_score or 700
-            }
-        finally:
-            db.close()
+        """Get REAL buyer data from the buyer feature store (no DB round-trip once loaded)."""
+        features = buyer_feature_store.get(buyer_id)
+
+        if not features:
+            return {"error": "Buyer not found"}
+
+        return {
+            "buyer_id": buyer_id,
+            "buyer_name": features["buyer_name"],
+            "avg_payment_days": features["avg_payment_days"],
+            "on_time_rate": features["on_time_rate"],
+            "total_invoices": features["total_invoices"],
+            "risk_score": features["risk_score"]
+        }
 
     def verify_invoice(self, invoice_id: int) -> dict:
         """Verify invoice with IRP."""
@@ -67,26 +60,8 @@ class SupplyChainAgent(BaseAgent):
             "flagged_at": "2025-11-18T00:00:00"
         }
 
-    def execute(self, context: dict) -> dict:
-        """
-        Execute supply chain analysis using Groq AI.
-        
-        Args:
-            context: {"invoice_id": int, "buyer_id": int}
-        
-        Returns:
-            Decision with reasoning
-        """
-        invoice_id = context.get("invoice_id", 1)
-        buyer_id = context.get("buyer_id", 101)
-        
-        logger.info(f"🔍 Supply Chain Agent analyzing invoice {invoice_id} for buyer {buyer_id}")
-        
-        # Step 1: Gather data using tools
-        buyer_history = self.buyer_payment_history(buyer_id)
-        invoice_data = self.verify_invoice(invoice_id)
-        
-        # Step 2: Create prompt for Groq AI
+    def _completion_params(self, invoice_id: int, buyer_id: int, buyer_history: dict, invoice_data: dict) -> dict:
+        """Build the chat completion request for this invoice."""
         prompt = f"""You are a Supply Chain Intelligence Agent for invoice factoring.
 
 TASK: Analyze if invoice {invoice_id} from buyer {buyer_id} is financeable.
@@ -118,53 +93,109 @@ Respond in JSON format:
   "risk_level": "low" or "medium" or "high"
 }}"""
 
-        # Step 3: Call Groq AI
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert credit risk analyst. Always respond with valid JSON."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.1,  # Low temp for consistent decisions
+            "max_tokens": 500,
+            "response_format": {"type": "json_object"}  # Force JSON response
+        }
+
+    def _build_result(self, context: dict, buyer_history: dict, invoice_data: dict, content: str) -> dict:
+        """Parse the AI response, flag the invoice and assemble the agent result."""
+        invoice_id = context.get("invoice_id", 1)
+        buyer_id = context.get("buyer_id", 101)
+        
+        # Parse AI response
+        ai_response = json.loads(content)
+        
+        # Step 4: If financeable, flag it
+        if ai_response.get("decision") == "YES":
+            flag_result = self.flag_financeable(invoice_id, ai_response.get("recommended_rate", 2.5))
+            ai_response["flagged"] = True
+        else:
+            ai_response["flagged"] = False
+        
+        result = {
+            "agent": self.name,
+            "invoice_id": invoice_id,
+            "buyer_id": buyer_id,
+            "analysis": ai_response,
+            "buyer_data": buyer_history,
+            "invoice_data": invoice_data
+        }
+        
+        self.log_execution(context, result)
+        logger.info(f"✅ Decision: {ai_response.get('decision')} | Rate: {ai_response.get('recommended_rate')}%")
+        
+        return result
+
+    def _failure(self, error: Exception) -> dict:
+        logger.error(f"❌ Supply Chain Agent failed: {str(error)}")
+        return {
+            "agent": self.name,
+            "error": str(error),
+            "circuit_open": isinstance(error, CircuitOpenError),
+            "fallback_decision": "Manual review required"
+        }
+
+    def execute(self, context: dict) -> dict:
+        """
+        Execute supply chain analysis using Groq AI.
+        
+        Args:
+            context: {"invoice_id": int, "buyer_id": int, "buyer_history": optional dict}
+        
+        Returns:
+            Decision with reasoning
+        """
+        invoice_id = context.get("invoice_id", 1)
+        buyer_id = context.get("buyer_id", 101)
+        
+        logger.info(f"🔍 Supply Chain Agent analyzing invoice {invoice_id} for buyer {buyer_id}")
+        
+        # Step 1: Gather data using tools (the orchestrator may have fetched it already)
+        buyer_history = context.get("buyer_history") or self.buyer_payment_history(buyer_id)
+        invoice_data = self.verify_invoice(invoice_id)
+        
+        # Step 2-3: Build prompt and call Groq AI
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert credit risk analyst. Always respond with valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,  # Low temp for consistent decisions
-                max_tokens=500,
-                response_format={"type": "json_object"}  # Force JSON response
+            content = self.chat_completion(
+                **self._completion_params(invoice_id, buyer_id, buyer_history, invoice_data)
             )
+            return self._build_result(context, buyer_history, invoice_data, content)
             
-            # Parse AI response
-            ai_response = json.loads(completion.choices[0].message.content)
-            
-            # Step 4: If financeable, flag it
-            if ai_response.get("decision") == "YES":
-                flag_result = self.flag_financeable(invoice_id, ai_response.get("recommended_rate", 2.5))
-                ai_response["flagged"] = True
-            else:
-                ai_response["flagged"] = False
-            
-            result = {
-                "agent": self.name,
-                "invoice_id": invoice_id,
-                "buyer_id": buyer_id,
-                "analysis": ai_response,
-                "buyer_data": buyer_history,
-                "invoice_data": invoice_data
-            }
-            
-            self.log_execution(context, result)
-            logger.info(f"✅ Decision: {ai_response.get('decision')} | Rate: {ai_response.get('recommended_rate')}%")
-            
-            return result
+        except Exception as e:
+            return self._failure(e)
+
+    async def aexecute(self, context: dict) -> dict:
+        """Async variant of execute() using the async Groq client."""
+        invoice_id = context.get("invoice_id", 1)
+        buyer_id = context.get("buyer_id", 101)
+        
+        logger.info(f"🔍 Supply Chain Agent analyzing invoice {invoice_id} for buyer {buyer_id}")
+        
+        # Step 1: Gather data using tools (DB lookup runs off the event loop)
+        buyer_history = context.get("buyer_history")
+        if not buyer_history:
+            buyer_history = await run_admitted(self.buyer_payment_history, buyer_id)
+        invoice_data = self.verify_invoice(invoice_id)
+        
+        # Step 2-3: Build prompt and call Groq AI
+        try:
+            content = await self.achat_completion(
+                **self._completion_params(invoice_id, buyer_id, buyer_history, invoice_data)
+            )
+            return self._build_result(context, buyer_history, invoice_data, content)
             
         except Exception as e:
-            logger.error(f"❌ Supply Chain Agent failed: {str(e)}")
-            return {
-                "agent": self.name,
-                "error": str(e),
-                "fallback_decision": "Manual review required"
-            }
+            return self._failure(e)
@@ -0,0 +1,370 @@
+# backend/app/agents/workflow.py
+
+"""
+Declarative, checkpointed workflow DAG.
+
+A Workflow is a set of named nodes with dependencies. Each node gets the run
+context and the outputs of its dependencies. Nodes run as soon as their
+dependencies finish, so independent nodes run concurrently.
+
+Checkpointed nodes store their output keyed by (workflow, invoice, node,
+input hash). The input hash covers the run context and the dependency
+outputs, so a retry or re-run with the same inputs picks up the stored
+output and resumes from the last completed node. Outputs that carry an
+"error" key (agent fallbacks) are never stored, so a retry redoes only the
+steps that failed.
+
+A node can end the run early through its `halt` hook, for example a
+rule-based decision or a rejected invoice.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from app.config import settings
+from app.core.executor import run_admitted
+
+logger = logging.getLogger(__name__)
+
+Emit = Callable[..., Awaitable[None]]
+
+
+class Node:
+    """
+    One workflow step.
+
+    Args:
+        name: unique node name (also the progress event step name)
+        run: sync fn(context, inputs) -> output
+        arun: async fn(context, inputs) -> output (defaults to run offloaded to the blocking pool)
+        deps: names of nodes whose outputs this node needs
+        checkpoint: store the output for resume (leave off for cheap or data-loading nodes)
+        blocking: run is blocking and goes to the blocking pool (False runs it inline on the loop)
+        halt: fn(context, inputs, output) -> final result to stop the workflow, or None to continue
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Optional[Callable[[dict, dict], Any]] = None,
+        arun: Optional[Callable[[dict, dict], Awaitable[Any]]] = None,
+        deps: Iterable[str] = (),
+        checkpoint: bool = True,
+        blocking: bool = True,
+        halt: Optional[Callable[[dict, dict, Any], Optional[dict]]] = None,
+    ):
+        if run is None and arun is None:
+            raise ValueError(f"Node {name} needs run or arun")
+        self.name = name
+        self.run = run
+        self.arun = arun
+        self.deps = tuple(deps)
+        self.checkpoint = checkpoint
+        self.blocking = blocking
+        self.halt = halt
+
+    async def arun_or_offload(self, context: dict, inputs: dict) -> Any:
+        if self.arun is not None:
+            return await self.arun(context, inputs)
+        if not self.blocking:
+            return self.run(context, inputs)
+        return await run_admitted(self.run, context, inputs)
+
+
+class WorkflowHalted(Exception):
+    """Internal signal: a node's halt hook produced the final result."""
+
+    def __init__(self, node: str, result: dict):
+        super().__init__(node)
+        self.node = node
+        self.result = result
+
+
+class CheckpointStore(ABC):
+    """Interface for node output checkpoints."""
+
+    @abstractmethod
+    def load(self, workflow: str, invoice_id: int, node: str, input_hash: str) -> Tuple[bool, Any]:
+        """Return (found, output)."""
+        pass
+
+    @abstractmethod
+    def save(self, workflow: str, invoice_id: int, node: str, input_hash: str, output: Any):
+        """Store a node output (JSON-serializable)."""
+        pass
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """In-process store (tests, benchmarks, single-worker setups)."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+        self._data: Dict[tuple, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, workflow, invoice_id, node, input_hash):
+        with self._lock:
+            entry = self._data.get((workflow, invoice_id, node, input_hash))
+        if entry is None:
+            return False, None
+        saved_at, payload = entry
+        if self.ttl_seconds is not None and time.time() - saved_at > self.ttl_seconds:
+            return False, None
+        return True, json.loads(payload)
+
+    def save(self, workflow, invoice_id, node, input_hash, output):
+        payload = json.dumps(output, default=str)
+        with self._lock:
+            self._data[(workflow, invoice_id, node, input_hash)] = (time.time(), payload)
+
+
+class SQLCheckpointStore(CheckpointStore):
+    """
+    Checkpoints in the workflow_checkpoints table, shared by all workers.
+
+    Database errors are logged and treated as a cache miss: checkpointing
+    must never fail an analysis.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, workflow, invoice_id, node, input_hash):
+        from app.db.session import SessionLocal
+        from app.model.workflow_checkpoint import WorkflowCheckpoint
+
+        db = SessionLocal()
+        try:
+            query = db.query(WorkflowCheckpoint).filter(
+                WorkflowCheckpoint.workflow == workflow,
+                WorkflowCheckpoint.invoice_id == invoice_id,
+                WorkflowCheckpoint.node == node,
+                WorkflowCheckpoint.input_hash == input_hash
+            )
+            if self.ttl_seconds is not None:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+                query = query.filter(WorkflowCheckpoint.created_at >= cutoff)
+            row = query.first()
+            if row is None:
+                return False, None
+            return True, json.loads(row.output)
+        except Exception as e:
+            logger.warning(f"⚠️ Checkpoint load failed for {workflow}/{invoice_id}/{node}: {str(e)}")
+            return False, None
+        finally:
+            db.close()
+
+    def save(self, workflow, invoice_id, node, input_hash, output):
+        from app.db.session import SessionLocal
+        from app.model.workflow_checkpoint import WorkflowCheckpoint
+
+        db = SessionLocal()
+        try:
+            # Replace any older checkpoint for the same inputs (e.g. an expired one)
+            db.query(WorkflowCheckpoint).filter(
+                WorkflowCheckpoint.workflow == workflow,
+                WorkflowCheckpoint.invoice_id == invoice_id,
+                WorkflowCheckpoint.node == node,
+                WorkflowCheckpoint.input_hash == input_hash
+            ).delete(synchronize_session=False)
+            db.add(WorkflowCheckpoint(
+                workflow=workflow,
+                invoice_id=invoice_id,
+                node=node,
+                input_hash=input_hash,
+                output=json.dumps(output, default=str)
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Checkpoint save failed for {workflow}/{invoice_id}/{node}: {str(e)}")
+        finally:
+            db.close()
+
+
+def create_checkpoint_store(kind: str) -> Optional[CheckpointStore]:
+    """Build the store named by WORKFLOW_CHECKPOINT_STORE ("db", "memory" or "none")."""
+    ttl = settings.WORKFLOW_CHECKPOINT_TTL_SECONDS
+    if kind == "db":
+        return SQLCheckpointStore(ttl_seconds=ttl)
+    if kind == "memory":
+        return MemoryCheckpointStore(ttl_seconds=ttl)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown checkpoint store: {kind}")
+
+
+def _checkpointable(output: Any) -> bool:
+    return not (isinstance(output, dict) and "error" in output)
+
+
+async def _no_emit(*args, **kwargs):
+    return None
+
+
+class Workflow:
+    def __init__(
+        self,
+        name: str,
+        nodes: List[Node],
+        output: str,
+        store: Optional[CheckpointStore] = None,
+        key_field: str = "invoice_id",
+        version: int = 1,
+    ):
+        """
+        Args:
+            name: workflow name (part of the checkpoint key)
+            nodes: workflow steps
+            output: node whose output is the workflow result
+            store: checkpoint store (None disables checkpoints)
+            key_field: context field identifying the run's subject
+            version: bump to invalidate checkpoints when node logic changes
+        """
+        self.name = name
+        self.nodes = {node.name: node for node in nodes}
+        self.output = output
+        self.store = store
+        self.key_field = key_field
+        self.version = version
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Validate the DAG and return node names in dependency order."""
+        if self.output not in self.nodes:
+            raise ValueError(f"Output node {self.output} is not in workflow {self.name}")
+
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in workflow {self.name} at node {name}")
+            if name not in self.nodes:
+                raise ValueError(f"Unknown dependency {name} in workflow {self.name}")
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def input_hash(self, node: Node, context: dict, inputs: dict) -> str:
+        payload = json.dumps(
+            {"version": self.version, "node": node.name, "context": context, "inputs": inputs},
+            sort_keys=True, default=str, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _use_checkpoint(self, node: Node) -> bool:
+        return node.checkpoint and self.store is not None
+
+    def _halt(self, node: Node, context: dict, inputs: dict, output: Any):
+        if node.halt is not None:
+            result = node.halt(context, inputs, output)
+            if result is not None:
+                raise WorkflowHalted(node.name, result)
+
+    def run(self, context: dict) -> dict:
+        """Run the workflow synchronously, one node at a time in dependency order."""
+        key = context.get(self.key_field)
+        outputs = {}
+
+        try:
+            for name in self.order:
+                node = self.nodes[name]
+                inputs = {dep: outputs[dep] for dep in node.deps}
+
+                found, output = False, None
+                if self._use_checkpoint(node):
+                    input_hash = self.input_hash(node, context, inputs)
+                    found, output = self.store.load(self.name, key, name, input_hash)
+
+                if found:
+                    logger.info(f"♻️ Resuming {self.name}/{key} from checkpoint: {name}")
+                else:
+                    if node.run is None:
+                        raise RuntimeError(f"Node {name} has no sync implementation")
+                    output = node.run(context, inputs)
+                    if self._use_checkpoint(node) and _checkpointable(output):
+                        self.store.save(self.name, key, name, input_hash, output)
+
+                outputs[name] = output
+                self._halt(node, context, inputs, output)
+        except WorkflowHalted as halted:
+            return halted.result
+
+        return outputs[self.output]
+
+    async def arun(self, context: dict, emit: Optional[Emit] = None) -> dict:
+        """
+        Run the workflow, starting each node as soon as its dependencies finish.
+
+        emit(event, step, **data) is awaited with step_started/step_completed
+        around every node; resumed nodes are flagged with resumed=True. When a
+        node halts the workflow, still-running nodes are cancelled and the
+        halt result is emitted as the output node's step_completed.
+        """
+        emit = emit or _no_emit
+        key = context.get(self.key_field)
+        outputs: Dict[str, Any] = {}
+
+        async def run_node(node: Node) -> Any:
+            inputs = {dep: outputs[dep] for dep in node.deps}
+            await emit("step_started", node.name)
+            started = time.perf_counter()
+
+            found, output = False, None
+            if self._use_checkpoint(node):
+                input_hash = self.input_hash(node, context, inputs)
+                found, output = await run_admitted(self.store.load, self.name, key, node.name, input_hash)
+
+            if found:
+                logger.info(f"♻️ Resuming {self.name}/{key} from checkpoint: {node.name}")
+            else:
+                output = await node.arun_or_offload(context, inputs)
+                if self._use_checkpoint(node) and _checkpointable(output):
+                    await run_admitted(self.store.save, self.name, key, node.name, input_hash, output)
+
+            await emit(
+                "step_completed", node.name,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                resumed=found,
+                result=output
+            )
+            self._halt(node, context, inputs, output)
+            return output
+
+        pending = list(self.order)
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while pending or running:
+                for name in list(pending):
+                    if all(dep in outputs for dep in self.nodes[name].deps):
+                        pending.remove(name)
+                        running[asyncio.create_task(run_node(self.nodes[name]))] = name
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    outputs[running.pop(task)] = task.result()
+        except WorkflowHalted as halted:
+            await emit("step_completed", self.output, halted_by=halted.node, result=halted.result)
+            return halted.result
+        finally:
+            for task in running:
+                task.cancel()
+
+        return outputs[self.output]
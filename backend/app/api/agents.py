@@ -1,7 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import asyncio
+import json
 import logging
 
+from app.config import settings
+from app.core.executor import blocking_executor, OverloadedError
+from app.agents.batch_runner import run_batch
+from app.agents.execution_log import execution_log
+from app.agents.jobs import job_registry
+from app.agents.llm_cache import llm_cache
+from app.agents.llm_gateway import llm_gateway
+from app.ml.credit_model import get_scorer
+from app.ml.feature_store import buyer_feature_store
+from app.agents.singleflight import analysis_singleflight, SingleFlightTimeoutError
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -37,20 +52,131 @@ async def analyze_with_agents(request: AgentAnalysisRequest):
     try:
         logger.info(f"🚀 Starting agentic analysis for invoice {request.invoice_id}")
         
+        # Admission control happens once here; the workflow's own offloads are never rejected
+        blocking_executor.admit()
         orchestrator = get_orchestrator()  # Initialize on first call
-        
-        result = orchestrator.execute({
+        context = {
             "invoice_id": request.invoice_id,
             "buyer_id": request.buyer_id,
             "merchant_id": request.merchant_id
-        })
+        }
         
-        return result
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return await orchestrator.aexecute(context)
         
+        # Identical concurrent requests (double clicks, dashboard polling) share one run
+        key = f"analyze:{request.invoice_id}:{request.buyer_id}:{request.merchant_id}"
+        return await analysis_singleflight.do(key, lambda: orchestrator.aexecute(context))
+        
+    except OverloadedError:
+        raise
+    except SingleFlightTimeoutError as e:
+        logger.error(f"❌ Agent analysis timed out: {str(e)}")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Agent analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze/jobs", status_code=202)
+async def start_analysis_job(request: AgentAnalysisRequest):
+    """
+    Start the agentic workflow in the background.
+    
+    Returns a job_id; follow progress at /analyze/{job_id}/events.
+    """
+    blocking_executor.admit()
+    orchestrator = get_orchestrator()
+    job = job_registry.create(request.model_dump())
+    
+    async def run():
+        try:
+            result = await orchestrator.aexecute(job.context, on_event=job.publish)
+            await job.finish(result)
+        except Exception as e:
+            logger.error(f"❌ Analysis job {job.id} failed: {str(e)}")
+            await job.fail(str(e))
+    
+    job.task = asyncio.create_task(run())
+    logger.info(f"🚀 Started analysis job {job.id} for invoice {request.invoice_id}")
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "events_url": f"/api/v1/agents/analyze/{job.id}/events"
+    }
+
+@router.get("/analyze/{job_id}/events")
+async def stream_analysis_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events stream of workflow progress.
+    
+    Emits step_started/step_completed for each workflow step (buyer_history,
+    invoice, pre_decision, supply_chain, credit_scoring, factoring,
+    final_decision; steps restored from a checkpoint carry resumed=true),
+    then a done (or error) event carrying the full result. Reconnecting
+    clients resume after Last-Event-ID.
+    """
+    job = job_registry.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    
+    async def stream():
+        async for item in job.follow(start):
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            index, event = item
+            yield f"id: {index}\nevent: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class AgentBatchRequest(BaseModel):
+    items: List[AgentAnalysisRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
+    rate_limit_per_second: Optional[float] = Field(None, gt=0)
+
+@router.post("/analyze-batch")
+async def analyze_batch(request: AgentBatchRequest):
+    """
+    Run the agentic workflow over many invoices.
+    
+    Streams one NDJSON line per invoice as it finishes, then a summary line
+    with throughput, failure count and p50/p95 latency.
+    """
+    if len(request.items) > settings.AGENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.items)} items (max {settings.AGENT_BATCH_MAX_ITEMS})"
+        )
+    
+    concurrency = min(
+        request.concurrency or settings.AGENT_BATCH_CONCURRENCY,
+        settings.AGENT_BATCH_MAX_CONCURRENCY
+    )
+    # Clients may slow the batch down, never push it past the provider limit
+    rate_limit = min(
+        request.rate_limit_per_second or settings.AGENT_BATCH_RATE_LIMIT,
+        settings.AGENT_BATCH_RATE_LIMIT
+    )
+    
+    blocking_executor.admit()
+    logger.info(f"🚀 Starting batch analysis of {len(request.items)} invoices (concurrency={concurrency})")
+    
+    orchestrator = get_orchestrator()
+    items = [item.model_dump() for item in request.items]
+    
+    async def stream():
+        async for record in run_batch(orchestrator, items, concurrency, rate_limit):
+            yield json.dumps(record, default=str) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @router.get("/health")
 async def agent_health():
     """Check if agents are available."""
@@ -63,5 +189,12 @@ async def agent_health():
             "OrchestrationAgent"
         ],
         "model": "llama-3.1-70b-versatile (Groq)",
-        "note": "Agents initialized on first API call"
+        "note": "Agents initialized on first API call",
+        "llm_cache": llm_cache.stats(),
+        "llm_gateway": llm_gateway.stats(),
+        "execution_log": execution_log.stats(),
+        "blocking_pool": blocking_executor.stats(),
+        "singleflight": analysis_singleflight.stats(),
+        "buyer_features": buyer_feature_store.stats(),
+        "credit_model": get_scorer().stats()
     }
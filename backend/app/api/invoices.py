@@ -8,6 +8,7 @@ import os
 from pathlib import Path
 
 from app.db.session import get_db
+from app.core.executor import run_admitted, run_blocking, OverloadedError
 from app.services.invoice_service import InvoiceService
 
 logger = logging.getLogger(__name__)
@@ -82,14 +83,15 @@ async def upload_invoice(
         file_id = str(uuid.uuid4())
         file_path = UPLOAD_DIR / f"{file_id}_{file.filename}"
         
-        # Save file to disk
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        # Save file to disk (off the event loop)
+        await run_blocking(file_path.write_bytes, file_content)
         
         logger.info(f"✅ File saved: {file_path}")
         
-        # Use service to process
-        result = InvoiceService.upload_invoice(
+        # Use service to process (sync DB session runs in the blocking pool; the
+        # request was admitted by the file write, so this step is not re-checked)
+        result = await run_admitted(
+            InvoiceService.upload_invoice,
             file_id=file_id,
             merchant_id=merchant_id,
             filename=file.filename,
@@ -104,6 +106,8 @@ async def upload_invoice(
             "data": result
         }
         
+    except OverloadedError:
+        raise
     except Exception as e:
         logger.error(f"❌ Upload failed: {str(e)}")
         raise HTTPException(
@@ -119,7 +123,7 @@ async def list_invoices(
     """List merchant's invoices."""
     logger.info(f"Listing invoices for merchant {merchant_id}")
     
-    invoices = InvoiceService.list_invoices(merchant_id, db)
+    invoices = await run_blocking(InvoiceService.list_invoices, merchant_id, db)
     
     return {
         "status": "success",
@@ -133,7 +137,7 @@ async def get_invoice(
     db: Session = Depends(get_db)
 ):
     """Get invoice details."""
-    invoice = InvoiceService.get_invoice(invoice_id, db)
+    invoice = await run_blocking(InvoiceService.get_invoice, invoice_id, db)
     
     if not invoice:
         raise HTTPException(
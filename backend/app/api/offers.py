@@ -1,8 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
+from typing import List, Optional
+import math
+
+from app.config import settings
+from app.core.executor import run_blocking
+from app.services.pricing_service import PricingService
 
 router = APIRouter()
 
+# Per-option fields of an offer ladder entry
+LADDER_FIELDS = ["offer_amount", "discount", "processing_fee", "net_amount", "rate", "monthly_cost"]
+
+# Credit scores are scaled to 0-1000 (see app.ml.credit_model)
+MIN_CREDIT_SCORE, MAX_CREDIT_SCORE = 0, 1000
+
 class OfferResponse(BaseModel):
     id: int
     invoice_id: int
@@ -16,6 +28,79 @@ async def list_offers():
     """List available offers."""
     return {"offers": []}
 
+@router.get("/ladder")
+async def offer_ladder(
+    amount: List[float] = Query(..., description="Invoice amount; repeat for several invoices"),
+    credit_score: List[int] = Query(..., description="One score per invoice, or one for all"),
+    tenor: Optional[List[int]] = Query(None, description="Tenors in days (default 15, 30, 60, 90)"),
+    advance_ratio: Optional[List[float]] = Query(None, description="Advance ratios (default 0.90)")
+):
+    """
+    Offers for every tenor and advance ratio of one or many invoices.
+    
+    Example: /api/v1/offers/ladder?amount=75000&amount=120000&credit_score=720&credit_score=810
+    """
+    if len(amount) > settings.OFFER_LADDER_MAX_INVOICES:
+        raise HTTPException(status_code=400, detail=f"At most {settings.OFFER_LADDER_MAX_INVOICES} invoices per request")
+    if tenor is not None and len(tenor) > settings.OFFER_LADDER_MAX_TENORS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.OFFER_LADDER_MAX_TENORS} tenors per request")
+    if advance_ratio is not None and len(advance_ratio) > settings.OFFER_LADDER_MAX_ADVANCE_RATIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.OFFER_LADDER_MAX_ADVANCE_RATIOS} advance ratios per request"
+        )
+    options = len(amount) * len(advance_ratio or [None]) * len(tenor or settings.PRICING_SUPPORTED_TENORS)
+    if options > settings.OFFER_LADDER_MAX_OPTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.OFFER_LADDER_MAX_OPTIONS} offers (invoices x advance ratios x tenors) per request"
+        )
+    if len(credit_score) not in (1, len(amount)):
+        raise HTTPException(status_code=400, detail="Pass one credit_score per amount, or a single credit_score")
+    if any(not math.isfinite(a) or a < 0 for a in amount):
+        raise HTTPException(status_code=400, detail="Invoice amounts must be finite and non-negative")
+    if any(not MIN_CREDIT_SCORE <= s <= MAX_CREDIT_SCORE for s in credit_score):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Credit scores must be between {MIN_CREDIT_SCORE} and {MAX_CREDIT_SCORE}"
+        )
+    if tenor is not None and any(not 0 < t <= settings.OFFER_LADDER_MAX_TENOR_DAYS for t in tenor):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tenors must be between 1 and {settings.OFFER_LADDER_MAX_TENOR_DAYS} days"
+        )
+    if advance_ratio is not None and any(not 0 < r <= 1 for r in advance_ratio):
+        raise HTTPException(status_code=400, detail="Advance ratios must be in (0, 1]")
+    
+    # Pricing and response assembly are CPU-bound; keep them off the event loop
+    return await run_blocking(build_offer_ladder, amount, credit_score, tenor, advance_ratio)
+
+def build_offer_ladder(amount, credit_score, tenor, advance_ratio):
+    """Ladder response body for validated query lists."""
+    ladder = PricingService.calculate_offer_ladder(amount, credit_score, tenor, advance_ratio)
+    tenors = ladder["tenor_days"][0, 0].tolist()
+    ratios = ladder["advance_ratio"][0, :, 0].tolist()
+    columns = {field: ladder[field].tolist() for field in LADDER_FIELDS}
+    scores = credit_score * len(amount) if len(credit_score) == 1 else credit_score
+    
+    offers = []
+    for i, (invoice_amount, score) in enumerate(zip(ladder["invoice_amount"][:, 0, 0].tolist(), scores)):
+        offers.append({
+            "invoice_amount": invoice_amount,
+            "credit_score": score,
+            "options": [
+                {
+                    "advance_ratio": ratio,
+                    "tenor_days": tenor_days,
+                    **{field: columns[field][i][j][k] for field in LADDER_FIELDS}
+                }
+                for j, ratio in enumerate(ratios)
+                for k, tenor_days in enumerate(tenors)
+            ]
+        })
+    
+    return {"tenors": tenors, "advance_ratios": ratios, "offers": offers}
+
 @router.post("/{offer_id}/accept")
 async def accept_offer(offer_id: int):
     """Accept an offer."""
@@ -1,7 +1,7 @@
 # backend/app/config.py
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 import os
 from pathlib import Path
 
@@ -22,9 +22,111 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
+    # Blocking work (sync DB sessions, file I/O, model scoring) offloaded from async routes
+    BLOCKING_POOL_SIZE: int = 16
+    BLOCKING_POOL_MAX_PENDING: int = 64  # reject with 503 beyond this many queued + running calls
+    
     # Groq API
     GROQ_API_KEY: Optional[str] = None
     
+    # LLM gateway (shared Groq client)
+    LLM_BACKEND: str = "groq"  # "groq" or "fake" (offline, for load tests)
+    FAKE_LLM_LATENCY_MS: float = 300.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_MAX_RETRIES: int = 3
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 8.0
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    
+    # Agent execution history
+    AGENT_HISTORY_SIZE: int = 100  # in-memory ring buffer per agent
+    EXECUTION_LOG_PATH: Optional[str] = str(BASE_DIR / "logs" / "agent_executions.jsonl")
+    EXECUTION_LOG_MAX_BYTES: int = 50 * 1024 * 1024
+    EXECUTION_LOG_BACKUP_COUNT: int = 5
+    EXECUTION_LOG_QUEUE_SIZE: int = 10000
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: int = 24 * 3600
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None  # e.g. backend/llm_cache.db
+    LLM_CACHE_SQLITE_MAX_BYTES: int = 256 * 1024 * 1024
+    
+    # Batch agent analysis
+    AGENT_BATCH_MAX_ITEMS: int = 10000
+    AGENT_BATCH_CONCURRENCY: int = 8
+    AGENT_BATCH_MAX_CONCURRENCY: int = 32
+    AGENT_BATCH_RATE_LIMIT: float = 5.0  # analyses started per second (each makes up to 3 Groq calls)
+    
+    # Rule-based fast path (skips the LLM for clear-cut invoices)
+    FAST_PATH_ENABLED: bool = True
+    FAST_PATH_APPROVE_MIN_SCORE: int = 800
+    FAST_PATH_APPROVE_MIN_ON_TIME_RATE: float = 0.93
+    FAST_PATH_APPROVE_MAX_PAYMENT_DAYS: int = 25
+    FAST_PATH_REJECT_MAX_SCORE: int = 400
+    FAST_PATH_REJECT_MAX_ON_TIME_RATE: float = 0.70
+    FAST_PATH_REJECT_MIN_PAYMENT_DAYS: int = 60
+    
+    # Credit model
+    MODEL_REGISTRY_DIR: str = str(BASE_DIR / "app" / "ml" / "registry")
+    MODEL_RELOAD_INTERVAL_SECONDS: float = 10.0  # manifest polling for hot-swap (0 disables)
+    # Deprecated: pre-registry model artifact, imported into the registry as v1 when it is empty
+    CREDIT_MODEL_PATH: str = str(BASE_DIR / "app" / "ml" / "credit_model.joblib")
+    SHADOW_MAX_PENDING_BATCHES: int = 8  # shadow batches beyond this are dropped
+    CREDIT_MODEL_COMPILED: bool = True  # numpy tree walker instead of sklearn predict_proba
+    MODEL_WARMUP_ON_STARTUP: bool = True  # load in the API lifespan / Celery worker_process_init
+    CREDIT_SCORE_CONTRIBUTIONS: bool = True  # TreeSHAP contributions in score results
+    SCORE_CACHE_ENABLED: bool = True  # memoize scores per feature bucket
+    SCORE_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Credit model training (python -m app.ml.train)
+    TRAINING_CHUNK_ROWS: int = 50000  # rows per server-side cursor fetch
+    TRAINING_MAX_ROWS: int = 1_000_000  # reservoir sample size; bounds memory
+    TRAINING_POSITIVE_STATUSES: List[str] = ["paid"]
+    TRAINING_NEGATIVE_STATUSES: List[str] = ["overdue", "defaulted"]
+    TRAINING_N_ESTIMATORS: int = 100
+    TRAINING_MAX_DEPTH: int = 8
+    TRAINING_MIN_SAMPLES_LEAF: int = 50
+    TRAINING_N_JOBS: int = -1  # parallel tree building
+    
+    # Factoring pricing (PricingService; the pricing grid rebuilds when these change)
+    PRICING_BASE_RATE: float = 2.5  # annual %
+    PRICING_RISK_SCORE_CUTOFFS: List[int] = [600, 700, 800]
+    PRICING_RISK_ADJUSTMENTS: List[float] = [1.5, 1.0, 0.5, 0.0]  # below the first cutoff, ..., at/above the last
+    PRICING_TENOR_ADJUSTMENT_PER_30_DAYS: float = 0.5
+    PRICING_ADVANCE_RATIO: float = 0.90  # share of the invoice amount advanced
+    PRICING_PROCESSING_FEE_RATE: float = 0.01  # of the offer amount
+    PRICING_SUPPORTED_TENORS: List[int] = [15, 30, 60, 90]  # precomputed in the grid; offer ladder default
+    # Limits per GET /api/v1/offers/ladder request; options = invoices x advance ratios x tenors
+    OFFER_LADDER_MAX_INVOICES: int = 500
+    OFFER_LADDER_MAX_TENORS: int = 12
+    OFFER_LADDER_MAX_ADVANCE_RATIOS: int = 10
+    OFFER_LADDER_MAX_OPTIONS: int = 10_000
+    OFFER_LADDER_MAX_TENOR_DAYS: int = 365
+    
+    # Buyer feature store
+    BUYER_FEATURE_REFRESH_SECONDS: float = 5.0
+    BUYER_FEATURE_REFRESH_OVERLAP_SECONDS: float = 10.0  # re-read window for clock skew / late commits
+    BUYER_FEATURE_FULL_RELOAD_SECONDS: float = 3600.0
+    BUYER_FEATURE_MISS_TTL_SECONDS: float = 30.0  # unknown buyer ids answer None without a DB read
+    
+    # Orchestration workflow checkpoints (resume retries from the last completed step)
+    WORKFLOW_CHECKPOINT_STORE: str = "db"  # "db", "memory" or "none"
+    WORKFLOW_CHECKPOINT_TTL_SECONDS: int = 24 * 3600
+    
+    # Single-flight coalescing of identical concurrent analyses
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_USE_REDIS: bool = True  # coalesce across uvicorn workers via REDIS_URL
+    SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS: float = 120.0
+    SINGLEFLIGHT_LOCK_TTL_SECONDS: float = 180.0
+    SINGLEFLIGHT_RESULT_TTL_SECONDS: float = 10.0
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -0,0 +1,105 @@
+# backend/app/core/executor.py
+
+"""
+Sized thread pool for blocking work called from async routes.
+
+Sync SQLAlchemy sessions, file writes and model scoring must not run on the
+event loop. They are offloaded here instead of the unbounded default
+executor; when more than `max_pending` calls are queued or running, new
+requests are rejected with OverloadedError (mapped to HTTP 503) instead of
+letting latency grow without bound.
+
+Admission happens once, at the request edge: routes offload through
+run_blocking (or call blocking_executor.admit() before starting a longer
+run). Work a request does after that, such as workflow nodes and
+checkpoints, goes through run_admitted, which shares the pool but is never
+rejected, so an admitted analysis cannot fail halfway through.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+import asyncio
+import functools
+import logging
+import threading
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(Exception):
+    """Raised when the blocking pool has no admission capacity left."""
+
+
+class BlockingExecutor:
+    def __init__(self, max_workers: int = 16, max_pending: int = 64):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blocking")
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def _check_capacity(self):
+        # Caller holds self._lock
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise OverloadedError(
+                f"Blocking pool saturated ({self._pending} pending, max {self.max_pending})"
+            )
+
+    def admit(self):
+        """Admission check for a request that offloads its work later (raises OverloadedError)."""
+        with self._lock:
+            self._check_capacity()
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) in the pool and await its result."""
+        return await self._run(True, func, args, kwargs)
+
+    async def run_admitted(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """run() for work of an already admitted request: counted as pending, never rejected."""
+        return await self._run(False, func, args, kwargs)
+
+    async def _run(self, admit: bool, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            if admit:
+                self._check_capacity()
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global pool for this worker process
+blocking_executor = BlockingExecutor(
+    max_workers=settings.BLOCKING_POOL_SIZE,
+    max_pending=settings.BLOCKING_POOL_MAX_PENDING,
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Offload a blocking call to the shared pool (raises OverloadedError when saturated)."""
+    return await blocking_executor.run(func, *args, **kwargs)
+
+
+async def run_admitted(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Offload a blocking call for a request that already passed admission (never rejected)."""
+    return await blocking_executor.run_admitted(func, *args, **kwargs)
@@ -0,0 +1,177 @@
+# backend/app/core/metrics.py
+
+"""
+Minimal in-process Prometheus metrics.
+
+Counters and histograms are plain dicts guarded by a lock, cheap enough to
+leave on for every agent execution and LLM call. render() produces the
+Prometheus text exposition format served at /metrics.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, Tuple
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return "\n".join(lines)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.collect() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+# ===== Agent metrics =====
+
+AGENT_EXECUTE_SECONDS = registry.histogram(
+    "credpulse_agent_execute_seconds",
+    "Wall time of agent execute()/aexecute() calls",
+    ("agent", "mode"),
+)
+AGENT_EXECUTIONS = registry.counter(
+    "credpulse_agent_executions_total",
+    "Agent executions by outcome (ok, error, fallback)",
+    ("agent", "outcome"),
+)
+AGENT_FALLBACKS = registry.counter(
+    "credpulse_agent_fallbacks_total",
+    "Agent executions that returned a deterministic fallback",
+    ("agent", "reason"),
+)
+
+# ===== LLM metrics =====
+
+LLM_CALL_SECONDS = registry.histogram(
+    "credpulse_llm_call_seconds",
+    "Wall time of LLM calls including retries (cache misses only)",
+    ("agent",),
+)
+LLM_QUEUE_WAIT_SECONDS = registry.histogram(
+    "credpulse_llm_queue_wait_seconds",
+    "Time spent waiting for an LLM concurrency slot",
+    ("mode",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0),
+)
+LLM_TOKENS = registry.counter(
+    "credpulse_llm_tokens_total",
+    "LLM tokens reported by the provider usage field",
+    ("agent", "kind"),
+)
+LLM_CACHE_LOOKUPS = registry.counter(
+    "credpulse_llm_cache_lookups_total",
+    "LLM response cache lookups by result (hit, miss)",
+    ("agent", "result"),
+)
+LLM_RETRIES = registry.counter(
+    "credpulse_llm_retries_total",
+    "LLM calls retried after a retryable provider error",
+    ("mode",),
+)
+
+# ===== Model metrics =====
+
+SHADOW_SCORE_DELTA = registry.histogram(
+    "credpulse_shadow_score_delta",
+    "Absolute score difference between the shadow and the active credit model",
+    ("active", "shadow"),
+    buckets=(0, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+SHADOW_BATCHES = registry.counter(
+    "credpulse_shadow_batches_total",
+    "Batches handed to the shadow model by outcome (scored, dropped, error)",
+    ("outcome",),
+)
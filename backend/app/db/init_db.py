@@ -13,11 +13,17 @@ def init_db():
         from app.model.merchant import Merchant
         from app.model.buyer import Buyer
         from app.model.invoice import Invoice
+        from app.model.buyer_features import BuyerFeatures
+        from app.model.workflow_checkpoint import WorkflowCheckpoint
         
         # Create all tables
         Base.metadata.create_all(bind=engine)
         logger.info("✅ Database tables created successfully")
         
+        # Keep buyer_features in sync with ORM writes to buyers/invoices
+        from app.ml.feature_store import install_listeners
+        install_listeners()
+        
         # Log what tables were created
         logger.info(f"📋 Tables: {list(Base.metadata.tables.keys())}")
         
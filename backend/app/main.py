@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -7,6 +8,10 @@ from app.config import settings
 from app.db.session import engine
 from app.db.init_db import init_db
 from app.api import auth, invoices, offers, consent, audit, webhooks, agents
+from app.agents.execution_log import execution_log
+from app.core.executor import blocking_executor, OverloadedError
+from app.core.metrics import registry
+from app.ml.feature_store import buyer_feature_store
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +21,30 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting CredPulse API...")
     init_db()  # ← This creates tables
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        try:
+            from app.ml.credit_model import warm_up
+            warm_up()
+        except Exception as e:
+            # Scoring retries the load on first use
+            logger.error(f"❌ Credit model warm-up failed: {str(e)}")
+        try:
+            buyer_feature_store.start()
+        except Exception as e:
+            # Reads fall back to loading on first use
+            logger.error(f"❌ Buyer feature store warm-up failed: {str(e)}")
+    try:
+        from app.services.pricing_service import get_pricing_grid
+        get_pricing_grid()
+    except Exception as e:
+        # Quotes retry the build on first use
+        logger.error(f"❌ Pricing grid build failed: {str(e)}")
     yield
     # Shutdown
     logger.info("🛑 Shutting down CredPulse API...")
+    execution_log.close()  # flush pending agent execution records
+    blocking_executor.shutdown()
+    buyer_feature_store.stop()
 
 app = FastAPI(
     title="CredPulse MVP",
@@ -36,6 +62,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    """Shed load instead of queueing blocking work without bound."""
+    logger.warning(f"⚠️ Rejecting {request.url.path}: {str(exc)}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, retry shortly"},
+        headers={"Retry-After": "1"}
+    )
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(invoices.router, prefix="/api/v1/invoices", tags=["invoices"])
@@ -56,3 +92,8 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (agent latency, LLM tokens, cache and fallback outcomes)."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
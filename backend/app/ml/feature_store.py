@@ -0,0 +1,402 @@
+"""
+Buyer feature store.
+
+Buyer features (payment days, on-time rate, invoice totals, risk score) are
+precomputed into the buyer_features table and mirrored in every process as
+one float64 matrix plus a buyer_id -> row index, so agents and scoring read
+them in O(1) without a database round-trip.
+
+Keeping it fresh:
+- ORM writes to buyers or invoices are collected in after_flush and the
+  affected buyers are re-materialized right after commit, once
+  install_listeners() has run (init_db and the Celery worker init call it)
+- each process refreshes its copy in the background, reading only rows whose
+  updated_at is past its watermark (minus a small overlap for clock skew and
+  concurrent commits), with an occasional full reload to drop deleted buyers
+
+Bulk SQL that bypasses the ORM (query.update(), raw SQL) does not trigger
+re-materialization; call rebuild() afterwards.
+"""
+
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, Iterable, List, Optional
+import logging
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (name, python type) of every numeric feature, in matrix column order
+FEATURES = (
+    ("avg_payment_days", int),
+    ("on_time_rate", float),
+    ("total_invoices", int),
+    ("risk_score", int),
+    ("invoice_count", int),
+    ("invoice_volume", float),
+)
+FEATURE_NAMES = [name for name, _ in FEATURES]
+
+
+def compute_rows(connection, ids: Optional[List[int]] = None) -> List[dict]:
+    """
+    buyer_features rows computed from buyers and invoices (read-only).
+
+    Applies the same defaults the agents used on raw buyer rows. With
+    ids=None every buyer is computed.
+    """
+    from app.model.buyer import Buyer
+    from app.model.invoice import Invoice
+
+    buyers = select(
+        Buyer.id, Buyer.name, Buyer.avg_payment_days, Buyer.on_time_rate,
+        Buyer.total_invoices, Buyer.risk_score
+    )
+    invoices = select(
+        Invoice.buyer_id,
+        func.count(Invoice.id),
+        func.coalesce(func.sum(Invoice.amount), 0.0)
+    ).group_by(Invoice.buyer_id)
+    if ids is not None:
+        buyers = buyers.where(Buyer.id.in_(ids))
+        invoices = invoices.where(Invoice.buyer_id.in_(ids))
+
+    stats = {buyer_id: (count, volume) for buyer_id, count, volume in connection.execute(invoices)}
+    now = datetime.utcnow()
+    return [
+        {
+            "buyer_id": buyer_id,
+            "buyer_name": name,
+            "avg_payment_days": avg_payment_days or 30,
+            "on_time_rate": float(on_time_rate or 0.85),
+            "total_invoices": total_invoices or 0,
+            "risk_score": risk_score or 700,
+            "invoice_count": stats.get(buyer_id, (0, 0.0))[0],
+            "invoice_volume": float(stats.get(buyer_id, (0, 0.0))[1]),
+            "updated_at": now,
+        }
+        for buyer_id, name, avg_payment_days, on_time_rate, total_invoices, risk_score
+        in connection.execute(buyers)
+    ]
+
+
+def materialize(connection, buyer_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute buyer_features rows from buyers and invoices.
+
+    With buyer_ids=None every buyer is rebuilt. Returns the number of rows written.
+    """
+    from app.model.buyer_features import BuyerFeatures
+
+    ids = None if buyer_ids is None else sorted({int(b) for b in buyer_ids if b is not None})
+    if ids == []:
+        return 0
+    rows = compute_rows(connection, ids)
+
+    # Replace rather than upsert: portable across Postgres and SQLite, and drops deleted buyers
+    if ids is None:
+        connection.execute(delete(BuyerFeatures))
+    else:
+        connection.execute(delete(BuyerFeatures).where(BuyerFeatures.buyer_id.in_(ids)))
+    if rows:
+        connection.execute(insert(BuyerFeatures), rows)
+    return len(rows)
+
+
+class BuyerFeatureStore:
+    def __init__(
+        self,
+        refresh_interval: float = 5.0,
+        refresh_overlap: float = 10.0,
+        full_reload_interval: float = 3600.0,
+        miss_ttl: float = 30.0,
+    ):
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = refresh_overlap
+        self.full_reload_interval = full_reload_interval
+        self.miss_ttl = miss_ttl
+
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((0, len(FEATURES)), dtype=np.float64)
+        self._names: List[str] = []
+        self._index: Dict[int, int] = {}
+        self._missing: Dict[int, float] = {}  # unknown buyer_id -> monotonic expiry
+        self._watermark: Optional[datetime] = None
+        self._last_full_reload = 0.0
+        self._loaded = False
+        self._load_attempted = 0.0
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"hits": 0, "misses": 0, "negative_hits": 0, "refreshes": 0, "rows_refreshed": 0, "refresh_errors": 0}
+
+    # ---- reads -------------------------------------------------------------
+
+    def get(self, buyer_id: int) -> Optional[dict]:
+        """Features for one buyer (same keys buyer_payment_history returned), or None."""
+        self._ensure_loaded()
+        with self._lock:
+            row = self._index.get(buyer_id)
+            if row is not None:
+                self._stats["hits"] += 1
+                values = self._matrix[row].tolist()
+                name = self._names[row]
+        if row is None:
+            return self._load_one(buyer_id)
+
+        record = {"buyer_id": buyer_id, "buyer_name": name}
+        for (feature, cast), value in zip(FEATURES, values):
+            record[feature] = cast(value)
+        return record
+
+    def vectors(self, buyer_ids: Iterable[int]) -> np.ndarray:
+        """Feature matrix for many buyers (NaN rows for unknown ids), columns as FEATURE_NAMES."""
+        self._ensure_loaded()
+        ids = list(buyer_ids)
+        with self._lock:
+            rows = np.array([self._index.get(b, -1) for b in ids], dtype=np.intp)
+            out = np.full((len(ids), len(FEATURES)), np.nan)
+            known = rows >= 0
+            out[known] = self._matrix[rows[known]]
+        return out
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buyers": len(self._index),
+                "watermark": self._watermark.isoformat() if self._watermark else None,
+                **self._stats
+            }
+
+    # ---- writes ------------------------------------------------------------
+
+    def _apply(self, records: list, replace: bool = False):
+        """Write feature rows into the matrix (replace=True swaps in a fresh copy)."""
+        if replace:
+            matrix = np.zeros((max(len(records), 16), len(FEATURES)), dtype=np.float64)
+            names: List[str] = []
+            index: Dict[int, int] = {}
+        else:
+            matrix, names, index = self._matrix, self._names, self._index
+
+        for record in records:
+            row = index.get(record.buyer_id)
+            if row is None:
+                row = len(names)
+                if row >= len(matrix):
+                    grown = np.zeros((max(16, len(matrix) * 2), len(FEATURES)), dtype=np.float64)
+                    grown[:len(matrix)] = matrix
+                    matrix = grown
+                names.append(record.buyer_name)
+            else:
+                names[row] = record.buyer_name
+            matrix[row] = [getattr(record, feature) for feature in FEATURE_NAMES]
+            index[record.buyer_id] = row
+            self._missing.pop(record.buyer_id, None)
+
+        self._matrix, self._names, self._index = matrix, names, index
+
+    def refresh(self, full: bool = False) -> int:
+        """Pull changed rows from buyer_features; returns the number applied."""
+        from app.db.session import SessionLocal
+        from app.model.buyer_features import BuyerFeatures
+
+        full = full or self._watermark is None
+        db = SessionLocal()
+        try:
+            query = db.query(BuyerFeatures)
+            if not full:
+                query = query.filter(
+                    BuyerFeatures.updated_at >= self._watermark - timedelta(seconds=self.refresh_overlap)
+                )
+            records = query.all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._apply(records, replace=full)
+            if records:
+                latest = max(record.updated_at for record in records)
+                self._watermark = max(latest, self._watermark) if self._watermark else latest
+            elif full:
+                self._watermark = datetime.utcnow() - timedelta(seconds=self.refresh_overlap)
+            if full:
+                self._last_full_reload = time.monotonic()
+            self._loaded = True
+            self._stats["refreshes"] += 1
+            self._stats["rows_refreshed"] += len(records)
+        return len(records)
+
+    def rebuild(self) -> int:
+        """Re-materialize every buyer from the source tables, then reload."""
+        from app.db.session import engine
+
+        with engine.begin() as connection:
+            count = materialize(connection)
+        self.refresh(full=True)
+        logger.info(f"✅ Buyer feature store rebuilt: {count} buyers")
+        return count
+
+    def _ensure_loaded(self):
+        """First read in a process that was never started: load once (retrying at most every interval)."""
+        if self._loaded or time.monotonic() - self._load_attempted < self.refresh_interval:
+            return
+        self._load_attempted = time.monotonic()
+        try:
+            self.refresh(full=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Buyer feature store load failed: {str(e)}")
+
+    def _load_one(self, buyer_id: int) -> Optional[dict]:
+        """
+        Cold miss (buyer added since the last refresh): read its row, or compute it
+        from buyers/invoices if it was never materialized. Read-only; unknown ids are
+        remembered for miss_ttl seconds. Database errors propagate to the caller.
+        """
+        from types import SimpleNamespace
+        from app.db.session import SessionLocal, engine
+        from app.model.buyer_features import BuyerFeatures
+
+        with self._lock:
+            expiry = self._missing.get(buyer_id)
+            if expiry is not None and expiry > time.monotonic():
+                self._stats["negative_hits"] += 1
+                return None
+            self._stats["misses"] += 1
+
+        db = SessionLocal()
+        try:
+            record = db.get(BuyerFeatures, buyer_id)
+        finally:
+            db.close()
+        if record is None:
+            with engine.connect() as connection:
+                rows = compute_rows(connection, [buyer_id])
+            record = SimpleNamespace(**rows[0]) if rows else None
+
+        with self._lock:
+            if record is None:
+                self._missing[buyer_id] = time.monotonic() + self.miss_ttl
+                return None
+            self._apply([record])
+        return self.get(buyer_id)
+
+    # ---- background refresh ------------------------------------------------
+
+    def request_refresh(self):
+        """Wake the refresher now (after a local commit touched buyer features)."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                full = time.monotonic() - self._last_full_reload >= self.full_reload_interval
+                self.refresh(full=full)
+            except Exception as e:
+                with self._lock:
+                    self._stats["refresh_errors"] += 1
+                logger.warning(f"⚠️ Buyer feature refresh failed: {str(e)}")
+
+    def start(self):
+        """Load the features (building the table if it is empty) and start refreshing."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.refresh(full=True)
+        if not self._index:
+            self.rebuild()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="buyer-feature-refresh", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Buyer feature store ready: {len(self._index)} buyers")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance for this process
+buyer_feature_store = BuyerFeatureStore(
+    refresh_interval=settings.BUYER_FEATURE_REFRESH_SECONDS,
+    refresh_overlap=settings.BUYER_FEATURE_REFRESH_OVERLAP_SECONDS,
+    full_reload_interval=settings.BUYER_FEATURE_FULL_RELOAD_SECONDS,
+    miss_ttl=settings.BUYER_FEATURE_MISS_TTL_SECONDS,
+)
+
+
+# ---- change tracking -----------------------------------------------------
+
+_PENDING_KEY = "buyer_feature_ids"
+
+
+def _collect_changed_buyers(session, flush_context):
+    """Remember which buyers a flush touched (directly or through their invoices)."""
+    from sqlalchemy import inspect as sa_inspect
+    from app.model.buyer import Buyer
+    from app.model.invoice import Invoice
+
+    changed = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Buyer):
+            changed.add(obj.id)
+        elif isinstance(obj, Invoice):
+            changed.add(obj.buyer_id)
+            # An invoice moved to another buyer changes both
+            changed.update(sa_inspect(obj).attrs.buyer_id.history.deleted or ())
+    changed.discard(None)
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+def _materialize_changed_buyers(session):
+    """Re-materialize touched buyers in their own transaction; never fails the caller's commit."""
+    changed = session.info.pop(_PENDING_KEY, None)
+    if not changed:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            materialize(connection, changed)
+        buyer_feature_store.request_refresh()
+    except Exception as e:
+        logger.warning(f"⚠️ Buyer feature update failed for {sorted(changed)}: {str(e)}")
+
+
+def _discard_changed_buyers(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+_LISTENERS = (
+    ("after_flush", _collect_changed_buyers),
+    ("after_commit", _materialize_changed_buyers),
+    ("after_soft_rollback", _discard_changed_buyers),
+)
+
+
+def install_listeners():
+    """Re-materialize buyers touched by ORM writes on commit (idempotent)."""
+    for name, listener in _LISTENERS:
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
+
+
+def remove_listeners():
+    for name, listener in _LISTENERS:
+        if event.contains(Session, name, listener):
+            event.remove(Session, name, listener)
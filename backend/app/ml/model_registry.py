@@ -0,0 +1,167 @@
+"""
+File-based model registry.
+
+Layout under MODEL_REGISTRY_DIR:
+
+    <name>/
+        manifest.json          {"active": "v2", "shadow": "v3", "versions": {...}}
+        v1/model.joblib
+        v1/metadata.json
+        v2/...
+
+Artifacts are written to a temp directory and renamed into place, and the
+manifest is replaced atomically, so readers in other processes never see a
+partial version. Workers notice a changed manifest and hot-swap the model
+(see CreditScorer.reload).
+
+CLI (from backend/):
+    python -m app.ml.model_registry list
+    python -m app.ml.model_registry activate v2
+    python -m app.ml.model_registry shadow v3      # or: shadow none
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+import joblib
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def _write_json_atomic(path: str, data: dict):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    def __init__(self, root: Optional[str] = None, name: str = "credit"):
+        self.root = os.path.join(root or settings.MODEL_REGISTRY_DIR, name)
+        self.name = name
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def manifest(self) -> Dict[str, Any]:
+        """Current manifest ({"active": None, ...} when nothing is registered)."""
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"active": None, "shadow": None, "versions": {}}
+
+    def _update_manifest(self, **changes) -> Dict[str, Any]:
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            manifest = self.manifest()
+            manifest.update(changes)
+            manifest["updated_at"] = datetime.utcnow().isoformat()
+            _write_json_atomic(self.manifest_path, manifest)
+            return manifest
+
+    def _next_version(self, manifest: Dict[str, Any]) -> str:
+        numbers = [int(v[1:]) for v in manifest.get("versions", {}) if v.startswith("v") and v[1:].isdigit()]
+        return f"v{max(numbers, default=0) + 1}"
+
+    def register(self, model, metadata: Optional[dict] = None, activate: bool = False) -> str:
+        """Store a fitted model as the next version; returns the version id."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            manifest = self.manifest()
+            version = self._next_version(manifest)
+            tmp_dir = tempfile.mkdtemp(dir=self.root, prefix=f".{version}-")
+            try:
+                joblib.dump(model, os.path.join(tmp_dir, ARTIFACT_FILE))
+                info = {
+                    "version": version,
+                    "created_at": datetime.utcnow().isoformat(),
+                    "model_class": type(model).__name__,
+                    **(metadata or {})
+                }
+                _write_json_atomic(os.path.join(tmp_dir, METADATA_FILE), info)
+                os.rename(tmp_dir, os.path.join(self.root, version))
+            except Exception:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+            manifest.setdefault("versions", {})[version] = {"created_at": info["created_at"]}
+            if activate or not manifest.get("active"):
+                manifest["active"] = version
+            manifest["updated_at"] = datetime.utcnow().isoformat()
+            _write_json_atomic(self.manifest_path, manifest)
+
+        logger.info(f"✅ Registered {self.name} model {version}{' (active)' if manifest['active'] == version else ''}")
+        return version
+
+    def _require(self, version: str):
+        if not os.path.exists(os.path.join(self.root, version, ARTIFACT_FILE)):
+            raise ValueError(f"Unknown {self.name} model version: {version}")
+
+    def activate(self, version: str):
+        self._require(version)
+        changes = {"active": version}
+        if self.manifest().get("shadow") == version:
+            changes["shadow"] = None  # promoted: no longer a shadow
+        self._update_manifest(**changes)
+        logger.info(f"✅ Activated {self.name} model {version}")
+
+    def set_shadow(self, version: Optional[str]):
+        if version is not None:
+            self._require(version)
+        self._update_manifest(shadow=version)
+        logger.info(f"✅ Shadow {self.name} model: {version or 'none'}")
+
+    def load(self, version: str):
+        """Load a version's model."""
+        self._require(version)
+        return joblib.load(os.path.join(self.root, version, ARTIFACT_FILE))
+
+    def metadata(self, version: str) -> dict:
+        with open(os.path.join(self.root, version, METADATA_FILE)) as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Credit model registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    sub.add_parser("activate").add_argument("version")
+    sub.add_parser("shadow").add_argument("version", help='version id, or "none"')
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if args.command == "activate":
+        registry.activate(args.version)
+    elif args.command == "shadow":
+        registry.set_shadow(None if args.version == "none" else args.version)
+
+    manifest = registry.manifest()
+    for version in sorted(manifest.get("versions", {}), key=lambda v: int(v[1:]) if v[1:].isdigit() else 0):
+        marks = [m for m in ("active", "shadow") if manifest.get(m) == version]
+        print(f"{version}  {registry.metadata(version).get('created_at', '')}  {' '.join(marks)}")
+
+
+if __name__ == "__main__":
+    main()
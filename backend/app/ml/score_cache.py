@@ -0,0 +1,143 @@
+"""
+Memoized credit scores keyed on quantized features.
+
+Invoices from the same buyer with similar amounts land in the same feature
+bucket and get the same score, tier, confidence and reasons. Buckets are not
+a fixed grid: each feature is cut at the forest's split thresholds and at the
+cut points used by the score reasons, so every row in a bucket follows the
+same path through every tree and gets the same reasons. A cached result is
+therefore exactly what scoring the row would have produced.
+
+Entries belong to one loaded model; the cache empties itself when the active
+model changes (hot-swap, retrain).
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import threading
+
+import numpy as np
+from sklearn.tree import _tree
+
+# (sorted cut points, searchsorted side) pairs for one feature
+Cuts = List[Tuple[np.ndarray, str]]
+
+
+def split_thresholds(forest, n_features: int) -> List[np.ndarray]:
+    """Sorted unique split thresholds per feature across all trees of a fitted forest."""
+    per_feature: List[list] = [[] for _ in range(n_features)]
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        internal = tree.children_left != _tree.TREE_LEAF
+        for feature, threshold in zip(tree.feature[internal].tolist(), tree.threshold[internal].tolist()):
+            per_feature[feature].append(threshold)
+    return [np.unique(np.array(thresholds, dtype=np.float64)) for thresholds in per_feature]
+
+
+class FeatureBuckets:
+    """Maps raw feature rows to bucket keys for one fitted forest."""
+
+    def __init__(self, forest, columns: Sequence[str], reason_cuts: Dict[str, Cuts]):
+        """
+        Args:
+            forest: fitted RandomForestClassifier
+            columns: feature column names in model order
+            reason_cuts: column -> cut points the reasons compare against, each
+                with the searchsorted side matching the comparison
+                ("right" for x >= cut / x < cut, "left" for x <= cut / x > cut)
+        """
+        self.splits = split_thresholds(forest, len(columns))
+        self.reason_cuts = [
+            [(np.asarray(cuts, dtype=np.float64), side) for cuts, side in reason_cuts.get(column, [])]
+            for column in columns
+        ]
+
+    def keys(self, matrix: np.ndarray) -> List[tuple]:
+        """One hashable key per row (NaN gets its own bucket)."""
+        missing = np.isnan(matrix)
+        # Trees compare the float32 value, so bucket on that too
+        model_values = matrix.astype(np.float32).astype(np.float64)
+
+        codes = []
+        for i, splits in enumerate(self.splits):
+            # Number of thresholds below x decides `x <= threshold` at every split
+            codes.append(np.searchsorted(splits, model_values[:, i], side="left"))
+            for cuts, side in self.reason_cuts[i]:
+                codes.append(np.searchsorted(cuts, matrix[:, i], side=side))
+            codes.append(missing[:, i])
+
+        return list(map(tuple, np.column_stack(codes).tolist()))
+
+
+class ScoreCache:
+    """Bounded LRU of score results for one model at a time."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._owner = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def _check_owner(self, owner):
+        if owner is not self._owner:
+            if self._owner is not None:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._owner = owner
+
+    def get_many(self, owner, keys: Sequence[Hashable]) -> Tuple[List[Optional[dict]], List[int]]:
+        """
+        Cached entries for `keys` (None where missing) and the indexes of the
+        first occurrence of each missing key. Repeats of a missing key within
+        the batch count as hits: the caller scores it once.
+        """
+        entries, misses, pending = [], [], set()
+        with self._lock:
+            self._check_owner(owner)
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                elif key not in pending:
+                    pending.add(key)
+                    misses.append(i)
+                entries.append(entry)
+            self._stats["hits"] += len(keys) - len(misses)
+            self._stats["misses"] += len(misses)
+        return entries, misses
+
+    def put_many(self, owner, keys: Sequence[Hashable], values: Sequence[dict]):
+        with self._lock:
+            # Results of a model swapped out mid-batch are not kept
+            if owner is not self._owner:
+                return
+            for key, value in zip(keys, values):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._owner = None
+
+    def _hit_rate(self) -> float:
+        # Caller holds the lock
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+
+    def hit_rate(self) -> float:
+        with self._lock:
+            return self._hit_rate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": self._hit_rate()
+            }
@@ -0,0 +1,240 @@
+"""
+Out-of-core training for the credit model.
+
+Streams labeled invoices joined with their buyers from the database in
+fixed-size chunks (server-side cursor via yield_per), turns each chunk into
+feature rows with vectorized pandas/numpy, and keeps a uniform reservoir
+sample of at most `max_rows` rows. Memory is bounded by the chunk size plus
+the reservoir, however large the tables are. The forest is then fitted on the
+sample with parallel tree building, evaluated on a holdout split, and
+registered as a new version in the model registry.
+
+Labels come from the invoice status: TRAINING_POSITIVE_STATUSES (e.g. paid)
+are good credit, TRAINING_NEGATIVE_STATUSES (e.g. overdue, defaulted) risky.
+Invoices in any other status are not yet labeled and are skipped.
+
+CLI (from backend/):
+    python -m app.ml.train
+    python -m app.ml.train --max-rows 2000000 --chunk-size 100000 --activate
+"""
+
+from typing import Dict, Optional, Tuple
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.ml.credit_model import FEATURE_COLUMNS, MODEL_DEFAULTS
+from app.ml.model_registry import ModelRegistry
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Buyer defaults match the buyer feature store, so training sees what scoring sees
+BUYER_DEFAULTS = {"avg_payment_days": 30, "on_time_rate": 0.85}
+
+
+def labeled_invoices_query(positive_statuses, negative_statuses):
+    from app.model.buyer import Buyer
+    from app.model.invoice import Invoice
+
+    return (
+        select(
+            Invoice.amount,
+            func.coalesce(Buyer.avg_payment_days, BUYER_DEFAULTS["avg_payment_days"]),
+            func.coalesce(Buyer.on_time_rate, BUYER_DEFAULTS["on_time_rate"]),
+            Invoice.invoice_date,
+            Invoice.created_at,
+            Invoice.status,
+        )
+        .join(Buyer, Buyer.id == Invoice.buyer_id)
+        .where(Invoice.status.in_(list(positive_statuses) + list(negative_statuses)))
+    )
+
+
+def build_features(rows, positive_statuses) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature matrix (FEATURE_COLUMNS order) and 0/1 labels for one chunk of query rows."""
+    frame = pd.DataFrame.from_records(
+        rows, columns=["amount", "avg_payment_days", "on_time_rate", "invoice_date", "created_at", "status"]
+    )
+
+    # Age when the invoice entered the system, like the age scoring is asked about
+    age = (pd.to_datetime(frame["created_at"]) - pd.to_datetime(frame["invoice_date"])).dt.days
+    frame["age_days"] = age.clip(lower=0)
+
+    X = frame[FEATURE_COLUMNS].to_numpy(dtype=float, na_value=np.nan)
+    defaults = np.array([MODEL_DEFAULTS[column] for column in FEATURE_COLUMNS], dtype=float)
+    X = np.where(np.isnan(X), defaults, X)
+    y = frame["status"].isin(list(positive_statuses)).to_numpy(dtype=np.int8)
+    return X, y
+
+
+class Reservoir:
+    """Uniform sample of at most `capacity` rows from a stream of chunks (Algorithm R, per chunk)."""
+
+    def __init__(self, capacity: int, n_features: int, seed: int = 42):
+        self.capacity = capacity
+        self.X = np.empty((capacity, n_features), dtype=np.float64)
+        self.y = np.empty(capacity, dtype=np.int8)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, X: np.ndarray, y: np.ndarray):
+        n = len(X)
+        filled = min(self.seen, self.capacity)
+
+        # Fill free slots first
+        take = min(n, self.capacity - filled)
+        if take:
+            self.X[filled:filled + take] = X[:take]
+            self.y[filled:filled + take] = y[:take]
+
+        # Row number t (0-based) replaces a random slot with probability capacity / (t + 1)
+        rest = n - take
+        if rest:
+            positions = np.arange(self.seen + take, self.seen + n)
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < self.capacity
+            self.X[slots[keep]] = X[take:][keep]
+            self.y[slots[keep]] = y[take:][keep]
+
+        self.seen += n
+
+    def sample(self):
+        size = min(self.seen, self.capacity)
+        return self.X[:size], self.y[:size]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def train_from_db(
+    engine=None,
+    max_rows: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    holdout: float = 0.2,
+    activate: bool = False,
+    registry: Optional[ModelRegistry] = None,
+    seed: int = 42,
+) -> Dict:
+    """Train on labeled invoice history and register the model; returns a training report."""
+    if engine is None:
+        from app.db.session import engine
+    max_rows = max_rows or settings.TRAINING_MAX_ROWS
+    chunk_size = chunk_size or settings.TRAINING_CHUNK_ROWS
+    positive, negative = settings.TRAINING_POSITIVE_STATUSES, settings.TRAINING_NEGATIVE_STATUSES
+
+    timings = {}
+    reservoir = Reservoir(max_rows, len(FEATURE_COLUMNS), seed=seed)
+
+    # ---- stream + features -------------------------------------------------
+    started = time.perf_counter()
+    feature_seconds = 0.0
+    positives = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_size).execute(
+            labeled_invoices_query(positive, negative)
+        )
+        for chunk in result.partitions():
+            t = time.perf_counter()
+            X, y = build_features(chunk, positive)
+            reservoir.add(X, y)
+            positives += int(y.sum())
+            feature_seconds += time.perf_counter() - t
+    timings["stream_s"] = round(time.perf_counter() - started - feature_seconds, 3)
+    timings["features_s"] = round(feature_seconds, 3)
+
+    X, y = reservoir.sample()
+    logger.info(f"Streamed {reservoir.seen} labeled invoices, training on {len(X)}")
+    if len(X) < 10 or len(np.unique(y)) < 2:
+        raise ValueError(
+            f"Not enough labeled invoices to train ({reservoir.seen} rows, {positives} positive); "
+            f"need both {positive} and {negative} statuses"
+        )
+
+    # ---- fit ---------------------------------------------------------------
+    started = time.perf_counter()
+    order = np.random.default_rng(seed).permutation(len(X))
+    n_holdout = int(len(X) * holdout)
+    test, train = order[:n_holdout], order[n_holdout:]
+    model = RandomForestClassifier(
+        n_estimators=settings.TRAINING_N_ESTIMATORS,
+        max_depth=settings.TRAINING_MAX_DEPTH,
+        min_samples_leaf=settings.TRAINING_MIN_SAMPLES_LEAF,
+        n_jobs=settings.TRAINING_N_JOBS,
+        random_state=seed,
+        verbose=0
+    )
+    model.fit(X[train], y[train])
+    model.n_jobs = 1  # serving predicts row batches; no thread pool per call
+    timings["fit_s"] = round(time.perf_counter() - started, 3)
+
+    # ---- evaluate ----------------------------------------------------------
+    started = time.perf_counter()
+    metrics = {}
+    if n_holdout and len(np.unique(y[test])) == 2:
+        proba = model.predict_proba(X[test])[:, 1]
+        metrics = {
+            "holdout_rows": int(n_holdout),
+            "auc": round(float(roc_auc_score(y[test], proba)), 4),
+            "accuracy": round(float(accuracy_score(y[test], proba >= 0.5)), 4),
+        }
+    timings["evaluate_s"] = round(time.perf_counter() - started, 3)
+
+    # ---- register ----------------------------------------------------------
+    started = time.perf_counter()
+    report = {
+        "source": "invoices",
+        "rows_seen": reservoir.seen,
+        "rows_sampled": int(len(X)),
+        "positive_rate": round(positives / reservoir.seen, 4),
+        "params": {k: v for k, v in model.get_params().items() if k in (
+            "n_estimators", "max_depth", "min_samples_leaf", "random_state"
+        )},
+        "metrics": metrics,
+        "timings": timings,
+    }
+    registry = registry or ModelRegistry()
+    report["version"] = registry.register(model, report, activate=activate)
+    timings["register_s"] = round(time.perf_counter() - started, 3)
+    report["peak_rss_mb"] = _peak_rss_mb()
+
+    logger.info(
+        f"✅ Trained credit model {report['version']}: {report['rows_sampled']}/{report['rows_seen']} rows, "
+        f"metrics={metrics}, timings={timings}"
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the credit model on invoice history")
+    parser.add_argument("--max-rows", type=int, default=None, help="reservoir size (default TRAINING_MAX_ROWS)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per DB fetch (default TRAINING_CHUNK_ROWS)")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--activate", action="store_true", help="make the new version active")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = train_from_db(
+        max_rows=args.max_rows, chunk_size=args.chunk_size, holdout=args.holdout, activate=args.activate
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
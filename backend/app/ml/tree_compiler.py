@@ -0,0 +1,113 @@
+"""
+Compiled tree-ensemble inference.
+
+Flattens a fitted sklearn RandomForestClassifier into contiguous numpy arrays
+(feature, threshold, left/right children, per-node class probabilities) and
+evaluates them without sklearn's per-call validation and thread-pool
+overhead. Results are bit-identical to `predict_proba`:
+
+- X is cast to float32 like sklearn's tree input, then compared `<=` against
+  the float64 thresholds
+- leaf values are normalized per tree exactly as DecisionTreeClassifier does
+- per-tree probabilities are summed in estimator order, then divided by the
+  number of trees
+"""
+
+import numpy as np
+from sklearn.tree import _tree
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledForest:
+    def __init__(self, forest):
+        """Compile a fitted RandomForestClassifier."""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        self.n_trees = len(trees)
+        self.n_features = forest.n_features_in_
+        self.n_classes = int(forest.n_classes_)
+        self.classes_ = forest.classes_
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.roots = offsets[:-1].astype(np.intp)
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            is_leaf = tree.children_left == _tree.TREE_LEAF
+            node_ids = np.arange(tree.node_count)
+
+            # Leaves point at themselves, so walking past a leaf is a no-op
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :self.n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=np.intp)
+        self.threshold = np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64)
+        self.left = np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp)
+        self.right = np.ascontiguousarray(np.concatenate(rights), dtype=np.intp)
+        self.value = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+
+        # Python-float copies for the single-row walk (no per-step numpy scalar overhead)
+        self._feature_list = self.feature.tolist()
+        self._threshold_list = self.threshold.tolist()
+        self._left_list = self.left.tolist()
+        self._right_list = self.right.tolist()
+        self._value_list = self.value.tolist()
+        self._root_list = self.roots.tolist()
+
+        logger.info(f"✅ Compiled forest: {self.n_trees} trees, {len(self.feature)} nodes")
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_samples, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected X with shape (n, {self.n_features}), got {X.shape}")
+
+        # float32 values widened back to float64 (exact) so comparisons need no casting;
+        # flat offsets of each row's first feature make X lookups a single take()
+        flat = X.astype(np.float64).ravel()
+        row_offsets = (np.arange(X.shape[0]) * self.n_features)[:, np.newaxis]
+        nodes = np.repeat(self.roots[np.newaxis, :], X.shape[0], axis=0)
+        for _ in range(self.max_depth):
+            go_left = flat.take(row_offsets + self.feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for a batch, identical to the forest's predict_proba."""
+        per_tree = self.value.take(self.leaves(X), axis=0)  # (n_samples, n_trees, n_classes)
+        # add.accumulate sums strictly in estimator order, as sklearn does
+        proba = np.add.accumulate(per_tree, axis=1)[:, -1]
+        proba /= self.n_trees
+        return proba
+
+    def predict_proba_one(self, x) -> list:
+        """Class probabilities for one row, walking the trees in plain Python."""
+        row = np.asarray(x, dtype=np.float32).tolist()
+        feature, threshold = self._feature_list, self._threshold_list
+        left, right, value = self._left_list, self._right_list, self._value_list
+
+        proba = [0.0] * self.n_classes
+        for node in self._root_list:
+            while left[node] != node:
+                node = left[node] if row[feature[node]] <= threshold[node] else right[node]
+            leaf = value[node]
+            for c in range(self.n_classes):
+                proba[c] += leaf[c]
+        return [p / self.n_trees for p in proba]
+
+
+def compile_forest(forest) -> CompiledForest:
+    return CompiledForest(forest)
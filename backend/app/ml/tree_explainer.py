@@ -0,0 +1,193 @@
+"""
+Per-feature contributions for tree-ensemble predictions.
+
+Computes path-dependent TreeSHAP values (exact Shapley values of the
+cover-weighted conditional expectation, as in Lundberg et al.) for a fitted
+RandomForestClassifier, so that
+
+    expected_value + sum(contributions) == predict_proba(x)[positive class]
+
+Instead of walking the trees per row, every leaf is precomputed once. A
+leaf's share of the prediction depends on the row only through one bit per
+feature on its path: whether the row satisfies all of that feature's
+conditions on the way to the leaf. With at most `max_depth` such features per
+leaf, the Shapley contribution of each feature is tabulated for every bit
+pattern. At inference time a batch evaluates the split conditions once,
+builds each leaf's pattern, and sums table rows, all in numpy.
+"""
+
+from math import factorial
+from typing import List
+import logging
+
+import numpy as np
+from scipy import sparse
+from sklearn.tree import _tree
+
+logger = logging.getLogger(__name__)
+
+# Cap on (rows x leaves x depth) elements per chunk; bounds the intermediates for large forests
+CHUNK_ELEMENTS = 4 * 1024 * 1024
+
+
+def _shapley_weight(subset_size: int, n_players: int) -> float:
+    return factorial(subset_size) * factorial(n_players - subset_size - 1) / factorial(n_players)
+
+
+def _leaf_tables(ratios: np.ndarray, n_slots: int) -> np.ndarray:
+    """
+    Shapley values of the game g(S) = prod(a_j for j in S) * prod(r_j for j not in S)
+    for every on/off pattern of a, for leaves that share a path-feature count k.
+
+    ratios is (n_leaves, k): r_j is the fraction of training cover that went
+    the leaf's way on path feature j, and a_j is 1 when a row satisfies the
+    leaf's conditions on it. Returns (n_leaves, 2 ** n_slots, k).
+    """
+    n_leaves, k = ratios.shape
+    tables = np.zeros((n_leaves, 2 ** n_slots, k))
+    # Bits above k belong to slots these leaves don't have; they are always set
+    for pattern in range(2 ** n_slots):
+        a = [(pattern >> j) & 1 for j in range(k)]
+        for i in range(k):
+            others = [j for j in range(k) if j != i]
+            total = np.zeros(n_leaves)
+            for mask in range(2 ** len(others)):
+                product, size = np.ones(n_leaves), 0
+                for bit, j in enumerate(others):
+                    if (mask >> bit) & 1:
+                        product *= a[j]
+                        size += 1
+                    else:
+                        product *= ratios[:, j]
+                total += _shapley_weight(size, k) * product
+            tables[:, pattern, i] = (a[i] - ratios[:, i]) * total
+    return tables
+
+
+class ForestExplainer:
+    def __init__(self, forest, positive_class: int = 1):
+        """Precompute per-leaf contribution tables for a fitted RandomForestClassifier."""
+        n_trees = len(forest.estimators_)
+        self.n_features = forest.n_features_in_
+
+        node_features, node_thresholds = [], []
+        leaf_paths, leaf_values = [], []  # per leaf: [(internal node, went_left, feature, cover ratio)], value
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            offset = len(node_features)
+            internal = np.flatnonzero(tree.children_left != _tree.TREE_LEAF)
+            global_id = {int(node): offset + i for i, node in enumerate(internal)}
+            node_features.extend(tree.feature[internal].tolist())
+            node_thresholds.extend(tree.threshold[internal].tolist())
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            values = tree.value[:, 0, :]
+            totals = values.sum(axis=1)
+            totals[totals == 0.0] = 1.0
+            positive = values[:, positive_class] / totals
+            cover = tree.weighted_n_node_samples
+
+            stack = [(0, [])]
+            while stack:
+                node, path = stack.pop()
+                left, right = tree.children_left[node], tree.children_right[node]
+                if left == _tree.TREE_LEAF:
+                    leaf_paths.append(path)
+                    leaf_values.append(positive[node] / n_trees)
+                    continue
+                feature = int(tree.feature[node])
+                stack.append((left, path + [(global_id[node], True, feature, cover[left] / cover[node])]))
+                stack.append((right, path + [(global_id[node], False, feature, cover[right] / cover[node])]))
+
+        self.node_feature = np.array(node_features, dtype=np.intp)
+        self.node_threshold = np.array(node_thresholds, dtype=np.float64)
+
+        n_leaves = len(leaf_paths)
+        depth = max([len(path) for path in leaf_paths] + [1])
+        # Distinct features per path: bounded by both depth and feature count
+        self.n_slots = min(depth, self.n_features)
+
+        self.path_node = np.zeros((n_leaves, depth), dtype=np.intp)
+        self.path_left = np.ones((n_leaves, depth), dtype=bool)
+        self.path_slot = np.full((n_leaves, depth), -1, dtype=np.intp)  # -1 pads short paths
+        self.tables = np.zeros((n_leaves, 2 ** self.n_slots, self.n_features))
+
+        leaf_slots, leaf_ratios = [], []
+        for leaf, path in enumerate(leaf_paths):
+            slots, ratios = {}, []
+            for step, (node, went_left, feature, ratio) in enumerate(path):
+                if feature not in slots:
+                    slots[feature] = len(slots)
+                    ratios.append(1.0)
+                ratios[slots[feature]] *= ratio
+                self.path_node[leaf, step] = node
+                self.path_left[leaf, step] = went_left
+                self.path_slot[leaf, step] = slots[feature]
+            leaf_slots.append(slots)
+            leaf_ratios.append(ratios)
+
+        values = np.array(leaf_values)
+        expected = float(sum(value * np.prod(ratios) for value, ratios in zip(leaf_values, leaf_ratios)))
+
+        # Tabulate leaves with the same number of path features together
+        for k in sorted({len(ratios) for ratios in leaf_ratios}):
+            leaves = [leaf for leaf, ratios in enumerate(leaf_ratios) if len(ratios) == k]
+            if k == 0:
+                continue  # no splits: contributes only to the expected value
+            tables = _leaf_tables(np.array([leaf_ratios[leaf] for leaf in leaves]), self.n_slots)
+            tables *= values[leaves, np.newaxis, np.newaxis]
+            for row, leaf in enumerate(leaves):
+                for feature, slot in leaf_slots[leaf].items():
+                    self.tables[leaf, :, feature] = tables[row, :, slot]
+
+        self.expected_value = expected
+        self.chunk_rows = max(1, CHUNK_ELEMENTS // (n_leaves * max(depth, self.n_features)))
+
+        # Step-major copies of the paths: one contiguous (n_leaves,) row per depth.
+        # Each step carries its feature slot's bit (0 for padding, which never clears
+        # anything) in the narrowest dtype that holds a pattern.
+        self._full_pattern = 2 ** self.n_slots - 1
+        step_bit = np.where(self.path_slot >= 0, 1 << np.maximum(self.path_slot, 0), 0)
+        self._step_bit = np.ascontiguousarray(step_bit.T, dtype=np.min_scalar_type(self._full_pattern))
+        self._step_node = np.ascontiguousarray(self.path_node.T)
+        self._step_left = np.ascontiguousarray(self.path_left.T)
+
+        # Tables stacked as (leaf, pattern) rows for the selection product
+        self._flat_tables = self.tables.reshape(-1, self.n_features)
+        self._leaf_offset = (np.arange(n_leaves) * 2 ** self.n_slots).astype(np.int32)
+        self._ones = np.ones(self.chunk_rows * n_leaves)
+        logger.info(f"✅ Forest explainer: {n_leaves} leaves, {self.n_slots} path features max")
+
+    def shap_values(self, X: np.ndarray) -> np.ndarray:
+        """Contribution of each feature to the positive-class probability, shape (n_samples, n_features)."""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)  # compared like the trees compare
+        out = np.zeros((X.shape[0], self.n_features))
+        if len(self.node_feature) == 0:
+            return out  # no splits anywhere: every prediction is the expected value
+        for start in range(0, X.shape[0], self.chunk_rows):
+            out[start:start + self.chunk_rows] = self._chunk(X[start:start + self.chunk_rows])
+        return out
+
+    def _chunk(self, X: np.ndarray) -> np.ndarray:
+        # Every split condition once per row
+        goes_left = X[:, self.node_feature] <= self.node_threshold  # (n, n_internal)
+
+        # A failed path step clears its feature's bit in the leaf's pattern
+        pattern = np.full((X.shape[0], len(self._leaf_offset)), self._full_pattern, dtype=self._step_bit.dtype)
+        for step in range(self.path_node.shape[1]):
+            failed = goes_left[:, self._step_node[step]] != self._step_left[step]  # (n, n_leaves)
+            pattern &= ~(failed * self._step_bit[step])
+
+        # Sum each leaf's table row: a 0/1 selection matrix times the stacked tables
+        n_rows, n_leaves = pattern.shape
+        selected = (self._leaf_offset + pattern).ravel()
+        selection = sparse.csr_matrix(
+            (self._ones[:selected.size], selected, np.arange(0, selected.size + 1, n_leaves)),
+            shape=(n_rows, self._flat_tables.shape[0])
+        )
+        return selection @ self._flat_tables
+
+
+def explain_forest(forest) -> ForestExplainer:
+    return ForestExplainer(forest)
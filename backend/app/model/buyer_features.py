@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from datetime import datetime
+from app.model import Base  # ← Import shared Base
+
+class BuyerFeatures(Base):
+    """Precomputed buyer features (maintained by app.ml.feature_store)."""
+    __tablename__ = "buyer_features"
+    
+    buyer_id = Column(Integer, ForeignKey("buyers.id", ondelete="CASCADE"), primary_key=True)
+    buyer_name = Column(String(128), nullable=False)
+    avg_payment_days = Column(Integer, nullable=False)
+    on_time_rate = Column(Float, nullable=False)
+    total_invoices = Column(Integer, nullable=False)
+    risk_score = Column(Integer, nullable=False)
+    invoice_count = Column(Integer, nullable=False, default=0)  # invoices uploaded on CredPulse
+    invoice_volume = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from datetime import datetime
+from app.model import Base  # ← Import shared Base
+
+class WorkflowCheckpoint(Base):
+    __tablename__ = "workflow_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("workflow", "invoice_id", "node", "input_hash", name="uq_workflow_checkpoint"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    workflow = Column(String(64), nullable=False)
+    invoice_id = Column(Integer, nullable=False, index=True)
+    node = Column(String(64), nullable=False)
+    input_hash = Column(String(64), nullable=False)
+    output = Column(Text, nullable=False)  # JSON-encoded node output
+    created_at = Column(DateTime, default=datetime.utcnow)
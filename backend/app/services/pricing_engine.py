@@ -0,0 +1,200 @@
+"""
+Fixed-point pricing engine.
+
+All factoring math (offer, discount, processing fee, net, monthly cost)
+runs on integers: money in paise, rates and ratios in RATE_SCALE units per
+percent. RATE_SCALE keeps four decimals of a percent and a factor of 30, so
+the per-30-day tenor adjustment is an exact integer for every whole-day
+tenor. Every division rounds half to even exactly, so a given input always
+produces the same paise, whichever call site prices it and whether it is
+priced alone or in a batch.
+
+Used by PricingService (score-based rates, grid, batch and ladder) and by
+InvoiceFactoringAgent (explicit rate). Scalar prices are a Quote of plain
+ints; batches are int64 arrays, falling back to Python ints for amounts so
+large that the discount numerator would overflow int64. Amounts must be
+finite and non-negative, and tenors non-negative whole days; anything else
+raises ValueError rather than being priced into a different (or negative)
+offer.
+"""
+
+from bisect import bisect_right
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import math
+
+import numpy as np
+
+PAISE_PER_RUPEE = 100
+RATE_SCALE = 10_000 * 30  # rate units per percent; ratios use the same scale (0.90 -> 270000)
+DAYS_PER_YEAR = 365
+# offer * rate * days / DISCOUNT_DENOMINATOR is the discount for a rate in RATE_SCALE units
+DISCOUNT_DENOMINATOR = DAYS_PER_YEAR * 100 * RATE_SCALE
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+class EngineParams(NamedTuple):
+    """Pricing settings converted to RATE_SCALE integers."""
+    base_rate: int
+    risk_score_cutoffs: Tuple[int, ...]
+    risk_adjustments: Tuple[int, ...]
+    tenor_adjustment_per_30_days: int
+    advance_ratio: int
+    processing_fee_rate: int
+
+
+class Quote(NamedTuple):
+    """One priced offer; money in paise."""
+    invoice_amount: int
+    offer_amount: int
+    discount: int
+    processing_fee: int
+    net_amount: int
+    monthly_cost: int
+
+
+def div_half_even(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half to even (denominator > 0)."""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+def div_half_even_array(numerator: np.ndarray, denominator) -> np.ndarray:
+    # // and % rather than np.divmod, which has no loop for the object-dtype overflow path
+    quotient, remainder = numerator // denominator, numerator % denominator
+    twice = 2 * remainder
+    return quotient + ((twice > denominator) | ((twice == denominator) & (quotient % 2 == 1)))
+
+
+def to_scaled(value: float) -> int:
+    """A rate (%) or ratio in RATE_SCALE units; 2.5 -> 750000, 0.9 -> 270000."""
+    return round(value * RATE_SCALE)
+
+
+def to_paise(amount: float) -> int:
+    paise = amount * PAISE_PER_RUPEE
+    if not math.isfinite(paise) or amount < 0:
+        raise ValueError(f"Invoice amount must be finite and non-negative, got {amount}")
+    return round(paise)
+
+
+def to_paise_array(amounts) -> np.ndarray:
+    """to_paise over an array: int64, or Python ints (object) when an amount is beyond int64."""
+    values = np.asarray(amounts, dtype=np.float64)
+    paise = values * PAISE_PER_RUPEE
+    valid = np.isfinite(paise) & (values >= 0)
+    if not valid.all():
+        raise ValueError(f"Invoice amounts must be finite and non-negative, got {values[~valid][0]}")
+    if paise.max(initial=0) >= 2.0 ** 63:
+        # Casting would wrap to INT64_MIN; round each one exactly as to_paise does
+        return np.array([round(value) for value in paise.ravel()], dtype=object).reshape(paise.shape)
+    # np.rint rounds half to even like round(), on the same float product
+    return np.rint(paise).astype(np.int64)
+
+
+def to_days(tenor_days) -> int:
+    """A tenor as whole days; negative, fractional or non-finite tenors raise ValueError."""
+    if not isinstance(tenor_days, (int, np.integer)) and not float(tenor_days).is_integer():
+        raise ValueError(f"Tenor must be a whole number of days, got {tenor_days}")
+    if tenor_days < 0:
+        raise ValueError(f"Tenor must not be negative, got {tenor_days}")
+    return int(tenor_days)
+
+
+def to_days_array(tenor_days) -> np.ndarray:
+    """to_days over an array, as int64."""
+    tenors = np.asarray(tenor_days)
+    if tenors.dtype.kind in "iub":
+        days = tenors.astype(np.int64)
+    else:
+        values = tenors.astype(np.float64)
+        whole = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 2.0 ** 63)
+        if not whole.all():
+            raise ValueError(f"Tenors must be whole numbers of days, got {values[~whole][0]}")
+        days = values.astype(np.int64)
+    if (days < 0).any():
+        raise ValueError(f"Tenors must not be negative, got {days[days < 0][0]}")
+    return days
+
+
+def to_rupees(paise: int) -> float:
+    return paise / PAISE_PER_RUPEE
+
+
+def to_percent(rate: int) -> float:
+    """A RATE_SCALE rate as a percentage rounded (half to even) to 2 decimals."""
+    return div_half_even(rate, RATE_SCALE // 100) / 100
+
+
+def params_from_config(config) -> EngineParams:
+    """EngineParams from a PricingConfig (float percentages and ratios)."""
+    return EngineParams(
+        to_scaled(config.base_rate),
+        tuple(config.risk_score_cutoffs),
+        tuple(to_scaled(a) for a in config.risk_adjustments),
+        to_scaled(config.tenor_adjustment_per_30_days),
+        to_scaled(config.advance_ratio),
+        to_scaled(config.processing_fee_rate * 100),  # a fraction of the offer; scaled as a percentage
+    )
+
+
+def risk_adjustment(params: EngineParams, credit_score: float) -> int:
+    return params.risk_adjustments[bisect_right(params.risk_score_cutoffs, credit_score)]
+
+
+def tenor_adjustment(params: EngineParams, tenor_days: int) -> int:
+    return div_half_even(tenor_days * params.tenor_adjustment_per_30_days, 30)
+
+
+def annual_rate(params: EngineParams, credit_score: float, tenor_days: int) -> int:
+    """Base + risk band + tenor adjustment, in RATE_SCALE units."""
+    return params.base_rate + risk_adjustment(params, credit_score) + tenor_adjustment(params, tenor_days)
+
+
+def price(params: EngineParams, amount_paise: int, rate: int, tenor_days: int,
+          advance_ratio: Optional[int] = None) -> Quote:
+    """Offer for an amount in paise at an annual rate in RATE_SCALE units."""
+    ratio = params.advance_ratio if advance_ratio is None else advance_ratio
+    offer = div_half_even(amount_paise * ratio, RATE_SCALE)
+    discount = div_half_even(offer * rate * tenor_days, DISCOUNT_DENOMINATOR)
+    fee = div_half_even(offer * params.processing_fee_rate, RATE_SCALE * 100)
+    monthly = div_half_even(offer * rate * 30, DISCOUNT_DENOMINATOR)
+    return Quote(amount_paise, offer, discount, fee, offer - discount - fee, monthly)
+
+
+def price_batch(params: EngineParams, amount_paise: np.ndarray, rate: np.ndarray, tenor_days: np.ndarray,
+                advance_ratio: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """price() over arrays; returns Quote fields as int64 arrays (object arrays on overflow)."""
+    ratio = params.advance_ratio if advance_ratio is None else advance_ratio
+    amount_paise = np.asarray(amount_paise)
+    if amount_paise.dtype != object:  # to_paise_array's Python-int amounts stay exact
+        amount_paise = amount_paise.astype(np.int64)
+    rate = np.asarray(rate, dtype=np.int64)
+    tenor_days = np.asarray(tenor_days, dtype=np.int64)
+
+    # Largest intermediate is offer * rate * max(tenor, 30); fall back to Python ints beyond int64
+    bound = (
+        float(np.abs(amount_paise).max(initial=0)) * float(np.max(ratio)) / RATE_SCALE
+        * float(np.abs(rate).max(initial=0)) * max(float(np.abs(tenor_days).max(initial=0)), 30)
+    )
+    if bound >= _INT64_MAX / 2:  # margin for the float estimate
+        amount_paise, rate, tenor_days = (a.astype(object) for a in (amount_paise, rate, tenor_days))
+        if not np.isscalar(ratio):
+            ratio = np.asarray(ratio).astype(object)
+
+    offer = div_half_even_array(amount_paise * ratio, RATE_SCALE)
+    discount = div_half_even_array(offer * rate * tenor_days, DISCOUNT_DENOMINATOR)
+    fee = div_half_even_array(offer * params.processing_fee_rate, RATE_SCALE * 100)
+    monthly = div_half_even_array(offer * rate * 30, DISCOUNT_DENOMINATOR)
+    return {
+        "invoice_amount": amount_paise,
+        "offer_amount": offer,
+        "discount": discount,
+        "processing_fee": fee,
+        "net_amount": offer - discount - fee,
+        "monthly_cost": monthly,
+    }
@@ -1,59 +1,238 @@
+from bisect import bisect_right
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.services import pricing_engine as engine
+
+logger = logging.getLogger(__name__)
+
+BATCH_COLUMNS = [
+    "invoice_amount", "offer_amount", "discount", "processing_fee", "net_amount",
+    "rate", "tenor_days", "risk_adjustment", "tenor_adjustment", "monthly_cost"
+]
+
+
+class PricingConfig(NamedTuple):
+    """Snapshot of the PRICING_* settings (see app/config.py)."""
+    base_rate: float
+    risk_score_cutoffs: Tuple[int, ...]
+    risk_adjustments: Tuple[float, ...]
+    tenor_adjustment_per_30_days: float
+    advance_ratio: float
+    processing_fee_rate: float
+    supported_tenors: Tuple[int, ...]
+
+
+_config_cache = (None, None)  # (raw PRICING_* values, snapshot built from them)
+
+
+def pricing_config() -> PricingConfig:
+    """Current pricing settings; the same object until one of them changes."""
+    global _config_cache
+    raw = (
+        settings.PRICING_BASE_RATE,
+        settings.PRICING_RISK_SCORE_CUTOFFS,
+        settings.PRICING_RISK_ADJUSTMENTS,
+        settings.PRICING_TENOR_ADJUSTMENT_PER_30_DAYS,
+        settings.PRICING_ADVANCE_RATIO,
+        settings.PRICING_PROCESSING_FEE_RATE,
+        settings.PRICING_SUPPORTED_TENORS,
+    )
+    cached_raw, config = _config_cache
+    if raw == cached_raw:
+        return config
+    config = PricingConfig(raw[0], tuple(raw[1]), tuple(raw[2]), raw[3], raw[4], raw[5], tuple(raw[6]))
+    # Copy the lists so in-place edits to the settings still register as a change
+    _config_cache = (tuple(list(v) if isinstance(v, list) else v for v in raw), config)
+    return config
+
+
+def pricing_params() -> engine.EngineParams:
+    """Current pricing settings as fixed-point engine parameters."""
+    return get_pricing_grid().params
+
+
 class PricingService:
     @staticmethod
     def calculate_offer(invoice_amount: float, credit_score: int, tenor_days: int = 30):
-        """Calculate factoring offer with dynamic pricing."""
-        
-        # Base annual rate
-        base_rate = 2.5
-        
-        # Risk adjustment (lower score = higher rate)
-        # Score 800-1000: 0% adjustment
-        # Score 700-800: 0.5% adjustment
-        # Score 600-700: 1.0% adjustment
-        # Score < 600: 1.5% adjustment
-        if credit_score >= 800:
-            risk_adjustment = 0.0
-        elif credit_score >= 700:
-            risk_adjustment = 0.5
-        elif credit_score >= 600:
-            risk_adjustment = 1.0
+        """Calculate factoring offer with dynamic pricing (served from the precomputed grid)."""
+        return get_pricing_grid().quote(invoice_amount, credit_score, tenor_days)
+
+    @staticmethod
+    def calculate_offers_batch(
+        invoice_amounts: Union[np.ndarray, pd.DataFrame, list],
+        credit_scores: Optional[Union[np.ndarray, list]] = None,
+        tenor_days: Union[int, np.ndarray, list] = 30,
+        advance_ratio: Optional[Union[float, np.ndarray]] = None,
+    ) -> Union[Dict[str, np.ndarray], pd.DataFrame]:
+        """
+        Price many invoices at once in int64 paise; every value equals calculate_offer's for the same row.
+
+        Takes arrays (tenor_days may be a scalar) or a DataFrame with columns
+        invoice_amount (or amount), credit_score and optionally tenor_days.
+        Returns BATCH_COLUMNS as a dict of arrays, or a DataFrame for
+        DataFrame input. rate is the effective annual rate (%). advance_ratio
+        (scalar or per row) overrides PRICING_ADVANCE_RATIO.
+        """
+        frame_input = isinstance(invoice_amounts, pd.DataFrame)
+        if frame_input:
+            frame = invoice_amounts
+            amount_column = "invoice_amount" if "invoice_amount" in frame else "amount"
+            amounts = frame[amount_column].to_numpy(dtype=np.float64)
+            scores = frame["credit_score"].to_numpy()
+            tenors = frame["tenor_days"].to_numpy() if "tenor_days" in frame else tenor_days
         else:
-            risk_adjustment = 1.5
-        
-        # Tenor adjustment (longer tenor = higher rate)
-        # Per 30 days: +0.5%
-        tenor_adjustment = (tenor_days / 30) * 0.5
-        
-        # Final annual rate
-        final_rate = base_rate + risk_adjustment + tenor_adjustment
-        
-        # Offer amount (90% of invoice value for factoring)
-        offer_amount = invoice_amount * 0.90
-        
-        # Calculate discount/fee for tenor
-        daily_rate = final_rate / 365 / 100
-        discount = offer_amount * daily_rate * tenor_days
-        
-        # Net amount (what merchant receives)
-        net_amount = offer_amount - discount
-        
-        # Processing fee (1%)
-        processing_fee = offer_amount * 0.01
-        net_amount -= processing_fee
-        
+            amounts = np.asarray(invoice_amounts, dtype=np.float64)
+            scores = np.asarray(credit_scores)
+            tenors = tenor_days
+        tenors = engine.to_days_array(np.broadcast_to(np.asarray(tenors), amounts.shape))
+        params = pricing_params()
+
+        # Same integer terms as the grid's cells, elementwise
+        band = np.searchsorted(params.risk_score_cutoffs, scores, side="right")
+        risk_adjustment = np.asarray(params.risk_adjustments, dtype=np.int64)[band]
+        tenor_adjustment = engine.div_half_even_array(tenors * params.tenor_adjustment_per_30_days, 30)
+        rate = params.base_rate + risk_adjustment + tenor_adjustment
+        if advance_ratio is not None:
+            advance_ratio = np.rint(np.asarray(advance_ratio, dtype=np.float64) * engine.RATE_SCALE).astype(np.int64)
+
+        quotes = engine.price_batch(params, engine.to_paise_array(amounts), rate, tenors, advance_ratio)
+
+        def percent(values):
+            return engine.div_half_even_array(values, engine.RATE_SCALE // 100) / 100
+
+        result = {
+            "invoice_amount": quotes["invoice_amount"].astype(np.float64) / engine.PAISE_PER_RUPEE,
+            "offer_amount": quotes["offer_amount"].astype(np.float64) / engine.PAISE_PER_RUPEE,
+            "discount": quotes["discount"].astype(np.float64) / engine.PAISE_PER_RUPEE,
+            "processing_fee": quotes["processing_fee"].astype(np.float64) / engine.PAISE_PER_RUPEE,
+            "net_amount": quotes["net_amount"].astype(np.float64) / engine.PAISE_PER_RUPEE,
+            "rate": percent(rate),
+            "tenor_days": tenors,
+            "risk_adjustment": percent(risk_adjustment),
+            "tenor_adjustment": percent(tenor_adjustment),
+            "monthly_cost": quotes["monthly_cost"].astype(np.float64) / engine.PAISE_PER_RUPEE,
+        }
+        if frame_input:
+            return pd.DataFrame(result, index=frame.index)
+        return result
+
+    @staticmethod
+    def calculate_offer_ladder(
+        invoice_amounts: Union[np.ndarray, list],
+        credit_scores: Union[np.ndarray, list],
+        tenors: Optional[list] = None,
+        advance_ratios: Optional[list] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Offers for every invoice x advance ratio x tenor in one batch computation.
+
+        credit_scores has one score per invoice (or one for all). tenors
+        default to PRICING_SUPPORTED_TENORS, advance_ratios to
+        PRICING_ADVANCE_RATIO. Returns BATCH_COLUMNS plus advance_ratio, each
+        shaped (invoices, advance ratios, tenors).
+        """
+        config = pricing_config()
+        amounts = np.asarray(invoice_amounts, dtype=np.float64)
+        scores = np.broadcast_to(np.asarray(credit_scores), amounts.shape)
+        tenors = np.asarray(config.supported_tenors if tenors is None else tenors)
+        ratios = np.asarray([config.advance_ratio] if advance_ratios is None else advance_ratios, dtype=np.float64)
+        shape = (len(amounts), len(ratios), len(tenors))
+
+        result = PricingService.calculate_offers_batch(
+            np.broadcast_to(amounts[:, None, None], shape).ravel(),
+            np.broadcast_to(scores[:, None, None], shape).ravel(),
+            tenor_days=np.broadcast_to(tenors[None, None, :], shape).ravel(),
+            advance_ratio=np.broadcast_to(ratios[None, :, None], shape).ravel(),
+        )
+        ladder = {column: values.reshape(shape) for column, values in result.items()}
+        ladder["advance_ratio"] = np.broadcast_to(ratios[None, :, None], shape)
+        return ladder
+
+
+class PricingCell:
+    """Amount-independent pricing terms for one score band and tenor."""
+
+    __slots__ = ("rate", "breakdown")
+
+    def __init__(self, params: engine.EngineParams, credit_score: float, tenor_days: int):
+        risk_adjustment = engine.risk_adjustment(params, credit_score)
+        tenor_adjustment = engine.tenor_adjustment(params, tenor_days)
+        self.rate = params.base_rate + risk_adjustment + tenor_adjustment
+        self.breakdown = {
+            "base_rate": engine.to_percent(params.base_rate),
+            "risk_adjustment": engine.to_percent(risk_adjustment),
+            "tenor_adjustment": engine.to_percent(tenor_adjustment),
+            "effective_rate": engine.to_percent(self.rate)
+        }
+
+
+class PricingGrid:
+    """
+    Rate terms for every score band x supported tenor of one pricing config.
+
+    The annual rate depends only on the score band and the tenor; the amount
+    enters linearly. A quote is a band lookup plus the engine's integer
+    multiplies and divisions. Other tenors get a cell built on the fly.
+    """
+
+    def __init__(self, config: PricingConfig):
+        self.config = config
+        self.params = engine.params_from_config(config)
+        self.cutoffs = list(config.risk_score_cutoffs)
+
+        # A representative score per band: below the first cutoff, then each cutoff
+        band_scores = [self.cutoffs[0] - 1] + self.cutoffs
+        self.cells = {
+            (band, tenor): PricingCell(self.params, score, tenor)
+            for band, score in enumerate(band_scores)
+            for tenor in config.supported_tenors
+        }
+
+    def cell(self, credit_score: float, tenor_days: int) -> Optional[PricingCell]:
+        return self.cells.get((bisect_right(self.cutoffs, credit_score), tenor_days))
+
+    def quote(self, invoice_amount: float, credit_score: int, tenor_days: int = 30) -> Dict:
+        """Factoring offer from the precomputed cell; money rounded half to even to the paisa."""
+        tenor_days = engine.to_days(tenor_days)
+        cell = self.cell(credit_score, tenor_days) or PricingCell(self.params, credit_score, tenor_days)
+        quote = engine.price(self.params, engine.to_paise(invoice_amount), cell.rate, tenor_days)
+
         return {
-            "invoice_amount": round(invoice_amount, 2),
-            "offer_amount": round(offer_amount, 2),
-            "discount": round(discount, 2),
-            "processing_fee": round(processing_fee, 2),
-            "net_amount": round(net_amount, 2),
-            "rate": round(final_rate, 2),
+            "invoice_amount": engine.to_rupees(quote.invoice_amount),
+            "offer_amount": engine.to_rupees(quote.offer_amount),
+            "discount": engine.to_rupees(quote.discount),
+            "processing_fee": engine.to_rupees(quote.processing_fee),
+            "net_amount": engine.to_rupees(quote.net_amount),
+            "rate": cell.breakdown["effective_rate"],
             "tenor_days": tenor_days,
-            "breakdown": {
-                "base_rate": base_rate,
-                "risk_adjustment": round(risk_adjustment, 2),
-                "tenor_adjustment": round(tenor_adjustment, 2),
-                "effective_rate": round(final_rate, 2)
-            },
-            "monthly_cost": round((discount / tenor_days * 30), 2)
+            "breakdown": dict(cell.breakdown),
+            "monthly_cost": engine.to_rupees(quote.monthly_cost)
         }
+
+
+_grid: Optional[PricingGrid] = None
+_grid_lock = threading.Lock()
+
+
+def get_pricing_grid() -> PricingGrid:
+    """Grid for the current PRICING_* settings, rebuilt when any of them changed."""
+    global _grid
+    config = pricing_config()
+    grid = _grid
+    if grid is not None and grid.config is config:
+        return grid
+    with _grid_lock:
+        if _grid is None or _grid.config is not config:
+            reloaded = _grid is not None
+            _grid = PricingGrid(config)
+            logger.info(
+                f"{'🔄 Rebuilt' if reloaded else '✅ Built'} pricing grid: "
+                f"{len(_grid.cutoffs) + 1} score bands x tenors {list(config.supported_tenors)}"
+            )
+        return _grid
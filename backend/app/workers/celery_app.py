@@ -1,5 +1,9 @@
 from celery import Celery
+from celery.signals import worker_process_init
 from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 celery_app = Celery(
     "credpulse_workers",
@@ -17,4 +21,23 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
-)
\ No newline at end of file
+)
+
+@worker_process_init.connect
+def warm_up_models(**kwargs):
+    """Load the credit model and buyer features in each worker process before it takes tasks."""
+    # Task writes to buyers/invoices keep buyer_features in sync
+    from app.ml.feature_store import install_listeners
+    install_listeners()
+    if not settings.MODEL_WARMUP_ON_STARTUP:
+        return
+    try:
+        from app.ml.credit_model import warm_up
+        warm_up()
+    except Exception as e:
+        logger.error(f"❌ Credit model warm-up failed: {str(e)}")
+    try:
+        from app.ml.feature_store import buyer_feature_store
+        buyer_feature_store.start()
+    except Exception as e:
+        logger.error(f"❌ Buyer feature store warm-up failed: {str(e)}")
@@ -37,30 +37,27 @@ def verify_invoice_task(self, invoice_id, merchant_id):
         self.retry(exc=e, countdown=5, max_retries=3)
 
 @celery_app.task(name="tasks.score_invoice", bind=True)
-def score_invoice_task(self, invoice_id):
+def score_invoice_task(self, invoice_id, buyer_id=101, amount=75000, age_days=5):
     """Score invoice using ML model."""
     logger.info(f"📊 Scoring invoice {invoice_id}")
     
     try:
-        from app.ml.credit_model import scorer
+        from app.ml.credit_model import get_scorer
+        from app.ml.feature_store import buyer_feature_store
         
-        time.sleep(2)
-        
-        # Mock buyer history
-        buyer_history = {
-            "avg_payment_days": 22,
-            "on_time_rate": 0.93,
-            "total_invoices": 18
-        }
+        # Buyer features from the in-process feature store
+        buyer_history = buyer_feature_store.get(buyer_id)
+        if buyer_history is None:
+            logger.warning(f"⚠️ No features for buyer {buyer_id}, scoring with defaults")
+            buyer_history = {}
         
-        # Mock invoice data
         invoice_data = {
-            "amount": 75000,
-            "age_days": 5
+            "amount": amount,
+            "age_days": age_days
         }
         
         # Score
-        score_result = scorer.score(invoice_data, buyer_history)
+        score_result = get_scorer().score(invoice_data, buyer_history)
         
         logger.info(f"✅ Invoice {invoice_id} scored: {score_result['score']}")
         return score_result
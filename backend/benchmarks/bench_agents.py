@@ -0,0 +1,148 @@
+# backend/benchmarks/bench_agents.py
+
+"""
+Offline benchmark for the agent orchestration path.
+
+Drives OrchestrationAgent.aexecute() and the /api/v1/agents/analyze route at
+fixed concurrency levels against FakeLLMBackend, so no network or Groq key is
+needed. Reports throughput and latency percentiles, plus orchestration
+overhead: p50 latency minus the ideal critical path of two sequential LLM
+calls (supply chain -> factoring, with credit scoring in parallel).
+
+Usage (from backend/):
+    python -m benchmarks.bench_agents
+    python -m benchmarks.bench_agents --concurrency 1 16 64 --requests 200 --latency-ms 50
+    python -m benchmarks.bench_agents --error-rate 0.05 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import DEMO_BUYERS, print_table, summarize
+
+import httpx  # noqa: E402
+
+from app.agents.fake_llm import FakeLLMBackend  # noqa: E402
+from app.agents.llm_cache import llm_cache  # noqa: E402
+from app.agents.llm_gateway import llm_gateway  # noqa: E402
+from app.agents.orchestration_agent import OrchestrationAgent  # noqa: E402
+from app.config import settings  # noqa: E402
+import app.api.agents as agents_api  # noqa: E402
+
+
+def build_orchestrator() -> OrchestrationAgent:
+    orchestrator = OrchestrationAgent()
+    # Every request must really run: no checkpoints carried between levels
+    orchestrator.workflow.store = None
+    # Buyer lookups come from the seed fixtures instead of Postgres
+    orchestrator.supply_chain_agent.buyer_payment_history = (
+        lambda buyer_id: dict(DEMO_BUYERS.get(buyer_id, DEMO_BUYERS[102]))
+    )
+    return orchestrator
+
+
+def request_body(i: int) -> dict:
+    # Vary invoice ids so prompts differ between requests
+    return {"invoice_id": 1000 + i, "buyer_id": 101 + i % 3, "merchant_id": 1 + i % 5}
+
+
+async def run_level(call, concurrency: int, requests: int) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                await call(request_body(i))
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, time.perf_counter() - started)
+    result["errors"] = errors
+    return result
+
+
+async def main(args):
+    llm_gateway.set_backend(FakeLLMBackend(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ))
+    llm_gateway.backoff_base = 0.01
+    llm_cache.enabled = args.cache
+    settings.FAST_PATH_ENABLED = args.fast_path
+
+    orchestrator = build_orchestrator()
+    agents_api._orchestrator = orchestrator
+
+    from app.main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=120) as client:
+        async def call_route(body):
+            response = await client.post("/api/v1/agents/analyze", json=body)
+            response.raise_for_status()
+
+        targets = {
+            "orchestrator": orchestrator.aexecute,
+            "route": call_route,
+        }
+
+        # Warm-up (model load, imports, connection setup)
+        await orchestrator.aexecute(request_body(0))
+
+        rows = []
+        ideal_ms = 2 * args.latency_ms
+        for name, call in targets.items():
+            for concurrency in args.concurrency:
+                result = await run_level(call, concurrency, args.requests)
+                result.update({
+                    "target": name,
+                    "concurrency": concurrency,
+                    "overhead_p50_ms": round(result["p50_ms"] - ideal_ms, 2),
+                })
+                rows.append(result)
+
+    print(f"\nFake LLM: median {args.latency_ms}ms, sigma {args.latency_sigma}, "
+          f"error rate {args.error_rate}, cache {'on' if args.cache else 'off'}, "
+          f"fast path {'on' if args.fast_path else 'off'}\n")
+    print_table(rows, ["target", "concurrency", "requests", "throughput_rps",
+                       "p50_ms", "p95_ms", "p99_ms", "overhead_p50_ms", "errors"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline agent orchestration benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="fake LLM median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="lognormal latency shape")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="enable the LLM response cache")
+    parser.add_argument("--fast-path", action="store_true", help="enable the rule-based fast path")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,120 @@
+# backend/benchmarks/bench_event_loop.py
+
+"""
+Event-loop responsiveness check.
+
+Keeps a number of /api/v1/agents/analyze requests in flight against a slow
+FakeLLMBackend and a deliberately blocking buyer lookup (time.sleep, like a
+slow sync DB query), while probing /health on the same event loop. If any
+route does blocking work on the loop, /health latency jumps to the length of
+that work. Exits non-zero when /health p99 exceeds the threshold, so it can
+gate CI.
+
+Usage (from backend/):
+    python -m benchmarks.bench_event_loop
+    python -m benchmarks.bench_event_loop --inflight 32 --db-latency-ms 300 --max-health-p99-ms 50
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks.common import DEMO_BUYERS, print_table, summarize
+
+import httpx  # noqa: E402
+
+from app.agents.fake_llm import FakeLLMBackend  # noqa: E402
+from app.agents.llm_cache import llm_cache  # noqa: E402
+from app.agents.llm_gateway import llm_gateway  # noqa: E402
+from app.agents.orchestration_agent import OrchestrationAgent  # noqa: E402
+from app.config import settings  # noqa: E402
+import app.api.agents as agents_api  # noqa: E402
+
+
+async def main(args) -> int:
+    llm_gateway.set_backend(FakeLLMBackend(latency_ms=args.llm_latency_ms, latency_sigma=0))
+    llm_cache.enabled = False
+    settings.FAST_PATH_ENABLED = False
+
+    orchestrator = OrchestrationAgent()
+    orchestrator.workflow.store = None
+
+    def slow_buyer_lookup(buyer_id):
+        time.sleep(args.db_latency_ms / 1000)  # blocking, like a sync SQLAlchemy query
+        return dict(DEMO_BUYERS.get(buyer_id, DEMO_BUYERS[102]))
+
+    orchestrator.supply_chain_agent.buyer_payment_history = slow_buyer_lookup
+    agents_api._orchestrator = orchestrator
+
+    from app.main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=120) as client:
+        stop = asyncio.Event()
+        analyses = 0
+        rejected = 0
+
+        async def analyze_forever(i: int):
+            nonlocal analyses, rejected
+            while not stop.is_set():
+                response = await client.post(
+                    "/api/v1/agents/analyze",
+                    json={"invoice_id": 5000 + i, "buyer_id": 102, "merchant_id": 1}
+                )
+                if response.status_code == 503:
+                    rejected += 1
+                    await asyncio.sleep(0.05)
+                else:
+                    analyses += 1
+
+        health_latencies = []
+
+        async def probe_health():
+            # Latency is measured from when the probe was due, so a stalled loop
+            # shows up even if the stall happens while the prober is sleeping
+            interval = args.probe_interval_ms / 1000
+            deadline = time.perf_counter() + args.duration
+            due = time.perf_counter()
+            while due < deadline:
+                response = await client.get("/health")
+                response.raise_for_status()
+                health_latencies.append((time.perf_counter() - due) * 1000)
+                due += interval
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            stop.set()
+
+        workers = [asyncio.create_task(analyze_forever(i)) for i in range(args.inflight)]
+        started = time.perf_counter()
+        await probe_health()
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - started
+
+    health = summarize(health_latencies, elapsed)
+    health["max_ms"] = round(max(health_latencies), 2)
+    print(f"\n{args.inflight} analyses in flight, LLM {args.llm_latency_ms}ms, "
+          f"blocking DB lookup {args.db_latency_ms}ms\n")
+    print_table([health], ["requests", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    print(f"\nanalyses completed: {analyses}, rejected with 503: {rejected}")
+
+    if health["p99_ms"] > args.max_health_p99_ms:
+        print(f"\n❌ /health p99 {health['p99_ms']}ms exceeds {args.max_health_p99_ms}ms: "
+              f"something is blocking the event loop")
+        return 1
+
+    print(f"\n✅ /health p99 within {args.max_health_p99_ms}ms")
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Event-loop responsiveness check")
+    parser.add_argument("--inflight", type=int, default=16, help="concurrent analyses")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to probe /health")
+    parser.add_argument("--probe-interval-ms", type=float, default=20.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--db-latency-ms", type=float, default=200.0)
+    parser.add_argument("--max-health-p99-ms", type=float, default=50.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,167 @@
+# backend/benchmarks/bench_explain.py
+
+"""
+Score explanation benchmark: TreeSHAP contributions vs plain prediction.
+
+First checks the precomputed-table explainer against a brute-force Shapley
+reference (cover-weighted conditional expectations over every feature subset)
+on the credit model and on a deeper forest, and checks that expected value +
+contributions reproduces predict_proba. Then times compiled prediction alone
+vs prediction + contributions, and score_batch with CREDIT_SCORE_CONTRIBUTIONS
+off and on. Exits non-zero if the values disagree or if contributions cost
+more than --max-overhead times plain score_batch at the largest batch size.
+
+Usage (from backend/):
+    python -m benchmarks.bench_explain
+    python -m benchmarks.bench_explain --sizes 1,1000,100000 --max-overhead 3
+"""
+
+from itertools import combinations
+from math import factorial
+import argparse
+import gc
+import sys
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.common import print_table
+from benchmarks.bench_scoring import random_features
+
+from app.config import settings  # noqa: E402
+from app.ml.credit_model import get_scorer  # noqa: E402
+from app.ml.tree_compiler import compile_forest  # noqa: E402
+from app.ml.tree_explainer import explain_forest  # noqa: E402
+
+
+def conditional_expectation(tree, x, subset, node=0) -> float:
+    """E[f(x) | x_subset] for one tree, averaging unknown splits by training cover."""
+    t = tree.tree_
+    left, right = t.children_left[node], t.children_right[node]
+    if left == -1:
+        value = t.value[node, 0]
+        return value[1] / value.sum()
+    feature = t.feature[node]
+    if feature in subset:
+        child = left if np.float32(x[feature]) <= t.threshold[node] else right
+        return conditional_expectation(tree, x, subset, child)
+    cover = t.weighted_n_node_samples
+    return (
+        cover[left] * conditional_expectation(tree, x, subset, left)
+        + cover[right] * conditional_expectation(tree, x, subset, right)
+    ) / cover[node]
+
+
+def brute_force_shap(forest, x) -> np.ndarray:
+    n = len(x)
+    cache = {}
+
+    def value(subset):
+        key = frozenset(subset)
+        if key not in cache:
+            cache[key] = np.mean([conditional_expectation(t, x, key) for t in forest.estimators_])
+        return cache[key]
+
+    phi = np.zeros(n)
+    for i in range(n):
+        others = [j for j in range(n) if j != i]
+        for size in range(n):
+            weight = factorial(size) * factorial(n - size - 1) / factorial(n)
+            for subset in combinations(others, size):
+                phi[i] += weight * (value(set(subset) | {i}) - value(set(subset)))
+    return phi
+
+
+def verify(forest, label: str, rows: int, seed: int) -> bool:
+    explainer = explain_forest(forest)
+    X = random_features(rows, seed)
+    phi = explainer.shap_values(X)
+
+    reference = np.array([brute_force_shap(forest, x) for x in X])
+    shap_error = float(np.abs(phi - reference).max())
+    additivity_error = float(np.abs(explainer.expected_value + phi.sum(axis=1) - forest.predict_proba(X)[:, 1]).max())
+
+    ok = shap_error < 1e-9 and additivity_error < 1e-9
+    print(f"{label}: max |TreeSHAP - brute force| = {shap_error:.2e}, "
+          f"max additivity error = {additivity_error:.2e} ({rows} rows) {'✅' if ok else '❌'}")
+    return ok
+
+
+def best_of(call, repeats: int) -> float:
+    """Best wall time in ms over a few repeats (less GC/scheduler noise than the mean)."""
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        call()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def main(args) -> int:
+    scorer = get_scorer()
+    model = scorer.model
+
+    # A deeper forest exercises multi-feature paths the production model may not have
+    X_train = random_features(2000, args.seed)
+    y_train = (X_train[:, 2] * 100 - X_train[:, 1] - X_train[:, 0] / 20000 + np.random.default_rng(args.seed).normal(0, 5, 2000)) > 50
+    deep = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=args.seed).fit(X_train, y_train.astype(int))
+
+    ok = verify(model, "credit model", args.verify_rows, args.seed)
+    ok = verify(deep, "depth-6 forest", args.verify_rows, args.seed + 1) and ok
+    if not ok:
+        print("❌ Contributions disagree with exact Shapley values")
+        return 1
+
+    compiled = compile_forest(model)
+    explainer = explain_forest(model)
+    settings.SCORE_CACHE_ENABLED = False  # time the model, not the cache
+
+    rows, overhead = [], None
+    for size in args.sizes:
+        X = random_features(size, args.seed + 2)
+        records = [
+            {"amount": r[0], "avg_payment_days": r[1], "on_time_rate": r[2], "age_days": r[3]}
+            for r in X
+        ]
+        repeats = max(3, min(200, 20000 // size))
+
+        predict_ms = best_of(lambda: compiled.predict_proba(X), repeats)
+        explain_ms = best_of(lambda: (compiled.predict_proba(X), explainer.shap_values(X)), repeats)
+
+        settings.CREDIT_SCORE_CONTRIBUTIONS = False
+        score_ms = best_of(lambda: scorer.score_batch(records), repeats)
+        settings.CREDIT_SCORE_CONTRIBUTIONS = True
+        score_explained_ms = best_of(lambda: scorer.score_batch(records), repeats)
+
+        overhead = score_explained_ms / score_ms
+        rows.append({
+            "rows": size,
+            "predict_ms": round(predict_ms, 3),
+            "predict+shap_ms": round(explain_ms, 3),
+            "score_batch_ms": round(score_ms, 3),
+            "+contributions_ms": round(score_explained_ms, 3),
+            "overhead": f"{overhead:.2f}x",
+        })
+
+    print()
+    print_table(rows, ["rows", "predict_ms", "predict+shap_ms", "score_batch_ms", "+contributions_ms", "overhead"])
+
+    if overhead is not None and overhead > args.max_overhead:
+        print(f"\n❌ Contributions cost {overhead:.2f}x plain scoring (limit {args.max_overhead}x)")
+        return 1
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score explanation benchmark")
+    parser.add_argument("--sizes", type=lambda s: [int(v) for v in s.split(",")], default=[1, 1000, 100000])
+    parser.add_argument("--verify-rows", type=int, default=50)
+    parser.add_argument("--max-overhead", type=float, default=3.0, help="allowed score_batch slowdown at the largest size")
+    parser.add_argument("--seed", type=int, default=11)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,120 @@
+# backend/benchmarks/bench_scoring.py
+
+"""
+Credit model inference benchmark: sklearn predict_proba vs the compiled forest.
+
+Times the per-request path used by score_invoice_task (CreditScorer.score on
+one invoice) and batch scoring, with CREDIT_MODEL_COMPILED on and off. Before
+timing, it checks that the compiled forest returns probabilities identical to
+sklearn on random rows (single-row and batch paths) and exits non-zero if
+they differ.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scoring
+    python -m benchmarks.bench_scoring --iterations 5000 --batch-size 100000
+"""
+
+import argparse
+import gc
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table, summarize
+
+from app.config import settings  # noqa: E402
+from app.ml.credit_model import get_scorer  # noqa: E402
+from app.ml.tree_compiler import compile_forest  # noqa: E402
+
+# Same inputs score_invoice_task scores
+INVOICE_DATA = {"amount": 75000, "age_days": 5}
+BUYER_HISTORY = {"avg_payment_days": 22, "on_time_rate": 0.93, "total_invoices": 18}
+
+
+def random_features(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(5000, 400000, n),
+        rng.integers(5, 90, n).astype(float),
+        rng.uniform(0.5, 1.0, n),
+        rng.integers(0, 60, n).astype(float),
+    ])
+
+
+def verify(model, n: int, seed: int) -> bool:
+    compiled = compile_forest(model)
+    X = random_features(n, seed)
+    expected = model.predict_proba(X)
+    batch_ok = np.array_equal(expected, compiled.predict_proba(X))
+    single = np.array([compiled.predict_proba_one(row) for row in X[:min(n, 2000)]])
+    single_ok = np.array_equal(expected[:len(single)], single)
+    print(f"identical to sklearn: batch {batch_ok}, single-row {single_ok} ({n} rows)")
+    return batch_ok and single_ok
+
+
+def time_calls(call, iterations: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - t) * 1000)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main(args) -> int:
+    scorer = get_scorer()
+    model = scorer.model
+
+    if not verify(model, args.verify_rows, args.seed):
+        print("❌ Compiled forest disagrees with sklearn")
+        return 1
+
+    batch = [
+        ({"amount": row[0], "age_days": row[3]}, {"avg_payment_days": row[1], "on_time_rate": row[2]})
+        for row in random_features(args.batch_size, args.seed + 1)
+    ]
+
+    settings.SCORE_CACHE_ENABLED = False  # time the model, not the cache
+    rows = []
+    for compiled in (False, True):
+        settings.CREDIT_MODEL_COMPILED = compiled
+        engine = "compiled" if compiled else "sklearn"
+        scorer.score(INVOICE_DATA, BUYER_HISTORY)  # warm-up (and compile)
+
+        single = time_calls(lambda: scorer.score(INVOICE_DATA, BUYER_HISTORY), args.iterations)
+        single.update({"engine": engine, "path": "score (1 invoice)"})
+        rows.append(single)
+
+        gc.collect()  # don't bill this engine for the previous one's garbage
+        started = time.perf_counter()
+        scorer.score_batch(batch)
+        elapsed = time.perf_counter() - started
+        rows.append({
+            "engine": engine,
+            "path": f"score_batch ({args.batch_size})",
+            "requests": 1,
+            "p50_ms": round(elapsed * 1000, 2),
+            "throughput_rps": round(args.batch_size / elapsed, 2),
+        })
+
+    print()
+    print_table(rows, ["engine", "path", "requests", "throughput_rps", "mean_ms", "p50_ms", "p99_ms"])
+
+    speedup = rows[0]["p50_ms"] / rows[2]["p50_ms"] if rows[2]["p50_ms"] else float("inf")
+    print(f"\nper-request p50 speedup: {speedup:.1f}x")
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Credit model inference benchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="single-invoice calls per engine")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--verify-rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,118 @@
+# backend/benchmarks/cases.py
+
+"""
+Timed cases for the micro-benchmark suite (benchmarks/suite.py).
+
+Every module-level function named bench_<case> is a case, pytest-style. It
+takes the row count n and returns a zero-argument callable that processes n
+synthetic rows. Setup (data generation, model loading) happens before the
+callable is returned and is not timed. Inputs are seeded, so every run and
+every baseline sees the same data.
+"""
+
+import numpy as np
+
+from benchmarks.common import BACKEND_DIR  # noqa: F401  (sets up sys.path and env)
+
+from app.agents.invoice_factoring_agent import InvoiceFactoringAgent  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.ml.credit_model import get_scorer  # noqa: E402
+from app.services.pricing_service import PricingService  # noqa: E402
+
+SEED = 7
+TENORS = np.array([15, 30, 60, 90])
+
+
+def synthetic_invoices(n: int, seed: int = SEED) -> dict:
+    """Column arrays for n invoices: amount, buyer features, age, credit score, tenor, rate."""
+    rng = np.random.default_rng(seed)
+    return {
+        "amount": np.round(rng.uniform(5000, 400000, n), 2),
+        "avg_payment_days": rng.integers(5, 90, n).astype(float),
+        "on_time_rate": np.round(rng.uniform(0.5, 1.0, n), 3),
+        "age_days": rng.integers(0, 60, n).astype(float),
+        "credit_score": rng.integers(300, 1000, n),
+        "tenor_days": TENORS[rng.integers(0, len(TENORS), n)],
+        "rate": np.round(rng.uniform(2.5, 6.0, n), 2),
+    }
+
+
+def reference(n: int):
+    """
+    Calibration workload for the suite: no app code, so its time moves only
+    with the host. Mixes an interpreter loop building dicts with a numpy sort,
+    like the cases do.
+    """
+    values = synthetic_invoices(n)["amount"]
+    rows = values.tolist()
+
+    def run():
+        np.sort(values)
+        return [{"amount": amount, "net": round(amount * 0.975, 2)} for amount in rows]
+    return run
+
+
+def _score_records(n: int) -> list:
+    data = synthetic_invoices(n)
+    return [
+        ({"amount": amount, "age_days": age}, {"avg_payment_days": days, "on_time_rate": on_time})
+        for amount, days, on_time, age in zip(
+            data["amount"].tolist(), data["avg_payment_days"].tolist(),
+            data["on_time_rate"].tolist(), data["age_days"].tolist()
+        )
+    ]
+
+
+def _scorer():
+    # Time the model path, not score cache hits on repeated buckets
+    settings.SCORE_CACHE_ENABLED = False
+    scorer = get_scorer()
+    scorer.load_or_train()
+    return scorer
+
+
+def bench_credit_score(n: int):
+    """CreditScorer.score, one call per invoice."""
+    scorer = _scorer()
+    records = _score_records(n)
+
+    def run():
+        for invoice_data, buyer_history in records:
+            scorer.score(invoice_data, buyer_history)
+    return run
+
+
+def bench_credit_score_batch(n: int):
+    """CreditScorer.score_batch over all invoices at once."""
+    scorer = _scorer()
+    records = _score_records(n)
+    return lambda: scorer.score_batch(records)
+
+
+def bench_pricing_calculate_offer(n: int):
+    """PricingService.calculate_offer, one call per invoice."""
+    data = synthetic_invoices(n)
+    rows = list(zip(data["amount"].tolist(), data["credit_score"].tolist(), data["tenor_days"].tolist()))
+
+    def run():
+        for amount, score, tenor in rows:
+            PricingService.calculate_offer(amount, score, tenor)
+    return run
+
+
+def bench_pricing_calculate_offers_batch(n: int):
+    """PricingService.calculate_offers_batch over all invoices at once."""
+    data = synthetic_invoices(n)
+    return lambda: PricingService.calculate_offers_batch(data["amount"], data["credit_score"], data["tenor_days"])
+
+
+def bench_factoring_calculate_offer(n: int):
+    """InvoiceFactoringAgent.calculate_offer, one call per invoice."""
+    agent = InvoiceFactoringAgent()
+    data = synthetic_invoices(n)
+    rows = list(zip(data["amount"].tolist(), data["rate"].tolist(), data["tenor_days"].tolist()))
+
+    def run():
+        for amount, rate, tenor in rows:
+            agent.calculate_offer(amount, rate, tenor)
+    return run
@@ -0,0 +1,49 @@
+# backend/benchmarks/common.py
+
+"""Shared helpers for the benchmark scripts."""
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Make `app` importable when run as a script from anywhere
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DIR))
+
+# Benchmarks never need the real Postgres; keep engine creation harmless
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("DEBUG", "false")
+
+from app.agents.batch_runner import percentile  # noqa: E402
+
+# Mirrors the buyers created by scripts/seed_demo_data.py
+DEMO_BUYERS = {
+    101: {"buyer_id": 101, "buyer_name": "Excellent Corp - Fast Payer", "avg_payment_days": 18,
+          "on_time_rate": 0.95, "total_invoices": 25, "risk_score": 850},
+    102: {"buyer_id": 102, "buyer_name": "Good Business Ltd", "avg_payment_days": 35,
+          "on_time_rate": 0.82, "total_invoices": 12, "risk_score": 680},
+    103: {"buyer_id": 103, "buyer_name": "High Risk Corp", "avg_payment_days": 60,
+          "on_time_rate": 0.65, "total_invoices": 8, "risk_score": 450},
+}
+
+
+def summarize(latencies_ms: List[float], elapsed_s: float) -> Dict[str, float]:
+    """Throughput and latency percentiles for one benchmark run."""
+    return {
+        "requests": len(latencies_ms),
+        "throughput_rps": round(len(latencies_ms) / elapsed_s, 2) if elapsed_s else 0.0,
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 2) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+    }
+
+
+def print_table(rows: List[Dict], columns: List[str]):
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
@@ -0,0 +1,224 @@
+# backend/benchmarks/suite.py
+
+"""
+Scoring and pricing micro-benchmark suite with regression gates.
+
+Runs every bench_* case in benchmarks/cases.py at each size (default 1, 1k
+and 100k rows), plus the reference calibration case (cases.reference) at
+REFERENCE_ROWS rows, and records, per case and size:
+
+- p50_ms / p99_ms: wall time of one run over n rows (at n=1, single-call latency)
+- best_ms: the lowest median over BLOCKS timed blocks. Blocks run in rounds
+  over every case, so each case's blocks are spread across the whole suite
+  run and a GC pause, scheduler hiccup or slow stretch of a shared machine
+  only spoils the blocks it overlaps
+- relative_best: best_ms divided by the reference case's best_ms in the same
+  run; host speed cancels out of the ratio
+- throughput_rps: rows per second at the p50
+- peak_kb: peak Python allocation during one run (tracemalloc, measured in a
+  separate untimed run)
+
+Results can be saved as a JSON baseline and compared against one later;
+compare mode exits non-zero when relative_best or peak memory is worse than
+the baseline by more than --threshold (a fraction, 0.25 = 25%) and by more
+than the metric's absolute slack. Absolute timings (best_ms, p50, p99) are
+machine-specific and only reported, so a committed baseline gates runs on
+other hosts. The ratio removes overall host speed, not every difference
+between CPUs; re-record the baseline when the gate runs somewhere very
+different (another architecture, Python or numpy version).
+
+Usage (from backend/):
+    python -m benchmarks.suite
+    python -m benchmarks.suite --save benchmarks/baselines/default.json
+    python -m benchmarks.suite --compare benchmarks/baselines/default.json --threshold 0.25
+    python -m benchmarks.suite --cases credit_score_batch,pricing_calculate_offer --sizes 1,1000
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import percentile, print_table
+from benchmarks import cases
+
+# Regressions are judged on these; p50 and p99 are reported but move with
+# whatever else the machine is doing, so neither is gated
+GATED_METRICS = ("relative_best", "peak_kb")
+# Absolute slack below which a change is noise (relative_best in ms of this run):
+# perf_counter ticks in ns, but back-to-back runs of a few-microsecond call
+# still differ by a microsecond or two
+METRIC_SLACK = {"relative_best": 0.005, "peak_kb": 16.0}
+
+# Calibration case every ratio is taken against (cases.reference); one size,
+# large enough that its own timing noise stays small next to the cases'
+REFERENCE_CASE = "reference"
+REFERENCE_ROWS = 10_000
+
+# Total timed rows per case and size; small sizes repeat to get stable percentiles,
+# and even the largest runs once per block so best_ms is a minimum over BLOCKS runs
+TARGET_ROWS = 100_000
+BLOCKS = 5
+MIN_REPEATS = BLOCKS
+MAX_REPEATS = 2000
+
+
+def discover(selected: List[str] = None) -> Dict[str, Callable]:
+    """bench_<name> functions from benchmarks.cases, in definition order."""
+    found = {
+        name[len("bench_"):]: fn
+        for name, fn in vars(cases).items()
+        if name.startswith("bench_") and callable(fn)
+    }
+    if selected:
+        unknown = set(selected) - set(found)
+        if unknown:
+            raise SystemExit(f"Unknown cases: {', '.join(sorted(unknown))} (available: {', '.join(found)})")
+        found = {name: found[name] for name in selected}
+    return found
+
+
+def time_block(run: Callable[[], object], repeats: int) -> List[float]:
+    gc.collect()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def peak_kb(run: Callable[[], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def summarize_blocks(blocks: List[List[float]], n: int) -> Dict[str, float]:
+    timings = [t for block in blocks for t in block]
+    p50 = percentile(timings, 50)
+    return {
+        "repeats": len(timings),
+        "best_ms": round(min(percentile(block, 50) for block in blocks), 4),
+        "p50_ms": round(p50, 4),
+        "p99_ms": round(percentile(timings, 99), 4),
+        "throughput_rps": round(n / (p50 / 1000), 1) if p50 else 0.0,
+    }
+
+
+def run_suite(selected: List[str], sizes: List[int]) -> Dict[str, Dict[str, float]]:
+    reference_key = f"{REFERENCE_CASE}/{REFERENCE_ROWS}"
+    runs = {reference_key: (cases.reference(REFERENCE_ROWS), REFERENCE_ROWS)}
+    runs.update(
+        (f"{name}/{n}", (bench(n), n))
+        for name, bench in discover(selected).items()
+        for n in sizes
+    )
+    for run, _ in runs.values():
+        run()  # warm-up: lazy loads and first-call caches in the callee
+
+    blocks = {key: [] for key in runs}
+    for round_ in range(BLOCKS):
+        for key, (run, n) in runs.items():
+            repeats = max(MIN_REPEATS, min(MAX_REPEATS, TARGET_ROWS // n)) // BLOCKS
+            blocks[key].append(time_block(run, repeats))
+        print(f"  round {round_ + 1}/{BLOCKS} done", flush=True)
+
+    results = {}
+    for key, (run, n) in runs.items():
+        results[key] = {**summarize_blocks(blocks[key], n), "peak_kb": peak_kb(run)}
+    reference_ms = results[reference_key]["best_ms"]
+    for values in results.values():
+        values["relative_best"] = round(values["best_ms"] / reference_ms, 6)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Dict]:
+    """One row per shared case/size; `regressed` lists metrics worse than baseline by > threshold."""
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        row = {"case": key, "regressed": []}
+        for metric in GATED_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            row[metric] = f"{before} -> {after} ({change:+.0%})"
+            excess = after - before
+            if metric == "relative_best":
+                # In ms: this run's time minus the baseline ratio at this run's reference speed
+                excess = current["best_ms"] * (1 - before / after) if after else 0.0
+            if change > threshold and excess > METRIC_SLACK.get(metric, 0.0):
+                row["regressed"].append(metric)
+        rows.append(row)
+    return rows
+
+
+def main(args) -> int:
+    logging.disable(logging.INFO)  # model loading logs would interleave with the progress lines
+    sizes = args.sizes
+    print(f"Running {', '.join(discover(args.cases))} at sizes {sizes}")
+    results = run_suite(args.cases, sizes)
+
+    print()
+    print_table(
+        [{"case": key, **values} for key, values in results.items()],
+        ["case", "repeats", "best_ms", "relative_best", "p50_ms", "p99_ms", "throughput_rps", "peak_kb"]
+    )
+
+    if args.save:
+        document = {
+            "meta": {
+                "created_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "processor": platform.processor() or platform.machine(),
+            },
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nWrote baseline {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        rows = compare(results, baseline, args.threshold)
+        print()
+        print_table(
+            [{**row, "regressed": ", ".join(row["regressed"]) or "-"} for row in rows],
+            ["case", *GATED_METRICS, "regressed"]
+        )
+        regressions = [row for row in rows if row["regressed"]]
+        if regressions:
+            print(f"\n❌ {len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} ({len(rows)} cases compared)")
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scoring and pricing micro-benchmarks")
+    parser.add_argument("--cases", type=lambda s: s.split(","), default=None, help="comma-separated case names")
+    parser.add_argument("--sizes", type=lambda s: [int(v) for v in s.split(",")], default=[1, 1000, 100000])
+    parser.add_argument("--save", help="write results as a baseline JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression per metric (fraction)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
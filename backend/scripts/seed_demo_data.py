@@ -16,12 +16,14 @@ from app.model.merchant import Merchant
 from app.model.user import User
 from app.model.invoice import Invoice  # ← Add this too
 from app.core.security import hash_password
+from app.ml.feature_store import install_listeners
 
 def seed_demo_data():
     """Populate demo data."""
     
     # CREATE ALL TABLES FIRST
     Base.metadata.create_all(bind=engine)
+    install_listeners()  # seeded buyers get their buyer_features rows on commit
     print("✅ Tables created")
     
     db = SessionLocal()
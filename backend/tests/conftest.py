@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Make `app` importable and keep the app off the real Postgres / Groq
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("MODEL_WARMUP_ON_STARTUP", "false")
+os.environ.setdefault("MODEL_REGISTRY_DIR", tempfile.mkdtemp(prefix="credpulse-registry-"))
+
+
+def random_features(n: int, seed: int) -> np.ndarray:
+    """Rows of [amount, avg_payment_days, on_time_rate, age_days] like the invoices the model scores."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(5000, 400000, n),
+        rng.integers(5, 90, n).astype(float),
+        rng.uniform(0.5, 1.0, n),
+        rng.integers(0, 60, n).astype(float),
+    ])
+
+
+def fit_forest(seed: int = 0, n_estimators: int = 25, max_depth: int = 8):
+    """A credit-model-shaped forest deep enough to exercise many split paths."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    X = random_features(2000, seed)
+    risk = X[:, 0] / 400000 + X[:, 1] / 90 - X[:, 2] + np.random.default_rng(seed).normal(0, 0.2, len(X))
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, random_state=seed)
+    return model.fit(X, (risk < 0.2).astype(int))
+
+
+@pytest.fixture(scope="session")
+def forest():
+    return fit_forest()
@@ -0,0 +1,120 @@
+"""Credit model registry integration: hot swap, shadow isolation and migrating pre-registry artifacts."""
+
+import pickle
+
+import joblib
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.core.metrics import SHADOW_BATCHES
+from app.ml import credit_model
+from app.ml.credit_model import CreditScorer
+from app.ml.model_registry import ModelRegistry
+
+from conftest import fit_forest, random_features
+
+RECORDS = [
+    {"amount": row[0], "avg_payment_days": row[1], "on_time_rate": row[2], "age_days": row[3]}
+    for row in random_features(200, seed=11)
+]
+
+
+@pytest.fixture(autouse=True)
+def no_watcher(monkeypatch):
+    # reload() is driven by the tests, not a polling thread
+    monkeypatch.setattr(settings, "MODEL_RELOAD_INTERVAL_SECONDS", 0)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(root=str(tmp_path / "registry"))
+
+
+@pytest.fixture
+def other_forest():
+    return fit_forest(seed=1, n_estimators=10, max_depth=4)
+
+
+def expected_scores(model):
+    X = np.array([[r["amount"], r["avg_payment_days"], r["on_time_rate"], r["age_days"]] for r in RECORDS])
+    return (model.predict_proba(X)[:, 1] * 1000).astype(int).tolist()
+
+
+def test_reload_hot_swaps_to_the_activated_version(registry, forest, other_forest):
+    registry.register(forest, activate=True)
+    scorer = CreditScorer(registry)
+    assert scorer.model_version == "v1"
+
+    registry.register(other_forest)
+    assert scorer.reload() is False  # registered but not activated
+
+    first = scorer.score_batch(RECORDS)
+    registry.activate("v2")
+    assert scorer.reload() is True
+    assert scorer.reload() is False
+    second = scorer.score_batch(RECORDS)
+
+    assert scorer.model_version == "v2"
+    assert {r["model_version"] for r in first} == {"v1"}
+    assert {r["model_version"] for r in second} == {"v2"}
+    assert [r["score"] for r in first] == expected_scores(forest)
+    assert [r["score"] for r in second] == expected_scores(other_forest)
+
+
+def test_shadow_failures_do_not_affect_primary_scores(registry, forest, other_forest, monkeypatch):
+    registry.register(forest, activate=True)
+    registry.register(other_forest)
+    registry.set_shadow("v2")
+    scorer = CreditScorer(registry)
+    scorer.load_or_train()
+    assert scorer.shadow_version == "v2"
+
+    def broken(features):
+        raise RuntimeError("shadow model exploded")
+
+    monkeypatch.setattr(scorer._shadow, "predict_positive", broken)
+    errors_before = SHADOW_BATCHES._values.get(("error",), 0.0)
+
+    results = scorer.score_batch(RECORDS)
+    scorer._shadow_executor.shutdown(wait=True)
+
+    assert [r["score"] for r in results] == expected_scores(forest)
+    assert {r["model_version"] for r in results} == {"v1"}
+    assert SHADOW_BATCHES._values.get(("error",), 0.0) == errors_before + 1
+    assert scorer._shadow_pending == 0
+
+
+def test_legacy_pickle_is_migrated_once(registry, forest, tmp_path, monkeypatch):
+    # _bootstrap looks for model.pkl next to the credit_model module
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(forest, f)
+    monkeypatch.setattr(credit_model, "__file__", str(tmp_path / "credit_model.py"))
+    monkeypatch.setattr(settings, "CREDIT_MODEL_PATH", str(tmp_path / "missing.joblib"))
+    monkeypatch.setattr(CreditScorer, "train_model", lambda self: pytest.fail("should not train"))
+
+    assert CreditScorer(registry).model_version == "v1"
+    assert CreditScorer(registry).model_version == "v1"  # a second process finds the registry populated
+
+    manifest = registry.manifest()
+    assert list(manifest["versions"]) == ["v1"]
+    assert registry.metadata("v1")["source"] == "model.pkl"
+    assert [r["score"] for r in CreditScorer(registry).score_batch(RECORDS)] == expected_scores(forest)
+
+
+def test_credit_model_path_takes_precedence_and_is_migrated_once(registry, forest, other_forest, tmp_path,
+                                                                  monkeypatch):
+    legacy = tmp_path / "credit_model.joblib"
+    joblib.dump(other_forest, legacy)
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump(forest, f)
+    monkeypatch.setattr(credit_model, "__file__", str(tmp_path / "credit_model.py"))
+    monkeypatch.setattr(settings, "CREDIT_MODEL_PATH", str(legacy))
+    monkeypatch.setattr(CreditScorer, "train_model", lambda self: pytest.fail("should not train"))
+
+    CreditScorer(registry).load_or_train()
+    CreditScorer(registry).load_or_train()
+
+    assert list(registry.manifest()["versions"]) == ["v1"]
+    assert registry.metadata("v1")["source"] == str(legacy)
+    assert [r["score"] for r in CreditScorer(registry).score_batch(RECORDS)] == expected_scores(other_forest)
@@ -0,0 +1,127 @@
+"""
+Blocking work in async routes must go through run_blocking: the event loop
+stays responsive while it runs, and a saturated pool answers 503. Work of an
+admitted request (workflow nodes, checkpoints) is never rejected.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.agents.workflow import MemoryCheckpointStore, Node, Workflow
+from app.api import agents as agents_api
+from app.api import invoices as invoices_api
+from app.core import executor
+from app.db.session import get_db
+from app.main import app
+
+DB_LATENCY_S = 0.2
+
+
+def slow_get_invoice(invoice_id, db=None):
+    time.sleep(DB_LATENCY_S)  # blocking, like a sync SQLAlchemy query
+    return {"id": invoice_id, "invoice_number": f"INV{invoice_id}", "amount": 75000.0, "status": "uploaded"}
+
+
+@pytest.fixture
+def slow_invoices(monkeypatch):
+    monkeypatch.setattr(invoices_api.InvoiceService, "get_invoice", staticmethod(slow_get_invoice))
+    app.dependency_overrides[get_db] = lambda: None
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def client():
+    return httpx.AsyncClient(app=app, base_url="http://test", timeout=30)
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_under_blocking_requests(slow_invoices, client, monkeypatch):
+    monkeypatch.setattr(executor, "blocking_executor", executor.BlockingExecutor(max_workers=16, max_pending=64))
+
+    async with client:
+        requests = [asyncio.create_task(client.get(f"/api/v1/invoices/{i}")) for i in range(16)]
+
+        # Probe /health on the same loop while the invoice reads are blocked
+        latencies = []
+        while not all(r.done() for r in requests):
+            started = time.perf_counter()
+            response = await client.get("/health")
+            assert response.status_code == 200
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.01)
+
+        responses = await asyncio.gather(*requests)
+
+    assert [r.status_code for r in responses] == [200] * 16
+    assert len(latencies) >= 5
+    # A read blocking the loop would stall a probe for the whole DB latency
+    assert max(latencies) < DB_LATENCY_S / 2
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_returns_503(slow_invoices, client, monkeypatch):
+    pool = executor.BlockingExecutor(max_workers=2, max_pending=2)
+    monkeypatch.setattr(executor, "blocking_executor", pool)
+
+    async with client:
+        responses = await asyncio.gather(*(client.get(f"/api/v1/invoices/{i}") for i in range(6)))
+
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200, 200, 503, 503, 503, 503]
+    rejected = next(r for r in responses if r.status_code == 503)
+    assert rejected.headers["Retry-After"] == "1"
+    assert pool.stats()["rejected"] == 4
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_admitted_work_is_not_rejected_by_a_saturated_pool(monkeypatch):
+    pool = executor.BlockingExecutor(max_workers=2, max_pending=1)
+    monkeypatch.setattr(executor, "blocking_executor", pool)
+
+    workflow = Workflow(
+        "admission",
+        [
+            Node("a", run=lambda context, inputs: {"a": 1}),
+            Node("b", run=lambda context, inputs: {"b": inputs["a"]["a"] + 1}, deps=["a"]),
+        ],
+        output="b",
+        store=MemoryCheckpointStore(),
+    )
+
+    # An admitted request already fills the pool's admission capacity
+    holder = asyncio.create_task(executor.run_admitted(time.sleep, DB_LATENCY_S))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(executor.OverloadedError):
+        await executor.run_blocking(time.sleep, 0)
+    # Nodes and checkpoint load/save of the running workflow still go through
+    assert await workflow.arun({"invoice_id": 1}) == {"b": 2}
+
+    await holder
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["pending"] == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_agent_routes_apply_admission_at_the_edge(client, monkeypatch):
+    pool = executor.BlockingExecutor(max_workers=1, max_pending=1)
+    monkeypatch.setattr(executor, "blocking_executor", pool)
+    monkeypatch.setattr(agents_api, "blocking_executor", pool)
+
+    holder = asyncio.create_task(executor.run_admitted(time.sleep, DB_LATENCY_S))
+    await asyncio.sleep(0.01)
+    async with client:
+        analyze = await client.post("/api/v1/agents/analyze", json={"invoice_id": 1, "buyer_id": 101})
+        batch = await client.post("/api/v1/agents/analyze-batch", json={"items": [{"invoice_id": 1, "buyer_id": 101}]})
+    await holder
+
+    assert analyze.status_code == 503
+    assert batch.status_code == 503
+    assert pool.stats()["rejected"] == 2
+    pool.shutdown()
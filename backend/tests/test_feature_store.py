@@ -0,0 +1,127 @@
+"""Buyer feature store: ORM writes re-materialize buyer_features; cold misses only read."""
+
+import importlib
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import session as session_module
+from app.ml import feature_store
+from app.ml.feature_store import BuyerFeatureStore
+from app.model.buyer import Buyer
+from app.model.buyer_features import BuyerFeatures
+from app.model.invoice import Invoice
+
+# app.db re-exports an init_db function under the submodule's name
+init_db_module = importlib.import_module("app.db.init_db")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'credpulse.db'}")
+    monkeypatch.setattr(session_module, "engine", engine)
+    monkeypatch.setattr(session_module, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+    monkeypatch.setattr(init_db_module, "engine", engine)
+
+    init_db_module.init_db()  # creates the tables and installs the listeners
+    yield session_module.SessionLocal
+    feature_store.remove_listeners()
+    engine.dispose()
+
+
+def features_row(SessionLocal, buyer_id):
+    with SessionLocal() as s:
+        return s.get(BuyerFeatures, buyer_id)
+
+
+def add_buyer(SessionLocal, buyer_id, **fields):
+    with SessionLocal() as s:
+        s.add(Buyer(id=buyer_id, gstin=f"27AAAAA{buyer_id:04d}A1Z5", name=f"Buyer {buyer_id}", **fields))
+        s.commit()
+
+
+def test_init_db_installs_the_listeners_once(db):
+    init_db_module.init_db()
+
+    assert event.contains(Session, "after_commit", feature_store._materialize_changed_buyers)
+    feature_store.remove_listeners()
+    assert not event.contains(Session, "after_commit", feature_store._materialize_changed_buyers)
+    assert not event.contains(Session, "after_flush", feature_store._collect_changed_buyers)
+
+
+def test_orm_writes_refresh_the_buyer_row(db):
+    add_buyer(db, 1, avg_payment_days=20, on_time_rate=0.9, risk_score=750)
+    add_buyer(db, 2)
+    assert features_row(db, 1).invoice_count == 0
+    assert features_row(db, 2).avg_payment_days == 30  # defaults applied
+
+    with db() as s:
+        s.add(Invoice(id=10, merchant_id=1, buyer_id=1, invoice_number="INV10", amount=75000.0))
+        s.commit()
+    row = features_row(db, 1)
+    assert (row.invoice_count, row.invoice_volume) == (1, 75000.0)
+
+    with db() as s:
+        s.get(Invoice, 10).amount = 90000.0
+        s.get(Buyer, 1).on_time_rate = 0.97
+        s.commit()
+    row = features_row(db, 1)
+    assert (row.invoice_volume, row.on_time_rate) == (90000.0, 0.97)
+
+    # Moving an invoice to another buyer updates both
+    with db() as s:
+        s.get(Invoice, 10).buyer_id = 2
+        s.commit()
+    assert features_row(db, 1).invoice_count == 0
+    assert (features_row(db, 2).invoice_count, features_row(db, 2).invoice_volume) == (1, 90000.0)
+
+
+def test_rolled_back_writes_do_not_materialize(db):
+    add_buyer(db, 1)
+    with db() as s:
+        s.add(Invoice(id=10, merchant_id=1, buyer_id=1, invoice_number="INV10", amount=75000.0))
+        s.flush()
+        s.rollback()
+
+    assert features_row(db, 1).invoice_count == 0
+
+
+def test_cold_miss_is_read_only_and_unknown_ids_are_cached(db):
+    engine = session_module.engine
+    # Inserted behind the ORM's back: no buyer_features row
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO buyers (id, gstin, name, avg_payment_days, on_time_rate, total_invoices, risk_score) "
+            "VALUES (5, '27BBBBB0005B1Z5', 'Late Buyer', 42, 0.81, 9, 610)"
+        ))
+
+    store = BuyerFeatureStore(refresh_interval=3600, miss_ttl=60)
+    store.refresh(full=True)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    features = store.get(5)
+    assert store.get(404) is None
+    assert store.get(404) is None
+
+    assert features["buyer_name"] == "Late Buyer"
+    assert (features["avg_payment_days"], features["risk_score"]) == (42, 610)
+    assert statements and all(sql.lstrip().upper().startswith("SELECT") for sql in statements)
+    assert features_row(db, 5) is None
+    assert store.stats()["negative_hits"] == 1
+
+    # Later lookups are served from memory
+    statements.clear()
+    assert store.get(5)["buyer_name"] == "Late Buyer"
+    assert statements == []
+
+
+def test_cold_miss_surfaces_database_errors(db):
+    store = BuyerFeatureStore(refresh_interval=3600)
+    store.refresh(full=True)
+    with session_module.engine.begin() as connection:
+        connection.execute(text("DROP TABLE buyer_features"))
+
+    with pytest.raises(Exception):
+        store.get(7)
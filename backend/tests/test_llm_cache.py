@@ -0,0 +1,140 @@
+"""LLMCache: memory LRU bounds, TTL expiry, the SQLite tier and its failure modes."""
+
+import threading
+
+import pytest
+
+from app.agents import llm_cache as llm_cache_module
+from app.agents.llm_cache import LLMCache
+from app.core import executor
+
+
+def request(n):
+    return {"model": "test", "messages": [{"role": "user", "content": f"invoice {n}"}], "temperature": 0}
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_cache_module, "time", fake)
+    return fake
+
+
+def test_memory_tier_evicts_least_recently_used_entry():
+    cache = LLMCache(max_entries=2)
+    cache.set(request(1), "one")
+    cache.set(request(2), "two")
+    assert cache.get(request(1)) == "one"  # 2 is now the least recently used
+
+    cache.set(request(3), "three")
+
+    assert cache.get(request(2)) is None
+    assert cache.get(request(1)) == "one"
+    assert cache.get(request(3)) == "three"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    cache = LLMCache(max_entries=100, max_bytes=10)
+    cache.set(request(1), "aaaa")
+    cache.set(request(2), "bbbb")
+    cache.set(request(3), "cccc")  # 12 bytes > 10: the oldest goes
+
+    assert cache.get(request(1)) is None
+    assert cache.stats()["bytes"] == 8
+
+    cache.set(request(4), "x" * 11)  # larger than the whole budget: not cached
+    assert cache.get(request(4)) is None
+    assert cache.stats()["bytes"] == 8
+
+
+def test_expired_entries_are_misses(clock, tmp_path):
+    cache = LLMCache(ttl_seconds=60, sqlite_path=str(tmp_path / "cache.db"))
+    cache.set(request(1), "one")
+
+    clock.now += 59
+    assert cache.get(request(1)) == "one"
+
+    clock.now += 2
+    assert cache.get(request(1)) is None
+    stats = cache.stats()
+    # Dropped from memory, then from disk
+    assert stats["expirations"] == 2
+    assert stats["misses"] == 1
+    assert cache._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone() == (0,)
+
+
+def test_disk_hit_refills_memory_and_is_counted(tmp_path):
+    path = str(tmp_path / "cache.db")
+    LLMCache(sqlite_path=path).set(request(1), "one")
+
+    cache = LLMCache(sqlite_path=path)  # e.g. another worker, or after a restart
+    assert cache.get(request(1)) == "one"
+    assert cache.get(request(1)) == "one"
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["disk_hits"] == 1
+    assert stats["entries"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_sqlite_tier_is_bounded_by_bytes(tmp_path, clock):
+    cache = LLMCache(sqlite_path=str(tmp_path / "cache.db"), sqlite_max_bytes=10)
+    for n in range(3):
+        clock.now += 1
+        cache.set(request(n), "abcd")
+
+    rows = cache._db.execute("SELECT value FROM llm_cache ORDER BY created_at").fetchall()
+    assert len(rows) == 2
+    assert LLMCache(sqlite_path=str(tmp_path / "cache.db")).get(request(0)) is None
+
+
+def test_broken_sqlite_tier_counts_as_a_miss(tmp_path):
+    cache = LLMCache(sqlite_path=str(tmp_path / "cache.db"))
+    cache._db.execute("DROP TABLE llm_cache")
+
+    cache.set(request(1), "one")  # write fails; the memory tier still has it
+    assert cache.get(request(1)) == "one"
+    assert cache.get(request(2)) is None
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_lookups_read_sqlite_in_the_blocking_pool(tmp_path, monkeypatch):
+    pool = executor.BlockingExecutor(max_workers=1, max_pending=1)
+    monkeypatch.setattr(executor, "blocking_executor", pool)
+
+    path = str(tmp_path / "cache.db")
+    LLMCache(sqlite_path=path).set(request(1), "one")
+    cache = LLMCache(sqlite_path=path)
+
+    loop_thread = threading.get_ident()
+    disk_threads = []
+    get_disk = cache._get_disk
+
+    def recording_get_disk(key, now):
+        disk_threads.append(threading.get_ident())
+        return get_disk(key, now)
+
+    monkeypatch.setattr(cache, "_get_disk", recording_get_disk)
+
+    assert await cache.aget(request(1)) == "one"
+    assert await cache.aget(request(1)) == "one"  # memory hit: no disk read
+    assert await cache.aget(request(2)) is None
+    await cache.aset(request(3), "three")
+
+    assert len(disk_threads) == 2
+    assert loop_thread not in disk_threads
+    assert cache._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone() == (2,)
+    assert cache.stats()["disk_hits"] == 1
+    pool.shutdown()
@@ -0,0 +1,112 @@
+"""GET /api/v1/offers/ladder: request limits, input validation and the priced options."""
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.config import settings
+from app.main import app
+from app.services.pricing_service import PricingService
+
+LADDER = "/api/v1/offers/ladder"
+
+
+@pytest_asyncio.fixture
+async def client():
+    async with httpx.AsyncClient(app=app, base_url="http://test", timeout=30) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_ladder_prices_every_tenor_and_ratio(client):
+    response = await client.get(LADDER, params=[
+        ("amount", 75000), ("amount", 120000), ("credit_score", 720), ("credit_score", 810),
+        ("tenor", 30), ("tenor", 45), ("advance_ratio", 0.8), ("advance_ratio", 0.9),
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["tenors"] == [30, 45]
+    assert body["advance_ratios"] == [0.8, 0.9]
+    assert [offer["credit_score"] for offer in body["offers"]] == [720, 810]
+    assert [len(offer["options"]) for offer in body["offers"]] == [4, 4]
+
+    # The configured ratio's options are the single-offer prices
+    option = next(o for o in body["offers"][1]["options"] if o["advance_ratio"] == 0.9 and o["tenor_days"] == 45)
+    expected = PricingService.calculate_offer(120000, 810, 45)
+    assert {field: option[field] for field in ("offer_amount", "net_amount", "rate", "monthly_cost")} == {
+        field: expected[field] for field in ("offer_amount", "net_amount", "rate", "monthly_cost")
+    }
+
+
+@pytest.mark.asyncio
+async def test_ladder_defaults_and_shared_score(client):
+    response = await client.get(LADDER, params=[("amount", 75000), ("amount", 0), ("credit_score", 0)])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["tenors"] == settings.PRICING_SUPPORTED_TENORS
+    assert body["advance_ratios"] == [settings.PRICING_ADVANCE_RATIO]
+    assert [offer["credit_score"] for offer in body["offers"]] == [0, 0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params, detail", [
+    ([("amount", 1000), ("credit_score", -5)], "Credit scores must be between 0 and 1000"),
+    ([("amount", 1000), ("credit_score", 2000)], "Credit scores must be between 0 and 1000"),
+    ([("amount", 1000), ("amount", 2000), ("credit_score", 700), ("credit_score", 1001)],
+     "Credit scores must be between 0 and 1000"),
+    ([("amount", 1000), ("credit_score", 700), ("tenor", 0)], "Tenors must be between 1 and 365 days"),
+    ([("amount", 1000), ("credit_score", 700), ("tenor", -30)], "Tenors must be between 1 and 365 days"),
+    ([("amount", 1000), ("credit_score", 700), ("tenor", 100000000)], "Tenors must be between 1 and 365 days"),
+    ([("amount", -5), ("credit_score", 700)], "Invoice amounts must be finite and non-negative"),
+    ([("amount", "nan"), ("credit_score", 700)], "Invoice amounts must be finite and non-negative"),
+    ([("amount", "inf"), ("credit_score", 700)], "Invoice amounts must be finite and non-negative"),
+    ([("amount", 1000), ("credit_score", 700), ("advance_ratio", 0)], "Advance ratios must be in (0, 1]"),
+    ([("amount", 1000), ("credit_score", 700), ("advance_ratio", 1.5)], "Advance ratios must be in (0, 1]"),
+    ([("amount", 1000), ("amount", 2000), ("amount", 3000), ("credit_score", 700), ("credit_score", 710)],
+     "Pass one credit_score per amount, or a single credit_score"),
+])
+async def test_ladder_rejects_invalid_input(client, params, detail):
+    response = await client.get(LADDER, params=params)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+@pytest.mark.asyncio
+async def test_ladder_request_limits(client, monkeypatch):
+    monkeypatch.setattr(settings, "OFFER_LADDER_MAX_INVOICES", 3)
+    monkeypatch.setattr(settings, "OFFER_LADDER_MAX_TENORS", 2)
+    monkeypatch.setattr(settings, "OFFER_LADDER_MAX_ADVANCE_RATIOS", 2)
+    monkeypatch.setattr(settings, "OFFER_LADDER_MAX_OPTIONS", 8)
+    monkeypatch.setattr(settings, "OFFER_LADDER_MAX_TENOR_DAYS", 90)
+
+    cases = [
+        ([("amount", 1000)] * 4 + [("credit_score", 700)], "At most 3 invoices per request"),
+        ([("amount", 1000), ("credit_score", 700)] + [("tenor", 30)] * 3, "At most 2 tenors per request"),
+        ([("amount", 1000), ("credit_score", 700)] + [("advance_ratio", 0.9)] * 3,
+         "At most 2 advance ratios per request"),
+        # 3 invoices x 1 ratio x the 4 default tenors
+        ([("amount", 1000)] * 3 + [("credit_score", 700)],
+         "At most 8 offers (invoices x advance ratios x tenors) per request"),
+        ([("amount", 1000), ("credit_score", 700), ("tenor", 91)], "Tenors must be between 1 and 90 days"),
+    ]
+    for params, detail in cases:
+        response = await client.get(LADDER, params=params)
+        assert response.status_code == 400
+        assert response.json()["detail"] == detail
+
+    # Exactly at the limits
+    response = await client.get(LADDER, params=[
+        ("amount", 1000), ("amount", 2000), ("credit_score", 700),
+        ("tenor", 30), ("tenor", 90), ("advance_ratio", 0.8), ("advance_ratio", 1.0),
+    ])
+    assert response.status_code == 200
+    assert sum(len(offer["options"]) for offer in response.json()["offers"]) == 8
+
+
+@pytest.mark.asyncio
+async def test_ladder_rejects_fractional_tenors(client):
+    response = await client.get(LADDER, params=[("amount", 1000), ("credit_score", 700), ("tenor", 30.5)])
+    assert response.status_code == 422
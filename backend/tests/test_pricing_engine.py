@@ -0,0 +1,125 @@
+"""Fixed-point pricing engine: half-even rounding, input validation, overflow and scalar/batch/grid agreement."""
+
+import math
+
+import numpy as np
+import pytest
+
+from app.agents.invoice_factoring_agent import InvoiceFactoringAgent
+from app.services import pricing_engine as engine
+from app.services.pricing_service import PricingConfig, PricingGrid
+
+CONFIG = PricingConfig(
+    base_rate=2.5,
+    risk_score_cutoffs=(600, 700, 800),
+    risk_adjustments=(1.5, 1.0, 0.5, 0.0),
+    tenor_adjustment_per_30_days=0.5,
+    advance_ratio=0.90,
+    processing_fee_rate=0.01,
+    supported_tenors=(15, 30, 60, 90),
+)
+PARAMS = engine.params_from_config(CONFIG)
+
+
+def test_division_rounds_half_to_even():
+    cases = {(5, 2): 2, (7, 2): 4, (-5, 2): -2, (-7, 2): -4, (1, 3): 0, (2, 3): 1, (10, 4): 2, (14, 4): 4}
+    for (numerator, denominator), expected in cases.items():
+        assert engine.div_half_even(numerator, denominator) == expected
+
+    numerators = np.arange(-1000, 1000, dtype=np.int64)
+    for denominator in (2, 3, 4, 30, engine.RATE_SCALE):
+        expected = [engine.div_half_even(int(n), denominator) for n in numerators]
+        assert engine.div_half_even_array(numerators, denominator).tolist() == expected
+        assert engine.div_half_even_array(numerators.astype(object), denominator).tolist() == expected
+
+
+def test_money_rounds_half_to_even():
+    assert (engine.to_paise(0.125), engine.to_paise(0.375)) == (12, 38)
+    assert engine.to_paise_array([0.125, 0.375]).tolist() == [12, 38]
+
+    # 90% of 5 and 15 paise are 4.5 and 13.5 paise
+    assert engine.price(PARAMS, 5, 0, 30).offer_amount == 4
+    assert engine.price(PARAMS, 15, 0, 30).offer_amount == 14
+    assert engine.price_batch(PARAMS, np.array([5, 15]), np.zeros(2), np.full(2, 30))["offer_amount"].tolist() == [4, 14]
+
+    assert engine.to_percent(engine.to_scaled(2.125)) == 2.12
+    assert engine.to_percent(engine.to_scaled(2.135)) == 2.14
+
+
+@pytest.mark.parametrize("amount", [math.nan, math.inf, -math.inf, -5.0, -0.01, 1e307])
+def test_rejects_non_finite_and_negative_amounts(amount):
+    with pytest.raises(ValueError):
+        engine.to_paise(amount)
+    with pytest.raises(ValueError):
+        engine.to_paise_array([1000.0, amount])
+    with pytest.raises(ValueError):
+        PricingGrid(CONFIG).quote(amount, 700, 30)
+
+
+def test_factoring_agent_rejects_negative_amounts():
+    with pytest.raises(ValueError):
+        InvoiceFactoringAgent().calculate_offer(-5.0, 700, 30)
+
+
+@pytest.mark.parametrize("tenor", [30.5, 0.1, math.nan, math.inf, -30, -30.0])
+def test_rejects_fractional_and_negative_tenors(tenor):
+    with pytest.raises(ValueError):
+        engine.to_days(tenor)
+    with pytest.raises(ValueError):
+        engine.to_days_array([30, tenor])
+    with pytest.raises(ValueError):
+        PricingGrid(CONFIG).quote(1000.0, 700, tenor)
+
+
+def test_accepts_whole_float_tenors():
+    assert engine.to_days(30.0) == 30
+    assert engine.to_days(np.float64(60.0)) == 60
+    assert engine.to_days(np.int32(90)) == 90
+    assert engine.to_days_array([15.0, 30.0]).tolist() == [15, 30]
+    assert engine.to_days_array(np.array([15, 30], dtype=np.int16)).dtype == np.int64
+
+
+def test_amounts_beyond_int64_fall_back_to_python_ints():
+    amounts = [1e17, 2.5e18, 1234.56]  # 1e19 and 2.5e20 paise do not fit in int64
+    paise = engine.to_paise_array(amounts)
+
+    assert paise.dtype == object
+    assert paise.tolist() == [engine.to_paise(a) for a in amounts]
+    assert all(type(p) is int for p in paise.tolist())
+
+    rates = np.full(3, engine.to_scaled(4.0))
+    tenors = np.full(3, 90)
+    batch = engine.price_batch(PARAMS, paise, rates, tenors)
+    for i, amount in enumerate(paise.tolist()):
+        assert engine.price(PARAMS, amount, int(rates[i]), 90) == tuple(int(batch[f][i]) for f in engine.Quote._fields)
+
+
+def test_intermediate_overflow_falls_back_to_python_ints():
+    # int64 amounts whose offer * rate * tenor does not fit in int64
+    paise = engine.to_paise_array([5e13, 100.0])
+    assert paise.dtype == np.int64
+
+    batch = engine.price_batch(PARAMS, paise, np.full(2, engine.to_scaled(6.0)), np.full(2, 365))
+    expected = engine.price(PARAMS, int(paise[0]), engine.to_scaled(6.0), 365)
+    assert tuple(int(batch[f][0]) for f in engine.Quote._fields) == expected
+    assert expected.net_amount > 0
+
+
+def test_scalar_batch_and_grid_agree():
+    rng = np.random.default_rng(41)
+    amounts = np.round(rng.uniform(0, 500000, 3000), 2)
+    scores = rng.integers(0, 1001, 3000)
+    tenors = np.array([15, 30, 45, 60, 90, 120])[rng.integers(0, 6, 3000)]  # 45 and 120 are not in the grid
+    rates = np.array([engine.annual_rate(PARAMS, s, t) for s, t in zip(scores.tolist(), tenors.tolist())])
+
+    batch = engine.price_batch(PARAMS, engine.to_paise_array(amounts), rates, tenors)
+    grid = PricingGrid(CONFIG)
+    for i, (amount, score, tenor) in enumerate(zip(amounts.tolist(), scores.tolist(), tenors.tolist())):
+        scalar = engine.price(PARAMS, engine.to_paise(amount), int(rates[i]), tenor)
+        assert scalar == tuple(int(batch[f][i]) for f in engine.Quote._fields)
+
+        quote = grid.quote(amount, score, tenor)
+        assert quote["offer_amount"] == engine.to_rupees(scalar.offer_amount)
+        assert quote["net_amount"] == engine.to_rupees(scalar.net_amount)
+        assert quote["monthly_cost"] == engine.to_rupees(scalar.monthly_cost)
+        assert quote["rate"] == engine.to_percent(int(rates[i]))
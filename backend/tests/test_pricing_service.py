@@ -0,0 +1,187 @@
+"""PricingService: batch pricing is bit-identical to calculate_offer, and the grid to the engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.services import pricing_engine as engine
+from app.services.pricing_service import (
+    BATCH_COLUMNS, PricingService, get_pricing_grid, pricing_config, pricing_params
+)
+
+
+def invoices(n, seed):
+    rng = np.random.default_rng(seed)
+    return (
+        np.round(rng.uniform(0, 500000, n), 2),
+        rng.integers(0, 1001, n),
+        np.array([15, 30, 45, 60, 90, 120])[rng.integers(0, 6, n)],  # 45 and 120 are off the grid
+    )
+
+
+def expected_row(amount, score, tenor):
+    """calculate_offer's result in BATCH_COLUMNS terms."""
+    offer = PricingService.calculate_offer(amount, score, tenor)
+    return {
+        **{column: offer[column] for column in BATCH_COLUMNS if column in offer},
+        "risk_adjustment": offer["breakdown"]["risk_adjustment"],
+        "tenor_adjustment": offer["breakdown"]["tenor_adjustment"],
+    }
+
+
+def batch_row(result, i):
+    return {column: np.asarray(result[column])[i].item() for column in BATCH_COLUMNS}
+
+
+def assert_rows_equal(result, amounts, scores, tenors):
+    for i, (amount, score, tenor) in enumerate(zip(amounts, scores, tenors)):
+        assert batch_row(result, i) == expected_row(amount, score, tenor), f"row {i}"
+
+
+def test_batch_equals_calculate_offer_per_row():
+    amounts, scores, tenors = invoices(3000, seed=51)
+    result = PricingService.calculate_offers_batch(amounts, scores, tenors)
+
+    assert set(result) == set(BATCH_COLUMNS)
+    assert_rows_equal(result, amounts.tolist(), scores.tolist(), tenors.tolist())
+
+
+@pytest.mark.parametrize("tenor", [30, 45, 30.0, np.int32(90)])
+def test_scalar_tenor_is_broadcast(tenor):
+    amounts, scores, _ = invoices(200, seed=52)
+    result = PricingService.calculate_offers_batch(amounts.tolist(), scores.tolist(), tenor)
+
+    assert result["tenor_days"].tolist() == [int(tenor)] * 200
+    assert_rows_equal(result, amounts.tolist(), scores.tolist(), [int(tenor)] * 200)
+
+
+def test_default_tenor_is_30_days():
+    amounts, scores, _ = invoices(50, seed=53)
+    result = PricingService.calculate_offers_batch(amounts, scores)
+    assert_rows_equal(result, amounts.tolist(), scores.tolist(), [30] * 50)
+
+
+def test_advance_ratio_scalar_and_per_row():
+    amounts, scores, tenors = invoices(500, seed=54)
+    params = pricing_params()
+    default_ratio = params.advance_ratio / engine.RATE_SCALE
+
+    # The configured ratio passed explicitly changes nothing
+    default = PricingService.calculate_offers_batch(amounts, scores, tenors)
+    explicit = PricingService.calculate_offers_batch(amounts, scores, tenors, advance_ratio=default_ratio)
+    for column in BATCH_COLUMNS:
+        assert np.array_equal(explicit[column], default[column])
+
+    ratios = np.array([0.5, 0.75, 0.8, 0.85, 1.0])[np.arange(500) % 5]
+    for advance_ratio in (0.8, ratios):
+        result = PricingService.calculate_offers_batch(amounts, scores, tenors, advance_ratio=advance_ratio)
+        row_ratios = np.broadcast_to(advance_ratio, amounts.shape)
+        for i, (amount, score, tenor, ratio) in enumerate(
+            zip(amounts.tolist(), scores.tolist(), tenors.tolist(), row_ratios.tolist())
+        ):
+            rate = engine.annual_rate(params, score, tenor)
+            quote = engine.price(params, engine.to_paise(amount), rate, tenor, engine.to_scaled(ratio))
+            assert result["offer_amount"][i] == engine.to_rupees(quote.offer_amount)
+            assert result["net_amount"][i] == engine.to_rupees(quote.net_amount)
+            assert result["monthly_cost"][i] == engine.to_rupees(quote.monthly_cost)
+            assert result["rate"][i] == engine.to_percent(rate)
+
+
+def test_dataframe_input_returns_a_dataframe():
+    amounts, scores, tenors = invoices(300, seed=55)
+    index = pd.RangeIndex(1000, 1300, name="invoice_id")
+    frame = pd.DataFrame({"invoice_amount": amounts, "credit_score": scores, "tenor_days": tenors}, index=index)
+
+    result = PricingService.calculate_offers_batch(frame)
+
+    assert isinstance(result, pd.DataFrame)
+    assert list(result.columns) == BATCH_COLUMNS
+    assert result.index.equals(index)
+    assert_rows_equal(result, amounts.tolist(), scores.tolist(), tenors.tolist())
+
+
+def test_dataframe_amount_column_and_tenor_fallback():
+    amounts, scores, _ = invoices(100, seed=56)
+    frame = pd.DataFrame({"amount": amounts, "credit_score": scores})
+
+    result = PricingService.calculate_offers_batch(frame, tenor_days=60)
+    assert_rows_equal(result, amounts.tolist(), scores.tolist(), [60] * 100)
+
+
+def test_batch_rejects_invalid_rows():
+    with pytest.raises(ValueError):
+        PricingService.calculate_offers_batch([1000.0, -5.0], [700, 700])
+    with pytest.raises(ValueError):
+        PricingService.calculate_offers_batch([1000.0, np.nan], [700, 700])
+    with pytest.raises(ValueError):
+        PricingService.calculate_offers_batch([1000.0, 2000.0], [700, 700], [30, 30.5])
+
+
+EDGE_SCORES = [0, 599, 599.5, 600, 601, 699, 700, 701, 799, 800, 801, 1000]
+
+
+def direct_quote(params, amount, score, tenor):
+    """The engine computation the grid's cells stand in for."""
+    risk = engine.risk_adjustment(params, score)
+    tenor_adjustment = engine.tenor_adjustment(params, tenor)
+    rate = params.base_rate + risk + tenor_adjustment
+    quote = engine.price(params, engine.to_paise(amount), rate, tenor)
+    return {
+        "invoice_amount": engine.to_rupees(quote.invoice_amount),
+        "offer_amount": engine.to_rupees(quote.offer_amount),
+        "discount": engine.to_rupees(quote.discount),
+        "processing_fee": engine.to_rupees(quote.processing_fee),
+        "net_amount": engine.to_rupees(quote.net_amount),
+        "rate": engine.to_percent(rate),
+        "tenor_days": tenor,
+        "breakdown": {
+            "base_rate": engine.to_percent(params.base_rate),
+            "risk_adjustment": engine.to_percent(risk),
+            "tenor_adjustment": engine.to_percent(tenor_adjustment),
+            "effective_rate": engine.to_percent(rate),
+        },
+        "monthly_cost": engine.to_rupees(quote.monthly_cost),
+    }
+
+
+@pytest.mark.parametrize("score", EDGE_SCORES)
+def test_grid_equals_the_engine_across_band_edges(score):
+    grid = get_pricing_grid()
+    params = engine.params_from_config(pricing_config())
+    tenors = list(pricing_config().supported_tenors) + [1, 45, 365]  # the last three are built on the fly
+
+    for tenor in tenors:
+        for amount in (0.0, 0.05, 0.15, 999.99, 75000.0, 123456.78):
+            assert grid.quote(amount, score, tenor) == direct_quote(params, amount, score, tenor)
+
+
+def test_band_edges_change_the_rate():
+    grid = get_pricing_grid()
+    cutoffs = pricing_config().risk_score_cutoffs
+    adjustments = pricing_config().risk_adjustments
+    for band, cutoff in enumerate(cutoffs):
+        below, at = grid.quote(75000.0, cutoff - 1, 30), grid.quote(75000.0, cutoff, 30)
+        assert below["breakdown"]["risk_adjustment"] == adjustments[band]
+        assert at["breakdown"]["risk_adjustment"] == adjustments[band + 1]
+
+
+def test_grid_is_rebuilt_when_the_pricing_config_changes(monkeypatch):
+    grid = get_pricing_grid()
+    assert get_pricing_grid() is grid
+    before = PricingService.calculate_offer(75000.0, 720, 30)
+
+    monkeypatch.setattr(settings, "PRICING_BASE_RATE", settings.PRICING_BASE_RATE + 1.0)
+    rebuilt = get_pricing_grid()
+    assert rebuilt is not grid
+    assert get_pricing_grid() is rebuilt
+    after = PricingService.calculate_offer(75000.0, 720, 30)
+    assert after["rate"] == before["rate"] + 1.0
+    assert after == direct_quote(engine.params_from_config(pricing_config()), 75000.0, 720, 30)
+
+    # In-place edits to list settings count as a change too
+    monkeypatch.setattr(settings, "PRICING_SUPPORTED_TENORS", list(settings.PRICING_SUPPORTED_TENORS))
+    grid = get_pricing_grid()
+    settings.PRICING_SUPPORTED_TENORS.append(45)
+    assert get_pricing_grid() is not grid
+    assert (0, 45) in get_pricing_grid().cells
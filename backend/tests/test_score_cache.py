@@ -0,0 +1,90 @@
+"""Score cache: cached results equal fresh scoring, and a model swap drops every bucket."""
+
+import pytest
+
+from app.config import settings
+from app.ml.credit_model import CreditScorer
+from app.ml.model_registry import ModelRegistry
+from app.ml.score_cache import ScoreCache
+
+from conftest import fit_forest, random_features
+
+
+def records(n, seed):
+    return [
+        {"amount": row[0], "avg_payment_days": row[1], "on_time_rate": row[2], "age_days": row[3]}
+        for row in random_features(n, seed)
+    ]
+
+
+def without_cache_field(results):
+    return [{k: v for k, v in r.items() if k != "cache"} for r in results]
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_RELOAD_INTERVAL_SECONDS", 0)
+    return ModelRegistry(root=str(tmp_path))
+
+
+def test_cached_results_equal_uncached_scoring(registry, forest, monkeypatch):
+    registry.register(forest, activate=True)
+    batch = records(2000, seed=21)
+    # Repeat rows so the second half is served from the cache
+    batch += batch[:1000]
+
+    monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", False)
+    uncached = CreditScorer(registry).score_batch(batch)
+    monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", True)
+    scorer = CreditScorer(registry)
+    cached = scorer.score_batch(batch)
+
+    assert without_cache_field(cached) == uncached
+    assert all(r["cache"]["hit"] for r in cached[2000:])
+    assert scorer.cache.stats()["hits"] >= 1000
+
+
+def test_model_reload_clears_the_bucketed_entries(registry, forest, monkeypatch):
+    monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", True)
+    other = fit_forest(seed=2, n_estimators=10, max_depth=4)
+    registry.register(forest, activate=True)
+    registry.register(other)
+    scorer = CreditScorer(registry)
+    batch = records(500, seed=22)
+
+    scorer.score_batch(batch)
+    assert scorer.cache.stats()["entries"] > 0
+
+    registry.activate("v2")
+    assert scorer.reload() is True
+    after_swap = scorer.score_batch(batch)
+
+    stats = scorer.cache.stats()
+    assert stats["invalidations"] == 1
+    assert after_swap[0]["cache"]["hit"] is False  # nothing left from v1
+    assert {r["model_version"] for r in after_swap} == {"v2"}
+    X = random_features(500, seed=22)
+    assert [r["score"] for r in after_swap] == (other.predict_proba(X)[:, 1] * 1000).astype(int).tolist()
+
+
+def test_stats_and_hit_rate():
+    cache = ScoreCache(max_entries=2)
+    owner = object()
+    _, misses = cache.get_many(owner, ["a", "b", "a"])
+    cache.put_many(owner, ["a", "b"], [{"score": 1}, {"score": 2}])
+    entries, _ = cache.get_many(owner, ["a", "c"])
+    cache.put_many(owner, ["c"], [{"score": 3}])
+
+    assert misses == [0, 1]
+    assert entries[0] == {"score": 1}
+    assert cache.hit_rate() == pytest.approx(2 / 5)
+    assert cache.stats() == {
+        "hits": 2, "misses": 3, "evictions": 1, "invalidations": 0,
+        "entries": 2, "max_entries": 2, "hit_rate": 0.4,
+    }
+
+    # A different owner (model) starts from empty
+    entries, misses = cache.get_many(object(), ["a"])
+    assert entries == [None] and misses == [0]
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
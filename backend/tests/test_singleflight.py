@@ -0,0 +1,162 @@
+"""SingleFlight: in-process coalescing, leader failure, timeouts and the Redis leader/follower path."""
+
+import asyncio
+
+import pytest
+
+from app.agents.singleflight import SingleFlight, SingleFlightTimeoutError
+
+CALLERS = 8
+
+
+class Analysis:
+    """Stand-in for orchestrator.aexecute that counts its runs."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.runs = 0
+
+    async def __call__(self):
+        self.runs += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"decision": "APPROVE", "run": self.runs}
+
+
+class FakeRedis:
+    """The few commands SingleFlight uses, shared by several "workers"."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+def worker(redis, **kwargs):
+    flight = SingleFlight(redis_url="redis://fake", poll_interval=0.01, **kwargs)
+    flight._client = lambda: redis
+    return flight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_run_once():
+    flight = SingleFlight()
+    analysis = Analysis()
+
+    results = await asyncio.gather(*(flight.do("analyze:1", analysis) for _ in range(CALLERS)))
+
+    assert analysis.runs == 1
+    assert results == [{"decision": "APPROVE", "run": 1}] * CALLERS
+    assert flight.stats()["leaders"] == 1
+    assert flight.stats()["local_waiters"] == CALLERS - 1
+    assert flight.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    analysis = Analysis()
+
+    await asyncio.gather(flight.do("analyze:1", analysis), flight.do("analyze:2", analysis))
+
+    assert analysis.runs == 2
+
+
+@pytest.mark.asyncio
+async def test_followers_get_the_leaders_error_and_the_next_call_retries():
+    flight = SingleFlight()
+    failing = Analysis(error=RuntimeError("LLM provider down"))
+
+    results = await asyncio.gather(
+        *(flight.do("analyze:1", failing) for _ in range(CALLERS)), return_exceptions=True
+    )
+
+    assert failing.runs == 1
+    assert all(isinstance(r, RuntimeError) and str(r) == "LLM provider down" for r in results)
+
+    # The failed flight is gone; a later request runs the analysis again
+    recovered = Analysis()
+    assert await flight.do("analyze:1", recovered) == {"decision": "APPROVE", "run": 1}
+    assert recovered.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_time_out_without_cancelling_the_shared_run():
+    flight = SingleFlight(wait_timeout=0.05)
+    analysis = Analysis(delay=0.2)
+
+    results = await asyncio.gather(
+        *(flight.do("analyze:1", analysis) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, SingleFlightTimeoutError) for r in results)
+    assert flight.stats()["timeouts"] == 3
+    assert flight.stats()["inflight"] == 1
+
+    await asyncio.sleep(0.25)
+    assert analysis.runs == 1
+    assert flight.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_other_workers_wait_for_the_published_result():
+    redis = FakeRedis()
+    workers = [worker(redis) for _ in range(3)]
+    analysis = Analysis()
+
+    results = await asyncio.gather(*(w.do("analyze:1", analysis) for w in workers))
+
+    assert analysis.runs == 1
+    assert results == [{"decision": "APPROVE", "run": 1}] * 3
+    assert sum(w.stats()["leaders"] for w in workers) == 1
+    assert sum(w.stats()["remote_waiters"] for w in workers) == 2
+    assert not any(key.endswith("lock:analyze:1") for key in redis.data)  # lock released
+
+
+@pytest.mark.asyncio
+async def test_other_workers_take_over_when_the_remote_leader_fails():
+    redis = FakeRedis()
+    leader, follower = worker(redis), worker(redis)
+    failing = Analysis(error=RuntimeError("LLM provider down"))
+    fallback = Analysis()
+
+    leading = asyncio.ensure_future(leader.do("analyze:1", failing))
+    await asyncio.sleep(0.01)  # leader holds the lock
+    following = asyncio.ensure_future(follower.do("analyze:1", fallback))
+
+    with pytest.raises(RuntimeError):
+        await leading
+    # Lock released without a result: the follower runs the analysis itself
+    assert await following == {"decision": "APPROVE", "run": 1}
+    assert failing.runs == 1
+    assert fallback.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_falls_back_to_in_process_coalescing():
+    flight = SingleFlight(redis_url="redis://127.0.0.1:1/0")
+    analysis = Analysis()
+
+    results = await asyncio.gather(*(flight.do("analyze:1", analysis) for _ in range(CALLERS)))
+
+    assert analysis.runs == 1
+    assert results == [{"decision": "APPROVE", "run": 1}] * CALLERS
+    assert flight.stats()["redis"] is False  # backing off
@@ -0,0 +1,84 @@
+"""The compiled forest must return exactly sklearn's predict_proba."""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.config import settings
+from app.ml.credit_model import CreditScorer
+from app.ml.model_registry import ModelRegistry
+from app.ml.tree_compiler import compile_forest
+
+from conftest import fit_forest, random_features
+
+
+def test_batch_matches_sklearn_exactly(forest):
+    X = random_features(5000, seed=1)
+
+    assert np.array_equal(compile_forest(forest).predict_proba(X), forest.predict_proba(X))
+
+
+def test_single_row_matches_sklearn_exactly(forest):
+    X = random_features(500, seed=2)
+    compiled = compile_forest(forest)
+
+    single = np.array([compiled.predict_proba_one(row) for row in X])
+    assert np.array_equal(single, forest.predict_proba(X))
+
+
+def test_values_on_split_thresholds_take_the_same_branch(forest):
+    # Rows sitting exactly on (and one float32 step either side of) every threshold
+    compiled = compile_forest(forest)
+    tree = forest.estimators_[0].tree_
+    splits = tree.feature >= 0
+    rows = []
+    for feature, threshold in zip(tree.feature[splits], tree.threshold[splits]):
+        for value in (threshold, np.nextafter(np.float32(threshold), np.float32(np.inf))):
+            row = random_features(1, seed=len(rows))[0]
+            row[feature] = value
+            rows.append(row)
+    X = np.array(rows)
+
+    assert np.array_equal(compiled.predict_proba(X), forest.predict_proba(X))
+    assert np.array_equal(np.array([compiled.predict_proba_one(row) for row in X]), forest.predict_proba(X))
+
+
+def test_multiclass_and_shallow_forests():
+    X = random_features(1000, seed=3)
+    y = np.digitize(X[:, 1], [30, 60])  # three classes
+    multiclass = RandomForestClassifier(n_estimators=7, max_depth=4, random_state=0).fit(X, y)
+    stump = fit_forest(seed=4, n_estimators=3, max_depth=1)
+
+    for model in (multiclass, stump):
+        compiled = compile_forest(model)
+        assert np.array_equal(compiled.predict_proba(X), model.predict_proba(X))
+        assert np.array_equal(np.array([compiled.predict_proba_one(row) for row in X[:50]]), model.predict_proba(X[:50]))
+
+
+def test_rejects_unsupported_input(forest):
+    compiled = compile_forest(forest)
+    with pytest.raises(ValueError):
+        compiled.predict_proba(np.zeros((3, 5)))
+
+    X = random_features(200, seed=5)
+    multi_output = RandomForestClassifier(n_estimators=2, random_state=0).fit(X, np.column_stack([X[:, 1] > 40] * 2))
+    with pytest.raises(ValueError):
+        compile_forest(multi_output)
+
+
+def test_scorer_results_do_not_depend_on_compilation(forest, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SCORE_CACHE_ENABLED", False)
+    records = [
+        {"amount": row[0], "avg_payment_days": row[1], "on_time_rate": row[2], "age_days": row[3]}
+        for row in random_features(300, seed=6)
+    ]
+
+    results = {}
+    for compiled in (False, True):
+        monkeypatch.setattr(settings, "CREDIT_MODEL_COMPILED", compiled)
+        scorer = CreditScorer(ModelRegistry(root=str(tmp_path)))
+        scorer.model = forest
+        # batch path and the single-row path
+        results[compiled] = (scorer.score_batch(records), [scorer.score(r, r) for r in records[:50]])
+
+    assert results[True] == results[False]
@@ -0,0 +1,83 @@
+"""TreeSHAP contributions: additivity against predict_proba and agreement with brute-force Shapley values."""
+
+from itertools import combinations
+from math import factorial
+
+import numpy as np
+import pytest
+from sklearn.tree import _tree
+
+from app.ml import tree_explainer
+from app.ml.tree_explainer import explain_forest
+
+from conftest import fit_forest, random_features
+
+
+def assert_additive(model, X):
+    explainer = explain_forest(model)
+    contributions = explainer.shap_values(X)
+
+    assert contributions.shape == X.shape
+    np.testing.assert_allclose(
+        explainer.expected_value + contributions.sum(axis=1), model.predict_proba(X)[:, 1], rtol=0, atol=1e-9
+    )
+
+
+def test_contributions_add_up_to_the_prediction(forest):
+    assert_additive(forest, random_features(2000, seed=31))
+
+
+@pytest.mark.parametrize("max_depth", [1, 3])
+def test_additivity_on_shallow_forests(max_depth):
+    assert_additive(fit_forest(seed=32, n_estimators=10, max_depth=max_depth), random_features(500, seed=33))
+
+
+def test_additivity_across_chunks(forest, monkeypatch):
+    monkeypatch.setattr(tree_explainer, "CHUNK_ELEMENTS", 1)  # one row per chunk
+    assert_additive(forest, random_features(50, seed=34))
+
+
+def conditional_expectation(model, x, present):
+    """Cover-weighted expectation of the forest's positive-class output given only the features in `present`."""
+    x = x.astype(np.float32).astype(np.float64)
+    total = 0.0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+
+        def walk(node):
+            left, right = tree.children_left[node], tree.children_right[node]
+            if left == _tree.TREE_LEAF:
+                values = tree.value[node, 0]
+                return values[1] / values.sum()
+            feature = tree.feature[node]
+            if feature in present:
+                return walk(left if x[feature] <= tree.threshold[node] else right)
+            cover = tree.weighted_n_node_samples
+            return (cover[left] * walk(left) + cover[right] * walk(right)) / cover[node]
+
+        total += walk(0)
+    return total / len(model.estimators_)
+
+
+def brute_force_shap(model, x):
+    n = len(x)
+    phi = np.zeros(n)
+    for i in range(n):
+        others = [j for j in range(n) if j != i]
+        for size in range(n):
+            weight = factorial(size) * factorial(n - size - 1) / factorial(n)
+            for subset in combinations(others, size):
+                with_i = conditional_expectation(model, x, set(subset) | {i})
+                phi[i] += weight * (with_i - conditional_expectation(model, x, set(subset)))
+    return phi
+
+
+def test_matches_brute_force_shapley_values():
+    model = fit_forest(seed=35, n_estimators=3, max_depth=4)
+    X = random_features(5, seed=36)
+    explainer = explain_forest(model)
+
+    assert explainer.expected_value == pytest.approx(conditional_expectation(model, X[0], set()), abs=1e-12)
+    np.testing.assert_allclose(
+        explainer.shap_values(X), np.array([brute_force_shap(model, x) for x in X]), rtol=0, atol=1e-12
+    )
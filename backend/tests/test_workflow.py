@@ -0,0 +1,136 @@
+"""Workflow checkpoints: the store interface and resuming the invoice analysis after a failed step."""
+
+import pytest
+
+from app.agents.orchestration_agent import OrchestrationAgent
+from app.agents.workflow import CheckpointStore, MemoryCheckpointStore
+
+BUYER = {
+    "buyer_id": 101, "buyer_name": "Acme Traders", "avg_payment_days": 40,
+    "on_time_rate": 0.8, "total_invoices": 12, "risk_score": 0.3,
+}
+
+
+class RecordingStore(MemoryCheckpointStore):
+    def __init__(self):
+        super().__init__()
+        self.saved = []
+
+    def save(self, workflow, invoice_id, node, input_hash, output):
+        self.saved.append(node)
+        super().save(workflow, invoice_id, node, input_hash, output)
+
+
+class StubAgent:
+    """Replaces a sub-agent's execute/aexecute; returns outputs in order and counts calls."""
+
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+        self.calls = 0
+
+    def execute(self, context):
+        self.calls += 1
+        return self.outputs[min(self.calls, len(self.outputs)) - 1]
+
+    async def aexecute(self, context):
+        return self.execute(context)
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    agent = OrchestrationAgent()
+    agent.workflow.store = RecordingStore()
+    monkeypatch.setattr(agent, "pre_decide", lambda buyer_history, invoice_data: None)
+    monkeypatch.setattr(agent.supply_chain_agent, "buyer_payment_history", lambda buyer_id: dict(BUYER))
+
+    agent.stubs = {
+        "supply_chain": StubAgent({"agent": "SupplyChainAgent", "analysis": {"decision": "YES", "recommended_rate": 2.5}}),
+        "credit_scoring": StubAgent({"agent": "CreditScoringAgent", "credit_score": 720}),
+        # Fails once (agent fallback output), then succeeds
+        "factoring": StubAgent(
+            {"agent": "InvoiceFactoringAgent", "error": "LLM provider down"},
+            {"agent": "InvoiceFactoringAgent", "offer": {"offer_amount": 67500.0}},
+        ),
+    }
+    for name, attr in (("supply_chain", "supply_chain_agent"), ("credit_scoring", "credit_scoring_agent"),
+                       ("factoring", "factoring_agent")):
+        stub = agent.stubs[name]
+        monkeypatch.setattr(getattr(agent, attr), "execute", stub.execute)
+        monkeypatch.setattr(getattr(agent, attr), "aexecute", stub.aexecute)
+    return agent
+
+
+def test_checkpoint_store_is_abstract():
+    with pytest.raises(TypeError):
+        CheckpointStore()
+
+    class LoadOnly(CheckpointStore):
+        def load(self, workflow, invoice_id, node, input_hash):
+            return False, None
+
+    with pytest.raises(TypeError):
+        LoadOnly()
+
+
+def test_memory_store_round_trip_and_ttl():
+    store = MemoryCheckpointStore(ttl_seconds=-1)  # everything is already expired
+    store.save("wf", 1, "node", "hash", {"a": 1})
+    assert store.load("wf", 1, "node", "hash") == (False, None)
+
+    store = MemoryCheckpointStore()
+    store.save("wf", 1, "node", "hash", {"a": 1})
+    assert store.load("wf", 1, "node", "hash") == (True, {"a": 1})
+    assert store.load("wf", 1, "node", "other-hash") == (False, None)
+
+
+CONTEXT = {"invoice_id": 7, "buyer_id": 101, "merchant_id": 1}
+
+
+def assert_resumed_after_factoring_failure(orchestrator, first, saved_by_first, retry):
+    stubs, store = orchestrator.stubs, orchestrator.workflow.store
+
+    assert first["agent_results"]["factoring"]["error"] == "LLM provider down"
+    # The fallback output is not stored; the two LLM verdicts before it are
+    assert sorted(saved_by_first) == ["credit_scoring", "supply_chain"]
+
+    assert retry["agent_results"]["factoring"]["offer"] == {"offer_amount": 67500.0}
+    assert stubs["supply_chain"].calls == 1
+    assert stubs["credit_scoring"].calls == 1
+    assert stubs["factoring"].calls == 2
+    assert sorted(store.saved) == ["credit_scoring", "factoring", "supply_chain"]
+
+
+def test_retry_resumes_from_checkpoints(orchestrator):
+    first = orchestrator.execute(dict(CONTEXT))
+    saved_by_first = list(orchestrator.workflow.store.saved)
+    retry = orchestrator.execute(dict(CONTEXT))
+
+    assert_resumed_after_factoring_failure(orchestrator, first, saved_by_first, retry)
+
+
+@pytest.mark.asyncio
+async def test_async_retry_resumes_from_checkpoints(orchestrator):
+    first = await orchestrator.aexecute(dict(CONTEXT))
+    saved_by_first = list(orchestrator.workflow.store.saved)
+
+    events = []
+
+    async def on_event(event):
+        events.append(event)
+
+    retry = await orchestrator.aexecute(dict(CONTEXT), on_event=on_event)
+
+    assert_resumed_after_factoring_failure(orchestrator, first, saved_by_first, retry)
+    resumed = {e["step"]: e["resumed"] for e in events if e["event"] == "step_completed"}
+    assert resumed["supply_chain"] is True
+    assert resumed["credit_scoring"] is True
+    assert resumed["factoring"] is False
+
+
+def test_changed_inputs_do_not_reuse_checkpoints(orchestrator):
+    orchestrator.execute(dict(CONTEXT))
+    orchestrator.execute({**CONTEXT, "merchant_id": 2})
+
+    # The input hash covers the run context, so a different merchant re-runs the LLM steps
+    assert orchestrator.stubs["supply_chain"].calls == 2
+    assert orchestrator.stubs["credit_scoring"].calls == 2